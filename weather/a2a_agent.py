@@ -0,0 +1,390 @@
+import asyncio
+import json
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator
+
+from mcp.server.fastmcp.exceptions import ToolError
+from sse_starlette.sse import EventSourceResponse
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from admission import Overloaded, current_session_key
+from constants import A2A_MAX_TASKS, A2A_SESSION_IDLE_SECONDS, SESSION_MAX_CONCURRENT
+from output import output_mode_override
+from tracing import span
+
+A2A_PROTOCOL_VERSION = "0.2.5"
+
+# JSON-RPC and A2A error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+TASK_NOT_FOUND = -32001
+TASK_NOT_CANCELABLE = -32002
+PUSH_NOTIFICATION_NOT_SUPPORTED = -32003
+
+TERMINAL_STATES = {"completed", "canceled", "failed", "rejected"}
+
+USAGE = (
+    'Send a data part {"tool": "<name>", "arguments": {...}}, or {"calls": [...]} with several '
+    "of those to run them concurrently (a text part holding the same JSON works too). "
+    "Tools: {tools}"
+)
+
+
+class RpcError(Exception):
+    def __init__(self, code: int, message: str):
+        self.code = code
+        self.message = message
+        super().__init__(message)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def _agent_message(text: str, task_id: str, context_id: str) -> dict[str, Any]:
+    return {
+        "kind": "message", "role": "agent", "messageId": uuid.uuid4().hex,
+        "taskId": task_id, "contextId": context_id, "parts": [{"kind": "text", "text": text}],
+    }
+
+
+def _tool_calls(message: dict[str, Any]) -> list[dict[str, Any]]:
+    """Tool calls requested by a message's data (or JSON text) parts."""
+    calls = []
+    for part in message.get("parts") or []:
+        if part.get("kind") == "data":
+            data = part.get("data")
+        elif part.get("kind") == "text":
+            try:
+                data = json.loads(part.get("text") or "")
+            except ValueError:
+                continue
+        else:
+            continue
+        if not isinstance(data, dict):
+            continue
+        for call in data.get("calls") or [data]:
+            if isinstance(call, dict) and isinstance(call.get("tool"), str):
+                arguments = call.get("arguments") or {}
+                if isinstance(arguments, dict):
+                    calls.append({"tool": call["tool"], "arguments": arguments})
+    return calls
+
+
+class AgentTask:
+    """One A2A task: its status, artifacts and history, and the streams following it."""
+
+    def __init__(self, context_id: str):
+        self.id = uuid.uuid4().hex
+        self.context_id = context_id
+        self.status: dict[str, Any] = {"state": "submitted", "timestamp": _now()}
+        self.artifacts: list[dict[str, Any]] = []
+        self.history: list[dict[str, Any]] = []
+        self.runner: asyncio.Task | None = None
+        self._subscribers: list[asyncio.Queue] = []
+
+    @property
+    def is_terminal(self) -> bool:
+        return self.status["state"] in TERMINAL_STATES
+
+    def to_dict(self, history_length: int | None = None) -> dict[str, Any]:
+        history = self.history if history_length is None else self.history[-history_length:] if history_length else []
+        return {
+            "kind": "task", "id": self.id, "contextId": self.context_id,
+            "status": self.status, "artifacts": self.artifacts, "history": history,
+        }
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        if queue in self._subscribers:
+            self._subscribers.remove(queue)
+
+    def _publish(self, event: dict[str, Any]) -> None:
+        for queue in self._subscribers:
+            queue.put_nowait(event)
+
+    def set_status(self, state: str, text: str | None = None) -> None:
+        self.status = {"state": state, "timestamp": _now()}
+        if text is not None:
+            message = _agent_message(text, self.id, self.context_id)
+            self.status["message"] = message
+            self.history.append(message)
+        self._publish({
+            "kind": "status-update", "taskId": self.id, "contextId": self.context_id,
+            "status": self.status, "final": self.is_terminal or state == "input-required",
+        })
+
+    def add_artifact(self, artifact: dict[str, Any]) -> None:
+        self.artifacts.append(artifact)
+        self._publish({
+            "kind": "artifact-update", "taskId": self.id, "contextId": self.context_id,
+            "artifact": artifact, "lastChunk": True,
+        })
+
+
+class WeatherAgent:
+    """A2A agent front-end that runs the weather tools in-process.
+
+    Tool calls go through the same server instance an MCP client would use
+    (deadlines, admission control, caches and the pooled NWS client), without
+    a subprocess or MCP serialization in between. Each A2A context is a
+    long-lived session: its tasks run concurrently and are kept until the
+    context has been idle for A2A_SESSION_IDLE_SECONDS.
+    """
+
+    def __init__(self, mcp, max_tasks: int = A2A_MAX_TASKS, session_idle_seconds: float = A2A_SESSION_IDLE_SECONDS):
+        self.mcp = mcp
+        self.max_tasks = max_tasks
+        self.session_idle_seconds = session_idle_seconds
+        self.tasks: "OrderedDict[str, AgentTask]" = OrderedDict()
+        self.sessions: dict[str, float] = {}
+
+    async def agent_card(self, url: str) -> dict[str, Any]:
+        tools = await self.mcp.list_tools()
+        return {
+            "name": "Weather Agent",
+            "description": "US weather forecasts, observations, alerts and planning tools backed by the NWS API.",
+            "url": url,
+            "version": "0.1.0",
+            "protocolVersion": A2A_PROTOCOL_VERSION,
+            "capabilities": {"streaming": True, "pushNotifications": False, "stateTransitionHistory": False},
+            "defaultInputModes": ["application/json", "text/plain"],
+            "defaultOutputModes": ["text/plain", "application/json"],
+            "skills": [
+                {
+                    "id": tool.name,
+                    "name": tool.name.replace("_", " ").capitalize(),
+                    "description": (tool.description or "").strip().split("\n")[0],
+                    "tags": ["weather"],
+                    "examples": [json.dumps({"tool": tool.name, "arguments": {
+                        name: f"<{name}>" for name in tool.inputSchema.get("required", [])
+                    }})],
+                }
+                for tool in tools
+            ],
+        }
+
+    # Sessions and task bookkeeping
+
+    def _touch(self, context_id: str) -> None:
+        self.sessions[context_id] = time.monotonic()
+        cutoff = time.monotonic() - self.session_idle_seconds
+        for expired in [context for context, seen in self.sessions.items() if seen < cutoff]:
+            del self.sessions[expired]
+        for task_id in [task_id for task_id, task in self.tasks.items()
+                        if task.is_terminal and task.context_id not in self.sessions]:
+            del self.tasks[task_id]
+
+    def _add(self, task: AgentTask) -> None:
+        self.tasks[task.id] = task
+        # Drop the oldest finished tasks beyond the retention limit
+        for task_id in [task_id for task_id, old in self.tasks.items() if old.is_terminal]:
+            if len(self.tasks) <= self.max_tasks:
+                break
+            del self.tasks[task_id]
+
+    def _get(self, params: dict[str, Any]) -> AgentTask:
+        task = self.tasks.get(params.get("id") or "")
+        if task is None:
+            raise RpcError(TASK_NOT_FOUND, "Task not found")
+        return task
+
+    # Running tasks
+
+    def _start(self, params: dict[str, Any]) -> AgentTask:
+        message = params.get("message")
+        if not isinstance(message, dict) or not isinstance(message.get("parts"), list):
+            raise RpcError(INVALID_PARAMS, "params.message with parts is required")
+
+        task = self.tasks.get(message.get("taskId") or "")
+        if task is not None and task.status["state"] != "input-required":
+            raise RpcError(INVALID_PARAMS, f"Task {task.id} is {task.status['state']} and takes no more input")
+        if task is None:
+            task = AgentTask(message.get("contextId") or uuid.uuid4().hex)
+            self._add(task)
+        self._touch(task.context_id)
+        task.history.append({**message, "taskId": task.id, "contextId": task.context_id})
+
+        accepted = (params.get("configuration") or {}).get("acceptedOutputModes") or []
+        compact = bool(accepted) and "text/plain" not in accepted and "application/json" in accepted
+        task.runner = asyncio.create_task(self._run(task, _tool_calls(message), compact))
+        return task
+
+    async def _run(self, task: AgentTask, calls: list[dict[str, Any]], compact: bool) -> None:
+        if not calls:
+            names = ", ".join(tool.name for tool in await self.mcp.list_tools())
+            task.set_status("input-required", USAGE.replace("{tools}", names))
+            return
+
+        # Calls from one context count as one session for admission control
+        current_session_key.set(("a2a", task.context_id))
+        output_mode_override.set("compact" if compact else "text")
+        task.set_status("working", f"Running {len(calls)} tool call(s)")
+        semaphore = asyncio.Semaphore(SESSION_MAX_CONCURRENT)
+
+        async def run_call(index: int, call: dict[str, Any]) -> bool:
+            async with semaphore:
+                try:
+                    contents = await self.mcp.call_tool(call["tool"], call["arguments"])
+                    text, ok = "\n".join(getattr(content, "text", "") for content in contents), True
+                except (ToolError, Overloaded) as e:
+                    text, ok = str(e), False
+            part: dict[str, Any] = {"kind": "text", "text": text}
+            if compact and ok:
+                try:
+                    part = {"kind": "data", "data": json.loads(text)}
+                except ValueError:
+                    pass
+            task.add_artifact({
+                "artifactId": f"{task.id}-{index}", "name": call["tool"], "parts": [part],
+                "metadata": {"arguments": call["arguments"], "error": not ok},
+            })
+            return ok
+
+        try:
+            with span("a2a.task", task_id=task.id, calls=len(calls)):
+                results = await asyncio.gather(*(run_call(index, call) for index, call in enumerate(calls)))
+        except asyncio.CancelledError:
+            task.set_status("canceled", "Task canceled")
+            raise
+        except Exception as e:
+            task.set_status("failed", f"Task failed: {e}")
+            return
+        if any(results):
+            task.set_status("completed", f"{sum(results)} of {len(calls)} tool call(s) succeeded")
+        else:
+            task.set_status("failed", "No tool call succeeded")
+
+    async def _follow(self, task: AgentTask, queue: asyncio.Queue) -> AsyncIterator[dict[str, Any]]:
+        try:
+            while True:
+                event = await queue.get()
+                yield event
+                if event["kind"] == "status-update" and event["final"]:
+                    return
+        finally:
+            task.unsubscribe(queue)
+
+    # JSON-RPC methods
+
+    async def send(self, params: dict[str, Any]) -> dict[str, Any]:
+        task = self._start(params)
+        configuration = params.get("configuration") or {}
+        if configuration.get("blocking", True):
+            try:
+                await asyncio.shield(task.runner)
+            except asyncio.CancelledError:
+                if asyncio.current_task().cancelling():
+                    raise
+                # The runner was canceled (tasks/cancel), not this request
+                if not task.is_terminal:
+                    task.set_status("canceled", "Task canceled")
+        return task.to_dict(configuration.get("historyLength"))
+
+    async def stream(self, params: dict[str, Any]) -> AsyncIterator[dict[str, Any]]:
+        task = self._start(params)
+        queue = task.subscribe()
+        yield task.to_dict()
+        async for event in self._follow(task, queue):
+            yield event
+
+    async def get_task(self, params: dict[str, Any]) -> dict[str, Any]:
+        task = self._get(params)
+        self._touch(task.context_id)
+        return task.to_dict(params.get("historyLength"))
+
+    async def cancel(self, params: dict[str, Any]) -> dict[str, Any]:
+        task = self._get(params)
+        if task.is_terminal or task.runner is None or task.runner.done():
+            raise RpcError(TASK_NOT_CANCELABLE, f"Task is {task.status['state']} and cannot be canceled")
+        task.runner.cancel()
+        try:
+            await task.runner
+        except asyncio.CancelledError:
+            pass
+        if not task.is_terminal:
+            # Canceled before it got to run
+            task.set_status("canceled", "Task canceled")
+        return task.to_dict()
+
+    async def resubscribe(self, params: dict[str, Any]) -> AsyncIterator[dict[str, Any]]:
+        task = self._get(params)
+        queue = task.subscribe()
+        yield task.to_dict()
+        if task.is_terminal or task.status["state"] == "input-required":
+            task.unsubscribe(queue)
+            return
+        async for event in self._follow(task, queue):
+            yield event
+
+    # HTTP transport
+
+    async def handle_card(self, request: Request) -> JSONResponse:
+        return JSONResponse(await self.agent_card(str(request.base_url)))
+
+    async def handle_rpc(self, request: Request):
+        try:
+            body = await request.json()
+        except ValueError:
+            return JSONResponse(_rpc_error(None, PARSE_ERROR, "Parse error"))
+        if not isinstance(body, dict) or body.get("jsonrpc") != "2.0" or not isinstance(body.get("method"), str):
+            return JSONResponse(_rpc_error(body.get("id") if isinstance(body, dict) else None,
+                                           INVALID_REQUEST, "Invalid request"))
+
+        request_id, method, params = body.get("id"), body["method"], body.get("params") or {}
+        streams = {"message/stream": self.stream, "tasks/resubscribe": self.resubscribe}
+        calls = {"message/send": self.send, "tasks/get": self.get_task, "tasks/cancel": self.cancel}
+
+        if method in streams:
+            events = streams[method](params)
+            try:
+                # Validate up front, so a bad request gets a plain JSON-RPC error
+                first = await anext(events)
+            except RpcError as e:
+                return JSONResponse(_rpc_error(request_id, e.code, e.message))
+            return EventSourceResponse(_sse(request_id, first, events))
+        if method in calls:
+            try:
+                return JSONResponse({"jsonrpc": "2.0", "id": request_id, "result": await calls[method](params)})
+            except RpcError as e:
+                return JSONResponse(_rpc_error(request_id, e.code, e.message))
+        if method.startswith("tasks/pushNotificationConfig/"):
+            return JSONResponse(_rpc_error(request_id, PUSH_NOTIFICATION_NOT_SUPPORTED, "Push notifications are not supported"))
+        return JSONResponse(_rpc_error(request_id, METHOD_NOT_FOUND, f"Method not found: {method}"))
+
+
+def _rpc_error(request_id: Any, code: int, message: str) -> dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+async def _sse(request_id: Any, first: dict[str, Any], events: AsyncIterator[dict[str, Any]]):
+    yield {"data": json.dumps({"jsonrpc": "2.0", "id": request_id, "result": first})}
+    async for event in events:
+        yield {"data": json.dumps({"jsonrpc": "2.0", "id": request_id, "result": event})}
+
+
+def create_a2a_app(mcp) -> Starlette:
+    """Starlette app serving the weather tools as an A2A agent (JSON-RPC over HTTP, with SSE streams).
+
+    Runs the server's lifespan, so cache bundles and hot-location prefetch work as under MCP.
+    """
+    agent = WeatherAgent(mcp)
+    return Starlette(
+        routes=[
+            Route("/.well-known/agent.json", agent.handle_card, methods=["GET"]),
+            Route("/", agent.handle_rpc, methods=["POST"]),
+        ],
+        lifespan=lambda app: mcp.settings.lifespan(mcp),
+    )
@@ -0,0 +1,168 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any
+
+import deadline
+from constants import SESSION_MAX_CONCURRENT, TOOL_CLASS_LIMITS
+from output import is_compact, to_compact_json
+from tracing import span
+
+# Session that calls made outside an MCP request belong to (e.g. an A2A context);
+# calls made over MCP are keyed by their client session instead
+current_session_key: ContextVar[Any] = ContextVar("current_session_key", default=None)
+
+# Cost class of each tool; unlisted tools are "standard", including single-state
+# alert lookups, which are cached. Heavy tools pull national feeds or fan out over
+# many areas, points or hours; light ones are served from local indexes.
+TOOL_CLASSES = {
+    "track_severe_weather": "heavy",
+    "get_alerts_batch": "heavy",
+    "get_storm_reports_batch": "heavy",
+    "get_route_weather": "heavy",
+    "find_best_weather_window": "heavy",
+    "get_radar_stations": "light",
+    "get_alert_changes": "light",
+    "get_alert_summary": "light",
+    "get_satellite_imagery": "light",
+    "get_weather_summary": "light",
+    "check_weather_service_status": "light",
+}
+
+
+class Overloaded(Exception):
+    """A tool call was rejected because its bulkhead or session is at capacity."""
+
+    def __init__(self, reason: str, retry_after: int):
+        self.reason = reason
+        self.retry_after = retry_after
+        message = f"Server busy: {reason}. Retry after {retry_after} seconds."
+        if is_compact():
+            message = to_compact_json({"error": f"Server busy: {reason}", "retry_after": retry_after})
+        super().__init__(message)
+
+
+class Bulkhead:
+    """Concurrency limit with a bounded FIFO wait queue for one class of tools."""
+
+    def __init__(self, name: str, max_concurrent: int, max_queued: int, max_wait_seconds: float):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.max_wait_seconds = max_wait_seconds
+        self.active = 0
+        self.rejected = 0
+        self.average_seconds = 1.0  # Moving average of call duration, for retry hints
+        self._waiters: deque[asyncio.Future] = deque()
+
+    def retry_after(self) -> int:
+        """Rough seconds until a slot frees up for a new caller."""
+        backlog = (len(self._waiters) + 1) / self.max_concurrent
+        return max(1, math.ceil(self.average_seconds * backlog))
+
+    def _reject(self, reason: str) -> Overloaded:
+        self.rejected += 1
+        return Overloaded(reason, self.retry_after())
+
+    async def acquire(self) -> None:
+        if self.active < self.max_concurrent and not self._waiters:
+            self.active += 1
+            return
+        if len(self._waiters) >= self.max_queued:
+            raise self._reject(f"too many queued {self.name} tool calls")
+
+        # Wait no longer than the queue allows, nor past the call's own deadline
+        wait = self.max_wait_seconds
+        left = deadline.remaining()
+        if left is not None:
+            wait = min(wait, left)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            with span("admission.wait", tool_class=self.name, queued=len(self._waiters)):
+                await asyncio.wait_for(asyncio.shield(waiter), wait)
+        except (TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up; pass it on
+                self.release()
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            if isinstance(e, TimeoutError):
+                raise self._reject(f"{self.name} tool calls are backed up") from None
+            raise
+
+    def release(self) -> None:
+        # Hand the slot straight to the next waiter so queued calls keep FIFO order
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def record_duration(self, seconds: float) -> None:
+        self.average_seconds += 0.2 * (seconds - self.average_seconds)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "active": self.active,
+            "queued": len(self._waiters),
+            "rejected": self.rejected,
+            "average_seconds": round(self.average_seconds, 3),
+        }
+
+
+class AdmissionController:
+    """Admits tool calls through per-class bulkheads and per-session caps.
+
+    Expensive tools are throttled in their own bulkhead so they cannot starve
+    cheap ones, a single session can only run a few calls at once, and callers
+    are rejected quickly with a retry hint rather than piling up.
+    """
+
+    def __init__(self, limits: dict[str, dict] = TOOL_CLASS_LIMITS,
+                 session_max_concurrent: int = SESSION_MAX_CONCURRENT):
+        self.bulkheads = {name: Bulkhead(name, **limit) for name, limit in limits.items()}
+        self.session_max_concurrent = session_max_concurrent
+        self._session_calls: dict[Any, int] = {}
+
+    def bulkhead_for(self, tool_name: str) -> Bulkhead:
+        return self.bulkheads[TOOL_CLASSES.get(tool_name, "standard")]
+
+    @asynccontextmanager
+    async def admit(self, tool_name: str, session_key: Any = None):
+        """Hold a slot for one tool call, or raise Overloaded."""
+        bulkhead = self.bulkhead_for(tool_name)
+
+        if session_key is not None:
+            calls = self._session_calls.get(session_key, 0)
+            if calls >= self.session_max_concurrent:
+                raise bulkhead._reject("too many concurrent calls from this session")
+            self._session_calls[session_key] = calls + 1
+
+        try:
+            await bulkhead.acquire()
+            started = time.monotonic()
+            try:
+                yield
+            finally:
+                bulkhead.release()
+                bulkhead.record_duration(time.monotonic() - started)
+        finally:
+            if session_key is not None:
+                remaining = self._session_calls[session_key] - 1
+                if remaining:
+                    self._session_calls[session_key] = remaining
+                else:
+                    del self._session_calls[session_key]
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        return {name: bulkhead.stats() for name, bulkhead in self.bulkheads.items()}
+
+
+admission_controller = AdmissionController()
@@ -0,0 +1,242 @@
+import asyncio
+import heapq
+import logging
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any
+
+import deadline
+from compact_alerts import STORM_CATEGORIES, CompactAlert, Severity, compact_feed
+from constants import ALERT_AGGREGATE_POLL_SECONDS, NWS_API_BASE, US_STATE_CODES
+from deadline import create_detached_task
+from utils import make_nws_request
+
+logger = logging.getLogger(__name__)
+
+CATEGORIES = tuple(category for _, category in STORM_CATEGORIES) + ("other",)
+SEVERITIES = tuple(level.label for level in sorted(Severity, reverse=True) if level is not Severity.MISSING)
+
+
+def _expiry_timestamp(expires: str | None) -> float | None:
+    try:
+        return datetime.fromisoformat(expires).timestamp() if expires else None
+    except ValueError:
+        return None
+
+
+class _Contribution:
+    """What one active alert adds to the aggregates, kept to take it back out."""
+
+    __slots__ = ("stamp", "states", "category", "severity", "zones", "expires_at")
+
+    def __init__(self, alert: CompactAlert):
+        self.stamp = alert.sent or alert.effective or ""
+        # The first two letters of a UGC code are the state, or a marine area (e.g. GM, PZ)
+        # that is left out of the per-state counts
+        self.states = frozenset(code[:2] for code in alert.ugc if code[:2] in US_STATE_CODES)
+        self.category = alert.category
+        self.severity = max(alert.severity, Severity.UNKNOWN)
+        self.zones = frozenset(alert.ugc)
+        self.expires_at = _expiry_timestamp(alert.expires)
+
+
+class AlertAggregates:
+    """National active-alert counts, maintained incrementally.
+
+    Holds alert counts by state x storm category x severity and the highest
+    severity in effect in each zone. Each feed update only adds or takes out
+    the alerts that appeared, changed or went away since the last one, and
+    alerts leave on their own once past their expiry time, so reads never
+    rescan the feed: their cost depends on the fixed category and severity
+    vocabulary, not on how many alerts are active.
+    """
+
+    def __init__(self):
+        self.counts: dict[str, Counter[tuple[str, Severity]]] = {}
+        self.totals: Counter[tuple[str, Severity]] = Counter()
+        self.updated_at: float | None = None
+        self._active: dict[str, _Contribution] = {}
+        # Alerts in effect per zone, by severity; and how many zones top out at each severity
+        self._zone_levels: dict[str, Counter[Severity]] = {}
+        self._zones_by_highest: Counter[Severity] = Counter()
+        self._expiry: list[tuple[float, str, str]] = []
+
+    def apply(self, alerts: list[CompactAlert]) -> int:
+        """Bring the aggregates in line with the feed's current alert set. Returns how many alerts changed.
+
+        Alerts already past their expiry time count as gone, even while the feed still lists them.
+        """
+        now = time.time()
+        changed = 0
+        seen = set()
+        for alert in alerts:
+            if not alert.id:
+                continue
+            contribution = _Contribution(alert)
+            if contribution.expires_at is not None and contribution.expires_at <= now:
+                continue
+            seen.add(alert.id)
+            previous = self._active.get(alert.id)
+            if previous is not None and previous.stamp == contribution.stamp:
+                continue
+            if previous is not None:
+                self._remove(alert.id)
+            self._add(alert.id, contribution)
+            changed += 1
+
+        for alert_id in [alert_id for alert_id in self._active if alert_id not in seen]:
+            self._remove(alert_id)
+            changed += 1
+        self.updated_at = time.time()
+        return changed
+
+    def expire(self, now: float | None = None) -> int:
+        """Take out alerts whose expiry time has passed. Returns how many were taken out."""
+        now = time.time() if now is None else now
+        expired = 0
+        while self._expiry and self._expiry[0][0] <= now:
+            _, alert_id, stamp = heapq.heappop(self._expiry)
+            contribution = self._active.get(alert_id)
+            # Skip entries left behind by an alert that was updated or already removed
+            if contribution is not None and contribution.stamp == stamp:
+                self._remove(alert_id)
+                expired += 1
+        return expired
+
+    def _add(self, alert_id: str, contribution: _Contribution) -> None:
+        self._active[alert_id] = contribution
+        self._count(contribution, 1)
+        if contribution.expires_at is not None:
+            heapq.heappush(self._expiry, (contribution.expires_at, alert_id, contribution.stamp))
+
+    def _remove(self, alert_id: str) -> None:
+        self._count(self._active.pop(alert_id), -1)
+
+    def _count(self, contribution: _Contribution, delta: int) -> None:
+        cell = (contribution.category, contribution.severity)
+        for state in contribution.states:
+            counts = self.counts.setdefault(state, Counter())
+            counts[cell] += delta
+            if counts[cell] <= 0:
+                del counts[cell]
+                if not counts:
+                    del self.counts[state]
+        self.totals[cell] += delta
+        if self.totals[cell] <= 0:
+            del self.totals[cell]
+
+        for zone in contribution.zones:
+            levels = self._zone_levels.setdefault(zone, Counter())
+            before = max(levels) if levels else None
+            levels[contribution.severity] += delta
+            if levels[contribution.severity] <= 0:
+                del levels[contribution.severity]
+            after = max(levels) if levels else None
+            if before != after:
+                if before is not None:
+                    self._zones_by_highest[before] -= 1
+                    if not self._zones_by_highest[before]:
+                        del self._zones_by_highest[before]
+                if after is not None:
+                    self._zones_by_highest[after] += 1
+            if not levels:
+                del self._zone_levels[zone]
+
+    def zone_severity(self, zone: str) -> str | None:
+        """Highest severity among the alerts in effect for a zone, or None if there are none."""
+        levels = self._zone_levels.get(zone.upper())
+        return max(levels).label if levels else None
+
+    def summary(self, state: str = "", category: str = "") -> dict[str, Any]:
+        """Alert counts by category and severity, nationally or for one state, optionally for one category.
+
+        An alert covering several states counts once in each of them, and once nationally.
+        """
+        counts = self.counts.get(state.upper(), Counter()) if state else self.totals
+        categories = {}
+        active = 0
+        for (cell_category, severity), count in counts.items():
+            if category and cell_category != category:
+                continue
+            categories.setdefault(cell_category, {})[severity.label] = count
+            active += count
+        return {
+            "state": state.upper() or None,
+            "categories": {
+                name: {label: categories[name][label] for label in SEVERITIES if label in categories[name]}
+                for name in CATEGORIES if name in categories
+            },
+            "active_alerts": active,
+            # Nationwide, whatever the state or category asked for
+            "zones_by_highest_severity": {
+                level.label: self._zones_by_highest[level] for level in sorted(self._zones_by_highest, reverse=True)
+            },
+            "as_of": datetime.fromtimestamp(self.updated_at, timezone.utc).isoformat() if self.updated_at else None,
+        }
+
+    def state_counts(self, category: str = "") -> dict[str, int]:
+        """Active alerts per state, optionally for one category."""
+        return {
+            state: sum(count for (cell_category, _), count in counts.items()
+                       if not category or cell_category == category)
+            for state, counts in sorted(self.counts.items())
+        }
+
+
+class AlertAggregator:
+    """Keeps the national aggregates fed from the active-alerts feed in the background.
+
+    Polling starts with the first read, which waits for the initial load;
+    later reads answer from the aggregates straight away.
+    """
+
+    def __init__(self, poll_seconds: float = ALERT_AGGREGATE_POLL_SECONDS):
+        self.poll_seconds = poll_seconds
+        self.aggregates = AlertAggregates()
+        self._task: asyncio.Task | None = None
+        self._loaded = asyncio.Event()
+
+    async def refresh(self) -> bool:
+        """Apply the current national feed. Returns whether it could be fetched."""
+        # The national feed is compacted off the event loop (see offload.py)
+        alerts = await make_nws_request(f"{NWS_API_BASE}/alerts/active", compact_feed)
+        if alerts is None:
+            return False
+        changed = self.aggregates.apply(alerts)
+        logger.debug("Alert aggregates: %d alerts changed, %d active", changed, len(alerts))
+        return True
+
+    async def _poll_loop(self) -> None:
+        while True:
+            try:
+                if await self.refresh():
+                    self._loaded.set()
+            except Exception:
+                logger.exception("Alert aggregate refresh failed")
+            await asyncio.sleep(self.poll_seconds)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def read(self) -> AlertAggregates | None:
+        """The aggregates with expired alerts taken out, or None if the feed has not loaded in time."""
+        if self._task is None or self._task.done():
+            self._task = create_detached_task(self._poll_loop())
+        if not self._loaded.is_set():
+            try:
+                # Wait for the first load no longer than the calling tool's deadline allows
+                await asyncio.wait_for(asyncio.shield(self._loaded.wait()), deadline.remaining())
+            except TimeoutError:
+                return None
+        self.aggregates.expire()
+        return self.aggregates
+
+
+alert_aggregator = AlertAggregator()
@@ -0,0 +1,132 @@
+import base64
+import secrets
+from collections import deque
+from typing import Any
+
+from compact_alerts import CompactAlert
+
+# Alert fields carried by delta results; long description text is left out
+ALERT_DELTA_FIELDS = ("id", "event", "severity", "area", "expires")
+
+
+class _ScopeLog:
+    def __init__(self, max_entries: int):
+        self.current: dict[str, tuple[str, CompactAlert]] = {}
+        # (version, change, alert ID, the alert as it was before an update or expiry)
+        self.entries: deque[tuple[int, str, str, CompactAlert | None]] = deque(maxlen=max_entries)
+        self.floor_version = 0
+
+
+class AlertLog:
+    """Versioned in-memory log of alert changes per scope.
+
+    Each ingest of a scope's active alerts records which alert IDs are new,
+    updated or expired under a monotonically increasing version. Clients hold
+    an opaque cursor and ask only for what changed since it.
+    """
+
+    def __init__(self, max_entries_per_scope: int = 2000):
+        self.max_entries_per_scope = max_entries_per_scope
+        # Cursors from a previous process (or a cleared log) are detected and trigger a resync
+        self.epoch = secrets.token_hex(4)
+        self.version = 0
+        self._scopes: dict[str, _ScopeLog] = {}
+
+    def ingest(self, scope_uri: str, alerts: list[CompactAlert]) -> int:
+        """Record the current alert set of a scope. Returns the log version after ingesting."""
+        log = self._scopes.setdefault(scope_uri, _ScopeLog(self.max_entries_per_scope))
+        seen = set()
+        for alert in alerts:
+            alert_id = alert.id
+            if not alert_id:
+                continue
+            seen.add(alert_id)
+            stamp = alert.sent or alert.effective or ""
+            previous = log.current.get(alert_id)
+            if previous is None:
+                self._append(log, "new", alert_id)
+            elif previous[0] != stamp:
+                self._append(log, "updated", alert_id, previous[1])
+            else:
+                continue
+            log.current[alert_id] = (stamp, alert)
+
+        for alert_id in [alert_id for alert_id in log.current if alert_id not in seen]:
+            self._append(log, "expired", alert_id, log.current[alert_id][1])
+            del log.current[alert_id]
+        return self.version
+
+    def forget(self, scope_uri: str) -> None:
+        """Drop a scope's log; cursors for it then resync."""
+        self._scopes.pop(scope_uri, None)
+
+    def _append(self, log: _ScopeLog, change: str, alert_id: str, previous: CompactAlert | None = None) -> None:
+        self.version += 1
+        if len(log.entries) == log.entries.maxlen:
+            # The oldest entry falls out of the window; cursors before it must resync
+            log.floor_version = log.entries[0][0]
+        log.entries.append((self.version, change, alert_id, previous))
+
+    def cursor(self, scope_uri: str, version: int | None = None) -> str:
+        raw = f"{self.epoch}|{scope_uri}|{self.version if version is None else version}"
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    def _decode(self, scope_uri: str, cursor: str) -> int | None:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            epoch, cursor_scope, version = base64.urlsafe_b64decode(padded).decode().rsplit("|", 2)
+            version = int(version)
+        except (ValueError, UnicodeDecodeError):
+            return None
+        if epoch != self.epoch or cursor_scope != scope_uri:
+            return None
+        return version
+
+    def changes_since(self, scope_uri: str, cursor: str = "") -> dict[str, Any]:
+        """Alerts new, updated and expired in a scope since the cursor, plus the next cursor.
+
+        Each updated alert lists the fields that differ from the alert as of the
+        cursor under "changed". An empty, foreign or too-old cursor returns the
+        full current set as new with reset=True.
+        """
+        log = self._scopes.get(scope_uri) or _ScopeLog(self.max_entries_per_scope)
+        since = self._decode(scope_uri, cursor) if cursor else None
+
+        if since is None or since < log.floor_version:
+            return {
+                "cursor": self.cursor(scope_uri),
+                "reset": True,
+                "new": [alert.record(ALERT_DELTA_FIELDS) for _, alert in log.current.values()],
+                "updated": [],
+                "expired": [],
+            }
+
+        # Coalesce per alert: the first change decides new vs updated (and, for an
+        # update or an expiry it came back from, what the client last saw), the
+        # last one whether it expired
+        first_change: dict[str, tuple[str, CompactAlert | None]] = {}
+        last_change: dict[str, str] = {}
+        for version, change, alert_id, previous in log.entries:
+            if version <= since:
+                continue
+            first_change.setdefault(alert_id, (change, previous))
+            last_change[alert_id] = change
+
+        new, updated, expired = [], [], []
+        for alert_id, change in last_change.items():
+            first, previous = first_change[alert_id]
+            if change == "expired":
+                if first != "new":
+                    expired.append(alert_id)
+                continue
+            record = log.current[alert_id][1].record(ALERT_DELTA_FIELDS)
+            if first == "new" or previous is None:
+                new.append(record)
+            else:
+                seen = previous.record(ALERT_DELTA_FIELDS)
+                updated.append({**record, "changed": [field for field, value in record.items() if seen[field] != value]})
+
+        return {"cursor": self.cursor(scope_uri), "reset": False, "new": new, "updated": updated, "expired": expired}
+
+
+alert_log = AlertLog()
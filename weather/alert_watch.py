@@ -0,0 +1,328 @@
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Any
+from urllib.parse import urlparse
+
+import offload
+from alert_log import alert_log
+from compact_alerts import CompactAlert, compact_alerts, compact_feed
+from constants import (
+    ALERT_BATCH_MAX_AREAS,
+    ALERT_POINT_DECIMALS,
+    ALERT_POLL_SECONDS,
+    ALERT_SCOPE_IDLE_SECONDS,
+    ALERT_SCOPE_MAX_IDLE,
+    NWS_API_BASE,
+)
+from deadline import create_detached_task
+from geo import distance_to_geometry_km
+from utils import make_nws_request
+from zones import zone_index
+
+logger = logging.getLogger(__name__)
+
+# Alert fields carried by alert resources
+ALERT_RESOURCE_FIELDS = ("id", "event", "severity", "urgency", "area", "effective", "expires", "headline")
+
+
+class AlertScope:
+    """An area whose active alerts can be read and subscribed to.
+
+    Scopes are addressed by resource URIs:
+        alerts://state/{state}
+        alerts://zone/{zone}
+        alerts://point/{latitude}/{longitude}/{radius_km}
+    """
+
+    def __init__(self, kind: str, key: str, latitude: float = None, longitude: float = None,
+                 radius_km: float = None):
+        self.kind = kind
+        self.key = key
+        self.latitude = latitude
+        self.longitude = longitude
+        self.radius_km = radius_km
+
+    @property
+    def uri(self) -> str:
+        return f"alerts://{self.kind}/{self.key}"
+
+    @classmethod
+    def state(cls, state: str) -> "AlertScope":
+        return cls("state", state.upper())
+
+    @classmethod
+    def zone(cls, zone: str) -> "AlertScope":
+        return cls("zone", zone.upper())
+
+    @classmethod
+    def area(cls, area: str) -> "AlertScope":
+        """A state scope for a two-letter code, otherwise a zone scope."""
+        area = area.strip().upper()
+        return cls.state(area) if len(area) == 2 else cls.zone(area)
+
+    @classmethod
+    def point(cls, latitude: float, longitude: float, radius_km: float) -> "AlertScope":
+        # Rounded, so nearby points share one scope
+        latitude, longitude = round(float(latitude), ALERT_POINT_DECIMALS), round(float(longitude), ALERT_POINT_DECIMALS)
+        radius_km = round(float(radius_km), 1)
+        return cls("point", f"{latitude}/{longitude}/{radius_km:g}", latitude, longitude, radius_km)
+
+    @classmethod
+    def from_uri(cls, uri: str) -> "AlertScope":
+        parsed = urlparse(str(uri))
+        parts = [parsed.netloc] + [part for part in parsed.path.split("/") if part]
+        if parsed.scheme != "alerts" or not parts:
+            raise ValueError(f"Not an alert resource URI: {uri}")
+        if parts[0] == "state" and len(parts) == 2:
+            return cls.state(parts[1])
+        if parts[0] == "zone" and len(parts) == 2:
+            return cls.zone(parts[1])
+        if parts[0] == "point" and len(parts) == 4:
+            return cls.point(float(parts[1]), float(parts[2]), float(parts[3]))
+        raise ValueError(f"Unknown alert resource URI: {uri}")
+
+
+def _feature_near(feature: dict, scope: AlertScope, zone_codes: set[str]) -> bool:
+    # Alerts with polygons are matched geometrically (inside, or an edge within the
+    # radius), zone-based ones through their UGC codes
+    geometry = feature.get("geometry")
+    if geometry and geometry.get("coordinates"):
+        return distance_to_geometry_km(scope.latitude, scope.longitude, geometry) <= scope.radius_km
+    ugc = feature["properties"].get("geocode", {}).get("UGC", [])
+    return bool(zone_codes.intersection(ugc))
+
+
+async def fetch_scope_alerts(scope: AlertScope, national: dict | None = None) -> list[CompactAlert] | None:
+    """Fetch the active alerts for a scope as compact records, or None if NWS is unavailable.
+
+    Point scopes filter the national feed; pass it in to share one download across scopes.
+    """
+    if scope.kind == "state":
+        return await make_nws_request(f"{NWS_API_BASE}/alerts/active/area/{scope.key}", compact_feed)
+    if scope.kind == "zone":
+        return await make_nws_request(f"{NWS_API_BASE}/alerts/active/zone/{scope.key}", compact_feed)
+
+    data = national or await make_nws_request(f"{NWS_API_BASE}/alerts/active")
+    if not data or "features" not in data:
+        return None
+    zone_codes = {
+        code for code in (
+            zone_index.lookup(scope.latitude, scope.longitude, "county"),
+            zone_index.lookup(scope.latitude, scope.longitude, "forecast"),
+        ) if code
+    }
+    # Testing every national alert's geometry is bulk Python work; off the loop when large
+    return await offload.run_bulk(_near_alerts, data["features"], scope, zone_codes)
+
+
+def _near_alerts(features: list[dict], scope: AlertScope, zone_codes: set[str]) -> list[CompactAlert]:
+    return compact_alerts(feature for feature in features if _feature_near(feature, scope, zone_codes))
+
+
+def _batch_matches(alert: CompactAlert, scope: AlertScope) -> bool:
+    return alert.affects_state(scope.key) if scope.kind == "state" else alert.affects_zone(scope.key)
+
+
+async def fetch_scopes_alerts(scopes: list[AlertScope]) -> dict[str, list[CompactAlert] | None]:
+    """Fetch several state and zone scopes with as few requests as NWS allows.
+
+    States go in batched area= queries and zones in batched zone= queries;
+    the combined results are split back per scope by the alerts' UGC codes.
+    Returns alerts (or None if NWS is unavailable) by scope URI.
+    """
+    batches = []
+    for kind, param in (("state", "area"), ("zone", "zone")):
+        keyed = [scope for scope in scopes if scope.kind == kind]
+        for start in range(0, len(keyed), ALERT_BATCH_MAX_AREAS):
+            batches.append((param, keyed[start:start + ALERT_BATCH_MAX_AREAS]))
+
+    responses = await asyncio.gather(*(
+        make_nws_request(f"{NWS_API_BASE}/alerts/active?{param}={','.join(scope.key for scope in batch)}", compact_feed)
+        for param, batch in batches
+    ))
+
+    results = {}
+    for (_, batch), alerts in zip(batches, responses):
+        for scope in batch:
+            results[scope.uri] = None if alerts is None else [
+                alert for alert in alerts if _batch_matches(alert, scope)
+            ]
+    return results
+
+
+def alert_set_fingerprint(alerts: list[CompactAlert]) -> str:
+    """Stable digest of an alert set; changes when alerts are added, updated or expire."""
+    keys = sorted(f"{alert.id}@{alert.sent or ''}" for alert in alerts)
+    return hashlib.sha1("\n".join(keys).encode()).hexdigest()
+
+
+class AlertWatcher:
+    """Polls subscribed alert scopes once per interval, however many clients subscribe,
+    and notifies subscribed sessions only when a scope's alert set changes.
+
+    Also serves reads of recently fetched scopes, which are recorded in the alert log.
+    """
+
+    def __init__(self, poll_seconds: float = ALERT_POLL_SECONDS, idle_seconds: float = ALERT_SCOPE_IDLE_SECONDS,
+                 max_idle_scopes: int = ALERT_SCOPE_MAX_IDLE):
+        self.poll_seconds = poll_seconds
+        self.idle_seconds = idle_seconds
+        self.max_idle_scopes = max_idle_scopes
+        # Subscribed sessions per scope URI, each with the URIs it subscribed under
+        # (e.g. alerts://state/ks for alerts://state/KS), which its notifications use
+        self.subscribers: dict[str, dict[Any, set[str]]] = {}
+        self.scopes: dict[str, AlertScope] = {}
+        # Last alert set per scope URI, in the order they were fetched
+        self.snapshots: dict[str, tuple[float, str, list[CompactAlert]]] = {}
+        self._task: asyncio.Task | None = None
+
+    def subscribe(self, uri: str, session: Any) -> AlertScope:
+        scope = AlertScope.from_uri(uri)
+        self.scopes[scope.uri] = scope
+        self.subscribers.setdefault(scope.uri, {}).setdefault(session, set()).add(uri)
+        if self._task is None or self._task.done():
+            self._task = create_detached_task(self._poll_loop())
+        return scope
+
+    def unsubscribe(self, uri: str, session: Any) -> None:
+        scope_uri = AlertScope.from_uri(uri).uri
+        sessions = self.subscribers.get(scope_uri)
+        if sessions is None or session not in sessions:
+            return
+        uris = sessions[session]
+        if uri in uris:
+            uris.discard(uri)
+        else:
+            # Unsubscribing under a URI the session did not subscribe with still ends its subscription
+            uris.clear()
+        if not uris:
+            del sessions[session]
+        if not sessions:
+            self._drop(scope_uri)
+
+    def _drop(self, scope_uri: str) -> None:
+        # The snapshot and change log stay until the scope has been idle too long
+        self.subscribers.pop(scope_uri, None)
+        self.scopes.pop(scope_uri, None)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def read(self, scope: AlertScope) -> list[CompactAlert] | None:
+        """Current alerts for a scope, served from the last poll when it is fresh enough."""
+        snapshot = self.snapshots.get(scope.uri)
+        if snapshot and time.time() - snapshot[0] < self.poll_seconds:
+            return snapshot[2]
+        alerts = await fetch_scope_alerts(scope)
+        if alerts is not None:
+            self._record(scope, alerts)
+        return alerts
+
+    async def read_many(self, scopes: list[AlertScope]) -> dict[str, list[CompactAlert] | None]:
+        """Current alerts for several state/zone scopes by URI, fetching only stale ones, in batches."""
+        results, stale = {}, []
+        for scope in scopes:
+            snapshot = self.snapshots.get(scope.uri)
+            if snapshot and time.time() - snapshot[0] < self.poll_seconds:
+                results[scope.uri] = snapshot[2]
+            elif scope.uri not in results:
+                results[scope.uri] = None
+                stale.append(scope)
+
+        if stale:
+            fetched = await fetch_scopes_alerts(stale)
+            for scope in stale:
+                alerts = fetched.get(scope.uri)
+                if alerts is not None:
+                    self._record(scope, alerts)
+                results[scope.uri] = alerts
+        return results
+
+    def fingerprint(self, scope: AlertScope) -> str | None:
+        """Fingerprint of the scope's last fetched alert set, or None if it was never fetched."""
+        snapshot = self.snapshots.get(scope.uri)
+        return snapshot[1] if snapshot else None
+
+    def _record(self, scope: AlertScope, alerts: list[CompactAlert]) -> tuple[float, str, list[CompactAlert]] | None:
+        # Every fetched alert set also feeds the versioned change log behind get_alert_changes
+        previous = self.snapshots.pop(scope.uri, None)
+        self.snapshots[scope.uri] = (time.time(), alert_set_fingerprint(alerts), alerts)
+        alert_log.ingest(scope.uri, alerts)
+        self._evict_idle()
+        return previous
+
+    def _evict_idle(self) -> None:
+        """Forget unsubscribed scopes fetched too long ago, or beyond the most kept."""
+        idle = [scope_uri for scope_uri in self.snapshots if scope_uri not in self.scopes]
+        cutoff = time.time() - self.idle_seconds
+        excess = len(idle) - self.max_idle_scopes
+        for scope_uri in idle:
+            # Oldest first: a scope moves to the end each time it is fetched
+            if excess <= 0 and self.snapshots[scope_uri][0] >= cutoff:
+                break
+            del self.snapshots[scope_uri]
+            alert_log.forget(scope_uri)
+            excess -= 1
+
+    async def poll_once(self) -> list[str]:
+        """Refresh every subscribed scope and notify on changes. Returns the changed URIs."""
+        scopes = list(self.scopes.values())
+        national = None
+        if any(scope.kind == "point" for scope in scopes):
+            national = await make_nws_request(f"{NWS_API_BASE}/alerts/active")
+
+        changed = []
+        for scope in scopes:
+            alerts = await fetch_scope_alerts(scope, national)
+            if alerts is None:
+                continue  # Keep the previous snapshot while NWS is unavailable
+            previous = self._record(scope, alerts)
+            if previous is not None and previous[1] != self.snapshots[scope.uri][1]:
+                changed.append(scope.uri)
+                await self._notify(scope.uri)
+        return changed
+
+    async def _notify(self, scope_uri: str) -> None:
+        for session, uris in list(self.subscribers.get(scope_uri, {}).items()):
+            try:
+                for uri in list(uris):
+                    await session.send_resource_updated(uri)
+            except Exception:
+                # The session has gone away; stop tracking it
+                logger.debug("Dropping alert subscriber for %s", scope_uri)
+                self.subscribers[scope_uri].pop(session, None)
+        if scope_uri in self.subscribers and not self.subscribers[scope_uri]:
+            self._drop(scope_uri)
+
+    async def _poll_loop(self) -> None:
+        while self.scopes:
+            try:
+                await self.poll_once()
+            except Exception:
+                logger.exception("Alert subscription poll failed")
+            await asyncio.sleep(self.poll_seconds)
+
+
+alert_watcher = AlertWatcher()
+
+
+def enable_resource_subscriptions(mcp) -> None:
+    """Advertise the resources.subscribe capability, which FastMCP does not set itself."""
+    server = mcp._mcp_server
+    get_capabilities = server.get_capabilities
+
+    def get_capabilities_with_subscribe(*args, **kwargs):
+        capabilities = get_capabilities(*args, **kwargs)
+        if capabilities.resources is not None:
+            capabilities.resources.subscribe = True
+        return capabilities
+
+    server.get_capabilities = get_capabilities_with_subscribe
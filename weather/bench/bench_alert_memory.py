@@ -0,0 +1,60 @@
+"""Alert store memory benchmark: raw GeoJSON features vs compact records.
+
+Decodes the canned national alert feed (see fixtures.py) from JSON, as it
+arrives from NWS, and reports the memory retained by the raw features and
+by the equivalent CompactAlert records, plus the cost of filtering each.
+
+Usage (from the weather/ directory):
+    python bench/bench_alert_memory.py [--copies N]
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from fixtures import NATIONAL_ALERTS
+
+from compact_alerts import AlertFlag, compact_alerts
+
+
+def retained(build) -> tuple[object, int]:
+    gc.collect()
+    tracemalloc.start()
+    value = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return value, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--copies", type=int, default=10, help="Copies of the 200-alert feed to hold")
+    args = parser.parse_args()
+
+    payload = json.dumps(NATIONAL_ALERTS)
+    features, raw_bytes = retained(lambda: [f for _ in range(args.copies) for f in json.loads(payload)["features"]])
+
+    def build_compact():
+        return [a for _ in range(args.copies) for a in compact_alerts(json.loads(payload)["features"])]
+
+    alerts, compact_bytes = retained(build_compact)
+
+    started = time.perf_counter()
+    raw_hits = sum(1 for f in features if "tornado" in f["properties"].get("event", "").lower())
+    raw_ms = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    compact_hits = sum(1 for a in alerts if a.flags & AlertFlag.TORNADO)
+    compact_ms = (time.perf_counter() - started) * 1000
+    assert raw_hits == compact_hits
+
+    print(f"{len(features)} alerts")
+    print(f"{'store':<10}{'bytes':>12}{'per alert':>12}{'filter ms':>12}")
+    print(f"{'raw':<10}{raw_bytes:>12,}{raw_bytes // len(features):>12,}{raw_ms:>12.2f}")
+    print(f"{'compact':<10}{compact_bytes:>12,}{compact_bytes // len(alerts):>12,}{compact_ms:>12.2f}")
+    print(f"reduction: {raw_bytes / compact_bytes:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Output size benchmark: text vs compact mode.
+
+Calls every registered tool against canned NWS payloads (see fixtures.py)
+in both output modes and reports the response size in bytes per tool.
+
+Usage (from the weather/ directory):
+    python bench/bench_output_size.py
+"""
+import asyncio
+
+from fixtures import LATITUDE, LONGITUDE, install_fake_nws
+
+install_fake_nws()
+
+from mcp.server.fastmcp import FastMCP
+
+from output import output_mode_override
+from tools import TOOL_PROFILES, register_tool_profile
+
+TOOL_ARGS = {
+    "get_alerts": {"state": "KS"},
+    "get_storm_reports": {"state": "KS"},
+    "get_alert_changes": {"area": "KS"},
+    "get_alerts_batch": {"areas": ["KS", "MO", "NE", "KSC201"]},
+    "get_storm_reports_batch": {"states": ["KS", "MO", "NE", "OK", "TX"]},
+    "get_satellite_imagery": {"region": "conus"},
+    "get_weather_summary": {"location_name": "Topeka, KS"},
+    "get_weather_with_context": {"latitude": LATITUDE, "longitude": LONGITUDE, "context": "hiking"},
+    "check_weather_service_status": {},
+    "get_route_weather": {"waypoints": [[39.05, -95.68], [39.10, -94.58]], "hours": 6},
+    # The canned hourly forecast has 12-hour periods, so only 1-hour windows fit
+    "find_best_weather_window": {"locations": [[39.05, -95.68], [39.10, -94.58]], "duration_hours": 1},
+}
+
+
+async def call(mcp: FastMCP, name: str, mode: str) -> int:
+    token = output_mode_override.set(mode)
+    try:
+        content = await mcp.call_tool(name, TOOL_ARGS.get(name, {"latitude": LATITUDE, "longitude": LONGITUDE}))
+    finally:
+        output_mode_override.reset(token)
+    return sum(len(item.text.encode("utf-8")) for item in content)
+
+
+async def main() -> None:
+    mcp = FastMCP("weather-bench")
+    register_tool_profile(mcp, "full")
+
+    print(f"{'tool':32s} {'text B':>9s} {'compact B':>10s} {'saved':>7s}")
+    total_text = total_compact = 0
+    for tool in mcp._tool_manager.list_tools():
+        text_bytes = await call(mcp, tool.name, "text")
+        compact_bytes = await call(mcp, tool.name, "compact")
+        total_text += text_bytes
+        total_compact += compact_bytes
+        saved = 1 - compact_bytes / text_bytes if text_bytes else 0.0
+        print(f"{tool.name:32s} {text_bytes:9d} {compact_bytes:10d} {saved:7.1%}")
+
+    print(f"{'TOTAL':32s} {total_text:9d} {total_compact:10d} {1 - total_compact / total_text:7.1%}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,96 @@
+"""Server startup benchmark.
+
+Runs `python -X importtime -c "import server"` in fresh interpreters and
+reports the median cumulative import time of the server and of each
+project module, plus which project modules were deferred until first use.
+
+Usage (from the weather/ directory):
+    python bench/bench_startup.py [--runs N] [--top N]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+WEATHER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_MODULES = sorted(
+    [name[:-3] for name in os.listdir(WEATHER_DIR) if name.endswith(".py") and name not in ("main.py", "__init__.py")]
+    + ["tools." + name[:-3] for name in os.listdir(os.path.join(WEATHER_DIR, "tools"))
+       if name.endswith(".py") and name != "__init__.py"]
+    + ["tools"]
+)
+
+
+# Lazily imported modules sit in sys.modules as placeholders until first use,
+# so report a module as loaded only once its body has actually executed.
+SNIPPET = f"""
+import importlib.util, json, sys
+import server
+loaded = [name for name in {PROJECT_MODULES!r}
+          if name in sys.modules and not isinstance(sys.modules[name], importlib.util._LazyModule)]
+print(json.dumps(loaded))
+"""
+
+
+def run_once() -> tuple[float, dict[str, int], list[str]]:
+    """Import the server in a fresh interpreter.
+
+    Returns wall seconds, cumulative import microseconds per module and the
+    project modules whose bodies ran during startup.
+    """
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", SNIPPET],
+        cwd=WEATHER_DIR, capture_output=True, text=True, check=True,
+    )
+    elapsed = time.perf_counter() - started
+
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        try:
+            cumulative[parts[2].strip()] = int(parts[1])
+        except ValueError:
+            continue  # header line
+    return elapsed, cumulative, json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    walls, samples = [], []
+    for _ in range(args.runs):
+        elapsed, cumulative, loaded = run_once()
+        walls.append(elapsed)
+        samples.append(cumulative)
+
+    def median_us(module: str) -> int:
+        return int(statistics.median(sample.get(module, 0) for sample in samples))
+
+    print(f"Startup benchmark ({args.runs} runs, median)")
+    print(f"  process wall time:     {statistics.median(walls) * 1000:8.1f} ms")
+    print(f"  import server:         {median_us('server') / 1000:8.1f} ms")
+    print(f"  import mcp (framework):{median_us('mcp') / 1000:8.1f} ms")
+    print(f"  server-owned time:     {(median_us('server') - median_us('mcp')) / 1000:8.1f} ms")
+
+    deferred = [module for module in PROJECT_MODULES if module not in loaded]
+
+    print(f"\nProject modules loaded at startup (top {args.top} by import time where reported):")
+    for module in sorted(loaded, key=median_us, reverse=True)[:args.top]:
+        print(f"  {module:40s} {median_us(module) / 1000:8.2f} ms")
+
+    print("\nProject modules deferred until first tool call:")
+    for module in deferred:
+        print(f"  {module}")
+
+
+if __name__ == "__main__":
+    main()
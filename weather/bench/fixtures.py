@@ -0,0 +1,201 @@
+"""Canned NWS API payloads for offline benchmarks.
+
+install_fake_nws() swaps utils.make_nws_request for a canned responder and
+must run before any tool module is imported, since tool modules bind the
+function at import time.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from constants import NWS_API_BASE
+
+LATITUDE, LONGITUDE = 39.7456, -97.0892
+
+POINTS = {
+    "properties": {
+        "cwa": "TOP",
+        "gridId": "TOP",
+        "gridX": 32,
+        "gridY": 81,
+        "timeZone": "America/Chicago",
+        "forecast": f"{NWS_API_BASE}/gridpoints/TOP/32,81/forecast",
+        "forecastHourly": f"{NWS_API_BASE}/gridpoints/TOP/32,81/forecast/hourly",
+        "county": f"{NWS_API_BASE}/zones/county/KSC201",
+        "forecastZone": f"{NWS_API_BASE}/zones/forecast/KSZ009",
+        "observationStations": f"{NWS_API_BASE}/gridpoints/TOP/32,81/stations",
+    }
+}
+
+_NAMES = ["Today", "Tonight", "Monday", "Monday Night", "Tuesday", "Tuesday Night", "Wednesday",
+          "Wednesday Night", "Thursday", "Thursday Night", "Friday", "Friday Night", "Saturday",
+          "Saturday Night"]
+_SKIES = ["Sunny", "Chance Rain Showers", "Mostly Cloudy", "Snow Likely", "Patchy Fog", "Clear"]
+
+FORECAST = {
+    "properties": {
+        "periods": [
+            {
+                "number": i + 1,
+                "name": name,
+                "startTime": f"2026-10-{19 + i // 2:02d}T{6 if i % 2 == 0 else 18:02d}:00:00-05:00",
+                "isDaytime": i % 2 == 0,
+                "temperature": 30 + (i * 7) % 60,
+                "temperatureUnit": "F",
+                "windSpeed": f"{5 + (i * 4) % 30} mph",
+                "windDirection": "SW",
+                "shortForecast": _SKIES[i % len(_SKIES)],
+                "detailedForecast": f"{_SKIES[i % len(_SKIES)]}. High near {30 + (i * 7) % 60}, "
+                                    f"with winds around {5 + (i * 4) % 30} mph gusting higher at times.",
+            }
+            for i, name in enumerate(_NAMES)
+        ]
+    }
+}
+
+_EVENTS = ["Tornado Warning", "Severe Thunderstorm Warning", "Flood Warning", "Winter Storm Watch",
+           "Wind Advisory", "Dense Fog Advisory", "Special Weather Statement"]
+_SEVERITIES = ["Extreme", "Severe", "Moderate", "Minor"]
+
+
+def _alert(i: int, state: str = "KS") -> dict:
+    event = _EVENTS[i % len(_EVENTS)]
+    return {
+        "id": f"urn:oid:2.49.0.1.840.0.{i:06d}",
+        "geometry": {"type": "Polygon", "coordinates": [[[-97.5, 39.5], [-96.5, 39.5], [-96.5, 40.0], [-97.5, 39.5]]]},
+        "properties": {
+            "id": f"urn:oid:2.49.0.1.840.0.{i:06d}",
+            "areaDesc": f"Washington, KS; Marshall, KS; Clay County {i % 5}, {state}",
+            "geocode": {"UGC": [f"{state}C{201 + i % 5:03d}"], "SAME": [f"0{20201 + i % 5}"]},
+            "sent": "2026-10-19T12:00:00-05:00",
+            "effective": "2026-10-19T12:00:00-05:00",
+            "onset": "2026-10-19T13:00:00-05:00",
+            "expires": "2026-10-19T20:00:00-05:00",
+            "status": "Actual",
+            "messageType": "Alert",
+            "severity": _SEVERITIES[i % len(_SEVERITIES)],
+            "certainty": "Likely",
+            "urgency": "Expected",
+            "event": event,
+            "senderName": "NWS Topeka KS",
+            "headline": f"{event} issued October 19 at 12:00PM CDT until October 19 at 8:00PM CDT by NWS Topeka KS",
+            "description": ("* WHAT...Hazardous conditions expected. Travel could be very difficult. "
+                            "* WHERE...Portions of north central Kansas. "
+                            "* WHEN...Until 8 PM CDT this evening. "
+                            "* IMPACTS...Plan on slippery road conditions and reduced visibility. ") * 3,
+            "instruction": "Slow down and use caution while traveling. Monitor later forecasts.",
+        },
+    }
+
+
+ALERTS = {"features": [_alert(i) for i in range(12)]}
+NATIONAL_ALERTS = {"features": [_alert(i, state) for i, state in enumerate(["KS", "MO", "NE", "OK", "TX"] * 40)]}
+
+RADAR_STATIONS = {
+    "features": [
+        {
+            "geometry": {"type": "Point", "coordinates": [lon, lat]},
+            "properties": {"id": ident, "name": name, "stationType": "WSR-88D"},
+        }
+        # The first three are moved to within the default 50 km search radius of LATITUDE, LONGITUDE
+        for ident, name, lat, lon in [
+            ("KTWX", "Topeka", 39.5500, -96.8000),
+            ("KUEX", "Hastings", 40.0500, -97.4500),
+            ("KICT", "Wichita", 39.4000, -97.3000),
+            ("KEAX", "Kansas City", 38.8102, -94.2645),
+            ("KOAX", "Omaha", 41.3203, -96.3668),
+        ]
+    ]
+}
+
+OBSERVATION_STATIONS = {
+    "features": [
+        {
+            "geometry": {"type": "Point", "coordinates": [lon, lat]},
+            "properties": {"stationIdentifier": ident, "name": name, "timeZone": "America/Chicago"},
+        }
+        for ident, name, lat, lon in [
+            ("KCNK", "Concordia, Blosser Municipal Airport", 39.5514, -97.6508),
+            ("KMYZ", "Marysville Municipal Airport", 39.8553, -96.6306),
+            ("KMHK", "Manhattan Regional Airport", 39.1410, -96.6708),
+        ]
+    ]
+}
+
+
+def _observation(hours_ago: int) -> dict:
+    from datetime import datetime, timedelta, timezone
+
+    stamp = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0) - timedelta(hours=hours_ago)
+    return {
+        "properties": {
+            "timestamp": stamp.isoformat(),
+            "textDescription": ["Clear", "Partly Cloudy", "Mostly Cloudy"][hours_ago % 3],
+            "temperature": {"unitCode": "wmoUnit:degC", "value": 12.0 - 0.5 * hours_ago},
+            "dewpoint": {"unitCode": "wmoUnit:degC", "value": 4.0},
+            "relativeHumidity": {"unitCode": "wmoUnit:percent", "value": 58.3},
+            "windDirection": {"unitCode": "wmoUnit:degree_(angle)", "value": 200},
+            "windSpeed": {"unitCode": "wmoUnit:km_h-1", "value": 18.36},
+            "windGust": {"unitCode": "wmoUnit:km_h-1", "value": None},
+            "barometricPressure": {"unitCode": "wmoUnit:Pa", "value": 101700 - 40 * hours_ago},
+            "visibility": {"unitCode": "wmoUnit:m", "value": 16090},
+        }
+    }
+
+
+OBSERVATIONS = {"features": [_observation(hours_ago) for hours_ago in range(24)]}
+
+
+async def fake_nws_request(url: str, transform=None):
+    """Answer NWS API URLs from the canned payloads above."""
+    payload = _payload(url)
+    return transform(payload) if transform is not None and payload is not None else payload
+
+
+def _points(url: str) -> dict:
+    """POINTS for the default location; elsewhere, one gridpoint per 0.025° square
+    (about an NWS grid cell) and one county per half degree, so routes cross several."""
+    latitude, longitude = map(float, url.rsplit("/", 1)[1].split(","))
+    if (latitude, longitude) == (LATITUDE, LONGITUDE):
+        return POINTS
+    grid_x, grid_y = int(longitude // 0.025) % 1000, int(latitude // 0.025) % 1000
+    county = f"KSC{int(latitude // 0.5 + longitude // 0.5) % 1000:03d}"
+    gridpoint = f"{NWS_API_BASE}/gridpoints/TOP/{grid_x},{grid_y}"
+    properties = {
+        **POINTS["properties"],
+        "gridX": grid_x,
+        "gridY": grid_y,
+        "forecast": f"{gridpoint}/forecast",
+        "forecastHourly": f"{gridpoint}/forecast/hourly",
+        "county": f"{NWS_API_BASE}/zones/county/{county}",
+    }
+    return {"properties": properties}
+
+
+def _payload(url: str):
+    if "/points/" in url:
+        return _points(url)
+    if "/observations/latest" in url:
+        return OBSERVATIONS["features"][0]
+    if "/observations" in url:
+        return OBSERVATIONS
+    if "/stations?" in url or url.endswith("/stations") and "/radar/" not in url:
+        return OBSERVATION_STATIONS
+    if "/forecast" in url:
+        return FORECAST
+    if "/radar/stations" in url:
+        return RADAR_STATIONS
+    if "/zones?" in url:
+        return {"features": []}
+    if "/alerts/active/zone/" in url or "/alerts/active/area/" in url:
+        return ALERTS
+    if "/alerts/active" in url:
+        return NATIONAL_ALERTS
+    return None
+
+
+def install_fake_nws() -> None:
+    import utils
+
+    utils.make_nws_request = fake_nws_request
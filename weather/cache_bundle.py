@@ -0,0 +1,118 @@
+import gzip
+import json
+import logging
+import math
+import os
+import time
+from pathlib import Path
+
+from constants import CACHE_BUNDLE_ENV, CACHE_BUNDLE_PIN_ENV
+from radar_stations import radar_station_index
+from snapshot import cached_snapshots, get_snapshot
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_VERSION = 1
+
+
+def bundle_path() -> Path | None:
+    """The configured cache bundle path, if any."""
+    configured = os.environ.get(CACHE_BUNDLE_ENV, "").strip()
+    return Path(configured).expanduser() if configured else None
+
+
+def bundle_pinned() -> bool:
+    return os.environ.get(CACHE_BUNDLE_PIN_ENV, "").strip().lower() in ("1", "true", "yes")
+
+
+def export_bundle(path: Path) -> dict[str, int]:
+    """Write the location snapshots and radar station catalog to a gzipped JSON bundle.
+
+    Each cached value carries its wall-clock expiry so a later import can
+    honor the remaining TTL. Returns counts of what was written.
+    """
+    locations = []
+    for location in cached_snapshots():
+        facets = location.export_facets()
+        if facets:
+            locations.append({
+                "latitude": location.latitude,
+                "longitude": location.longitude,
+                "facets": {
+                    name: {"expires_at": round(expires_at, 3), "value": value}
+                    for name, (expires_at, value) in facets.items()
+                },
+            })
+
+    bundle = {"version": BUNDLE_VERSION, "created_at": time.time(), "locations": locations}
+    if radar_station_index.features:
+        bundle["radar_stations"] = {
+            "loaded_at": radar_station_index.loaded_at,
+            "features": radar_station_index.features,
+        }
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        json.dump(bundle, f, separators=(",", ":"), ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+    return {"locations": len(locations), "radar_stations": len(radar_station_index.features)}
+
+
+def import_bundle(path: Path, pinned: bool = False) -> dict[str, int]:
+    """Seed the caches from a bundle written by export_bundle.
+
+    Expired values are skipped unless pinned is set, in which case every
+    value is kept and never expires, so an offline or test deployment can be
+    served entirely from the bundle. Must be called with the event loop running.
+    Returns counts of what was loaded.
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        bundle = json.load(f)
+    if bundle.get("version") != BUNDLE_VERSION:
+        raise ValueError(f"Unsupported cache bundle version: {bundle.get('version')!r}")
+
+    now = time.time()
+    facet_count = 0
+    for entry in bundle.get("locations", []):
+        location = get_snapshot(entry["latitude"], entry["longitude"], track=False)
+        for name, facet in entry["facets"].items():
+            expires_at = math.inf if pinned else facet["expires_at"]
+            if expires_at > now:
+                location.seed(name, facet["value"], expires_at)
+                facet_count += 1
+
+    radar = bundle.get("radar_stations")
+    if radar and radar.get("features"):
+        # A pinned catalog counts as freshly loaded; otherwise it ages from its original load
+        radar_station_index.load(radar["features"], loaded_at=now if pinned else radar["loaded_at"])
+
+    return {
+        "facets": facet_count,
+        "radar_stations": len(radar["features"]) if radar else 0,
+    }
+
+
+def load_configured_bundle() -> None:
+    """Import the bundle named by WEATHER_CACHE_BUNDLE, if it exists."""
+    path = bundle_path()
+    if path is None or not path.exists():
+        return
+    try:
+        counts = import_bundle(path, pinned=bundle_pinned())
+        logger.info("Loaded cache bundle %s: %s", path, counts)
+    except (OSError, ValueError, KeyError, TypeError):
+        logger.warning("Ignoring unreadable cache bundle at %s", path)
+
+
+def save_configured_bundle() -> None:
+    """Export to the bundle named by WEATHER_CACHE_BUNDLE, if one is configured."""
+    path = bundle_path()
+    if path is None:
+        return
+    try:
+        counts = export_bundle(path)
+        logger.info("Saved cache bundle %s: %s", path, counts)
+    except OSError:
+        logger.warning("Could not write cache bundle to %s", path)
@@ -0,0 +1,157 @@
+import heapq
+import itertools
+import os
+import sys
+from typing import Any, Callable, Hashable
+
+from constants import CACHE_MEMORY_BUDGET_BYTES, CACHE_MEMORY_ENV, CACHE_MIN_COST_SECONDS
+
+
+def approx_size(value: Any) -> int:
+    """Rough in-memory footprint of decoded JSON data, in bytes.
+
+    Dict keys are left out: the JSON decoder shares one key object per name.
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for item in value.values():
+            size += approx_size(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            size += approx_size(item)
+    return size
+
+
+class _Entry:
+    __slots__ = ("size", "cost", "hits", "priority")
+
+    def __init__(self, size: int, cost: float, hits: int):
+        self.size = size
+        self.cost = cost
+        self.hits = hits
+        self.priority = 0.0
+
+
+class CacheManager:
+    """One memory budget shared by the server's caches, with cost-aware eviction.
+
+    Caches report each entry's approximate size in bytes and the seconds it
+    took to produce (a fetch or render), and every read that reuses it. Once
+    the total goes over budget, the entry with the lowest Greedy-Dual-Size-
+    Frequency priority is evicted from whichever cache holds it:
+
+        priority = clock + hits * cost / size
+
+    The clock rises to each evicted priority, so entries that stop being used
+    age out, while small, popular and slow-to-refetch ones are kept longest.
+
+    The location snapshot ("snapshot"), rendered-result ("render") and image
+    ("images") caches are registered. Alert scope snapshots and the alert log,
+    observation buffers, the zone and radar station indexes and the alert
+    aggregates are not counted against the budget.
+    """
+
+    def __init__(self, budget_bytes: int = CACHE_MEMORY_BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+        self.bytes = 0
+        self.clock = 0.0
+        self._evictors: dict[str, Callable[[Hashable], None]] = {}
+        self._cache_stats: dict[str, Callable[[], dict[str, Any]] | None] = {}
+        self._occupancy: dict[str, dict[str, int]] = {}
+        self._entries: dict[tuple[str, Hashable], _Entry] = {}
+        # Min-heap of (priority, sequence, cache, key); outdated items are skipped when popped
+        self._heap: list[tuple[float, int, str, Hashable]] = []
+        self._sequence = itertools.count()
+
+    def register(self, cache: str, evict: Callable[[Hashable], None],
+                 stats: Callable[[], dict[str, Any]] | None = None) -> None:
+        """Add a cache: evict(key) must drop the entry; stats() adds the cache's own counters."""
+        self._evictors[cache] = evict
+        self._cache_stats[cache] = stats
+        self._occupancy.setdefault(cache, {"entries": 0, "bytes": 0, "evictions": 0})
+
+    def put(self, cache: str, key: Hashable, size: int, cost: float) -> None:
+        """Account for a new or replaced entry, evicting others if over budget.
+
+        A replaced entry keeps its hit count. An entry larger than the whole
+        budget is evicted straight away.
+        """
+        previous = self._remove(cache, key)
+        entry = _Entry(size, max(cost, CACHE_MIN_COST_SECONDS), previous.hits if previous else 1)
+        self._entries[cache, key] = entry
+        occupancy = self._occupancy[cache]
+        occupancy["entries"] += 1
+        occupancy["bytes"] += size
+        self.bytes += size
+
+        if size > self.budget_bytes:
+            self._evict(cache, key)
+            return
+        self._push(cache, key, entry)
+        self._enforce()
+
+    def resize(self, cache: str, key: Hashable, size: int) -> None:
+        """Account for an entry that grew or shrank in place."""
+        entry = self._entries.get((cache, key))
+        if entry is not None:
+            self.put(cache, key, size, entry.cost)
+
+    def hit(self, cache: str, key: Hashable) -> None:
+        """Record a read served from the entry."""
+        entry = self._entries.get((cache, key))
+        if entry is not None:
+            entry.hits += 1
+            self._push(cache, key, entry)
+
+    def discard(self, cache: str, key: Hashable) -> None:
+        """Stop accounting for an entry the cache dropped by itself."""
+        self._remove(cache, key)
+
+    def _remove(self, cache: str, key: Hashable) -> _Entry | None:
+        entry = self._entries.pop((cache, key), None)
+        if entry is not None:
+            occupancy = self._occupancy[cache]
+            occupancy["entries"] -= 1
+            occupancy["bytes"] -= entry.size
+            self.bytes -= entry.size
+        return entry
+
+    def _push(self, cache: str, key: Hashable, entry: _Entry) -> None:
+        entry.priority = self.clock + entry.hits * entry.cost / max(entry.size, 1)
+        heapq.heappush(self._heap, (entry.priority, next(self._sequence), cache, key))
+        if len(self._heap) > 2 * len(self._entries) + 1024:
+            # Mostly outdated items; rebuild from the live entries
+            self._heap = [
+                (live.priority, next(self._sequence), *live_key)
+                for live_key, live in self._entries.items()
+            ]
+            heapq.heapify(self._heap)
+
+    def _enforce(self) -> None:
+        while self.bytes > self.budget_bytes and self._heap:
+            priority, _, cache, key = heapq.heappop(self._heap)
+            entry = self._entries.get((cache, key))
+            if entry is None or entry.priority != priority:
+                continue
+            self.clock = priority
+            self._evict(cache, key)
+
+    def _evict(self, cache: str, key: Hashable) -> None:
+        self._remove(cache, key)
+        self._occupancy[cache]["evictions"] += 1
+        self._evictors[cache](key)
+
+    def stats(self) -> dict[str, Any]:
+        caches = {}
+        for cache, occupancy in self._occupancy.items():
+            own = self._cache_stats[cache]
+            caches[cache] = {**occupancy, **(own() if own else {})}
+        return {"budget_bytes": self.budget_bytes, "bytes": self.bytes, "caches": caches}
+
+
+def _configured_budget() -> int:
+    configured = os.environ.get(CACHE_MEMORY_ENV)
+    return int(float(configured) * 1024 * 1024) if configured else CACHE_MEMORY_BUDGET_BYTES
+
+
+cache_manager = CacheManager(_configured_budget())
@@ -0,0 +1,209 @@
+import sys
+from enum import IntEnum
+from functools import lru_cache
+from typing import Any, Iterable
+
+
+class _Level(IntEnum):
+    """CAP vocabulary value stored as a small int; MISSING means the field was absent."""
+
+    @classmethod
+    def parse(cls, value: str | None) -> "_Level":
+        if not value:
+            return cls.MISSING
+        return cls.__members__.get(value.upper(), cls.UNKNOWN)
+
+    @property
+    def label(self) -> str | None:
+        return None if self is self.MISSING else self.name.title()
+
+
+# Ordered so that a larger value is more severe / urgent / certain
+class Severity(_Level):
+    MISSING = 0
+    UNKNOWN = 1
+    MINOR = 2
+    MODERATE = 3
+    SEVERE = 4
+    EXTREME = 5
+
+
+class Urgency(_Level):
+    MISSING = 0
+    UNKNOWN = 1
+    PAST = 2
+    FUTURE = 3
+    EXPECTED = 4
+    IMMEDIATE = 5
+
+
+class Certainty(_Level):
+    MISSING = 0
+    UNKNOWN = 1
+    UNLIKELY = 2
+    POSSIBLE = 3
+    LIKELY = 4
+    OBSERVED = 5
+
+
+class AlertFlag:
+    """Event classification bits, so alert filtering is plain integer tests."""
+    TORNADO = 1 << 0
+    THUNDERSTORM = 1 << 1  # Including hail
+    FLOOD = 1 << 2
+    WINTER = 1 << 3
+    WARNING = 1 << 4
+    WATCH = 1 << 5
+    ADVISORY = 1 << 6
+    SEVERE = 1 << 7  # One of SEVERE_EVENTS
+    HAS_GEOMETRY = 1 << 8  # The alert carries a polygon
+
+
+# Events tracked by track_severe_weather (matched as substrings of the event name)
+SEVERE_EVENTS = (
+    "Tornado Warning", "Tornado Watch", "Severe Thunderstorm Warning",
+    "Severe Thunderstorm Watch", "Flash Flood Warning", "Flood Warning",
+    "High Wind Warning", "Hurricane Warning", "Hurricane Watch",
+    "Blizzard Warning", "Ice Storm Warning", "Freezing Rain Advisory",
+)
+
+
+# Storm categories in precedence order, then "other"
+STORM_CATEGORIES = (
+    (AlertFlag.TORNADO, "tornado"),
+    (AlertFlag.THUNDERSTORM, "severe_thunderstorm"),
+    (AlertFlag.FLOOD, "flood"),
+    (AlertFlag.WINTER, "winter"),
+)
+
+
+@lru_cache(maxsize=1024)
+def event_flags(event: str) -> int:
+    """Classify an event name once; the NWS event vocabulary is small."""
+    lowered = event.lower()
+    flags = 0
+    if "tornado" in lowered:
+        flags |= AlertFlag.TORNADO
+    if "thunderstorm" in lowered or "hail" in lowered:
+        flags |= AlertFlag.THUNDERSTORM
+    if "flood" in lowered:
+        flags |= AlertFlag.FLOOD
+    if any(term in lowered for term in ("winter", "snow", "ice", "blizzard")):
+        flags |= AlertFlag.WINTER
+    if "warning" in lowered:
+        flags |= AlertFlag.WARNING
+    if "watch" in lowered:
+        flags |= AlertFlag.WATCH
+    if "advisory" in lowered:
+        flags |= AlertFlag.ADVISORY
+    if any(severe_event in event for severe_event in SEVERE_EVENTS):
+        flags |= AlertFlag.SEVERE
+    return flags
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+_INTERNED_FIELDS = frozenset(("sent", "event", "area", "sender", "effective", "onset", "expires"))
+
+
+class CompactAlert:
+    """Memory-light alert record kept instead of a raw GeoJSON feature.
+
+    Short strings that repeat across alerts (event names, areas, senders,
+    timestamps) are interned, CAP levels are stored as enums and the event
+    classification as a bitset. Long free text is kept as-is.
+    """
+
+    __slots__ = (
+        "id", "sent", "event", "area", "sender", "severity", "urgency", "certainty", "flags",
+        "effective", "onset", "expires", "headline", "description", "instruction", "ugc",
+    )
+
+    def __init__(self, feature: dict):
+        props = feature["properties"]
+        self.id = props.get("id") or feature.get("id")
+        self.sent = _intern(props.get("sent"))
+        self.event = _intern(props.get("event"))
+        self.area = _intern(props.get("areaDesc"))
+        self.sender = _intern(props.get("senderName"))
+        self.severity = Severity.parse(props.get("severity"))
+        self.urgency = Urgency.parse(props.get("urgency"))
+        self.certainty = Certainty.parse(props.get("certainty"))
+
+        flags = event_flags(self.event or "")
+        geometry = feature.get("geometry")
+        if geometry and geometry.get("coordinates"):
+            flags |= AlertFlag.HAS_GEOMETRY
+        self.flags = flags
+
+        self.effective = _intern(props.get("effective"))
+        self.onset = _intern(props.get("onset"))
+        self.expires = _intern(props.get("expires"))
+        self.headline = props.get("headline")
+        self.description = props.get("description")
+        self.instruction = props.get("instruction")
+        # Affected county/zone codes (e.g. KSC201, KSZ009); the first two letters are the state
+        self.ugc = tuple(_intern(code) for code in (props.get("geocode") or {}).get("UGC", ()))
+
+    def __getstate__(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state: tuple) -> None:
+        # Alerts compacted in a worker process (see offload.py) arrive unpickled
+        # with fresh string copies; re-intern the short repeated ones
+        for name, value in zip(self.__slots__, state):
+            if name == "ugc":
+                value = tuple(_intern(code) for code in value)
+            elif name in _INTERNED_FIELDS:
+                value = _intern(value)
+            setattr(self, name, value)
+
+    def has(self, flag: int) -> bool:
+        return bool(self.flags & flag)
+
+    def affects_state(self, state: str) -> bool:
+        return any(code.startswith(state) for code in self.ugc)
+
+    def affects_zone(self, zone: str) -> bool:
+        return zone in self.ugc
+
+    @property
+    def category(self) -> str:
+        """Storm category the alert is reported under; the first matching one wins."""
+        for flag, category in STORM_CATEGORIES:
+            if self.flags & flag:
+                return category
+        return "other"
+
+    @property
+    def severity_rank(self) -> int:
+        """Sort key putting the most severe first; a missing severity ranks as Unknown."""
+        return -max(self.severity, Severity.UNKNOWN)
+
+    def record(self, fields: Iterable[str]) -> dict[str, Any]:
+        """The same structured record utils.alert_record builds from the raw feature."""
+        record = {}
+        for field in fields:
+            value = getattr(self, field)
+            record[field] = value.label if isinstance(value, _Level) else value
+        return record
+
+
+def compact_alerts(features: Iterable[dict]) -> list[CompactAlert]:
+    return [CompactAlert(feature) for feature in features]
+
+
+def compact_feed(data: dict, flags: int = 0) -> list[CompactAlert] | None:
+    """Compact alerts of an alerts API payload, or None if it has no feature list.
+
+    With flags, keeps only alerts carrying all of them. Meant as a
+    make_nws_request transform, so bulky feeds are compacted off the event loop.
+    """
+    if "features" not in data:
+        return None
+    alerts = compact_alerts(data["features"])
+    if flags:
+        alerts = [alert for alert in alerts if (alert.flags & flags) == flags]
+    return alerts
@@ -1,2 +1,143 @@
 NWS_API_BASE = "https://api.weather.gov"
-USER_AGENT = "weather-app/1.0"
\ No newline at end of file
+USER_AGENT = "weather-app/1.0"
+
+# How often the locally indexed radar station catalog is reloaded
+RADAR_STATION_REFRESH_SECONDS = 24 * 60 * 60
+
+# How often the locally indexed county/forecast-zone polygons are reloaded
+ZONE_INDEX_REFRESH_SECONDS = 7 * 24 * 60 * 60
+# Wait before retrying a failed zone polygon load; doubles with each consecutive failure
+ZONE_INDEX_RETRY_SECONDS = 5 * 60
+
+# Environment variable selecting which tool profile the server registers
+TOOL_PROFILE_ENV = "WEATHER_TOOL_PROFILE"
+
+# Environment variable selecting the tool output mode ("text" or "compact")
+OUTPUT_MODE_ENV = "WEATHER_OUTPUT_MODE"
+# Characters of alert free text (description, instruction, headline) kept in compact output
+COMPACT_ALERT_TEXT_CHARS = 160
+
+# How often subscribed alert scopes are re-checked for changes
+ALERT_POLL_SECONDS = 60
+
+# Alert scopes read but not subscribed to: how long their last alert set and
+# change log are kept, and how many are kept at most (least recently fetched
+# go first); point scopes are rounded to this many decimal degrees (about 1 km)
+ALERT_SCOPE_IDLE_SECONDS = 30 * 60
+ALERT_SCOPE_MAX_IDLE = 1000
+ALERT_POINT_DECIMALS = 2
+
+# How often the national alert feed behind the alert summary aggregates is re-read
+ALERT_AGGREGATE_POLL_SECONDS = 60
+
+# State and territory codes that start land zone UGC codes; other prefixes
+# (AM, GM, LM, PZ, ...) are marine areas
+US_STATE_CODES = frozenset((
+    "AL", "AK", "AZ", "AR", "CA", "CO", "CT", "DE", "DC", "FL", "GA", "HI", "ID", "IL", "IN", "IA", "KS",
+    "KY", "LA", "ME", "MD", "MA", "MI", "MN", "MS", "MO", "MT", "NE", "NV", "NH", "NJ", "NM", "NY", "NC",
+    "ND", "OH", "OK", "OR", "PA", "RI", "SC", "SD", "TN", "TX", "UT", "VT", "VA", "WA", "WV", "WI", "WY",
+    "AS", "GU", "MP", "PR", "VI",
+))
+
+# How long each facet of a shared location snapshot is reused before refetching
+SNAPSHOT_GRID_TTL_SECONDS = 24 * 60 * 60
+SNAPSHOT_FORECAST_TTL_SECONDS = 15 * 60
+SNAPSHOT_ALERTS_TTL_SECONDS = 60
+SNAPSHOT_MAX_LOCATIONS = 512
+
+# Refetch cost assumed for snapshot facets seeded from a cache bundle, whose
+# fetch time is unknown (a typical NWS round trip)
+SNAPSHOT_SEEDED_COST_SECONDS = 0.5
+
+# Popularity-driven prefetch: where the hot location set is persisted, how many
+# locations it holds, how fast popularity decays, and how early facets are refreshed
+HOT_SET_PATH_ENV = "WEATHER_HOT_SET_PATH"
+HOT_SET_SIZE = 32
+HOT_HALF_LIFE_SECONDS = 6 * 60 * 60
+HOT_REFRESH_CHECK_SECONDS = 15
+HOT_REFRESH_AHEAD_SECONDS = 20
+HOT_PREFETCH_CONCURRENCY = 4
+HOT_PERSIST_SECONDS = 5 * 60
+
+# Cache bundle loaded on startup and written on shutdown, and whether its
+# data is pinned (never expires, for offline or test deployments)
+CACHE_BUNDLE_ENV = "WEATHER_CACHE_BUNDLE"
+CACHE_BUNDLE_PIN_ENV = "WEATHER_CACHE_BUNDLE_PIN"
+
+# Longest a single NWS request may take, and the default end-to-end budget of a
+# tool call (overridable with WEATHER_TOOL_DEADLINE); upstream requests get what remains
+NWS_REQUEST_TIMEOUT_SECONDS = 30.0
+TOOL_DEADLINE_SECONDS = 30.0
+TOOL_DEADLINE_ENV = "WEATHER_TOOL_DEADLINE"
+
+# Admission control: concurrent calls, queued calls and longest queue wait per
+# tool cost class, and concurrent calls allowed per client session
+TOOL_CLASS_LIMITS = {
+    "light": {"max_concurrent": 32, "max_queued": 64, "max_wait_seconds": 2.0},
+    "standard": {"max_concurrent": 16, "max_queued": 32, "max_wait_seconds": 5.0},
+    "heavy": {"max_concurrent": 2, "max_queued": 4, "max_wait_seconds": 5.0},
+}
+SESSION_MAX_CONCURRENT = 4
+
+# Span tracing export target: "console" (stderr), a JSON-lines file path, or unset to disable
+TRACE_ENV = "WEATHER_TRACE"
+
+# Most states or zones combined into one batched /alerts/active query
+ALERT_BATCH_MAX_AREAS = 25
+
+# Observation stations: how often the station catalog is reloaded, how many
+# observations each station's ring buffer holds (and how many are backfilled),
+# how often hot stations are refreshed and how long a station stays hot after a read
+OBSERVATION_STATION_REFRESH_SECONDS = 7 * 24 * 60 * 60
+# Wait before retrying an incomplete station catalog load; doubles with each consecutive failure
+OBSERVATION_STATION_RETRY_SECONDS = 5 * 60
+# Most /stations pages (500 stations each) fetched per load, a guard against a pagination loop
+OBSERVATION_STATION_MAX_PAGES = 400
+OBSERVATION_HISTORY = 72
+OBSERVATION_BACKFILL = 24
+OBSERVATION_REFRESH_SECONDS = 5 * 60
+OBSERVATION_HOT_SECONDS = 60 * 60
+
+# Route weather: default spacing of samples along a route, most samples taken
+# (spacing widens for longer routes), the lattice size used to share /points
+# lookups between nearby samples (the NWS grid spacing), and upstream fetch concurrency
+ROUTE_SAMPLE_SPACING_KM = 5.0
+ROUTE_MAX_SAMPLES = 400
+ROUTE_CELL_KM = 2.5
+ROUTE_FETCH_CONCURRENCY = 8
+
+# Image proxy: how long an image is served before it is revalidated with its
+# ETag, thumbnail size (longest edge, in pixels) and the threads that generate thumbnails
+IMAGE_FRESH_SECONDS = 120
+IMAGE_THUMBNAIL_SIZE = 320
+IMAGE_THUMBNAIL_WORKERS = 2
+
+# Best-window search: most candidate locations per call and upstream fetch concurrency
+WINDOW_SEARCH_MAX_LOCATIONS = 50
+WINDOW_SEARCH_FETCH_CONCURRENCY = 8
+
+# A2A front-end: how long an idle agent session (context) and its finished tasks
+# are kept, and the most tasks retained across sessions
+A2A_SESSION_IDLE_SECONDS = 60 * 60
+A2A_MAX_TASKS = 1000
+
+# Event loop lag monitor: how often the loop is sampled, how many recent samples
+# the stats cover, and the lag counted as a stall
+LOOP_LAG_INTERVAL_SECONDS = 0.5
+LOOP_LAG_WINDOW = 240
+LOOP_LAG_STALL_SECONDS = 0.1
+
+# CPU-heavy work moved off the event loop: response bodies from this size are
+# decoded and transformed in worker processes, bulk processing from this many
+# items runs in worker threads
+OFFLOAD_DECODE_MIN_BYTES = 256 * 1024
+OFFLOAD_PROCESS_WORKERS = 2
+OFFLOAD_THREAD_MIN_ITEMS = 500
+OFFLOAD_THREAD_WORKERS = 4
+
+# Memory budget shared by the location snapshot, rendered-result and image caches
+# only (overridable in MiB with WEATHER_CACHE_MEMORY_MB), and the least refetch
+# cost an entry is weighted with
+CACHE_MEMORY_ENV = "WEATHER_CACHE_MEMORY_MB"
+CACHE_MEMORY_BUDGET_BYTES = 256 * 1024 * 1024
+CACHE_MIN_COST_SECONDS = 0.001
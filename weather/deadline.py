@@ -0,0 +1,46 @@
+import asyncio
+import contextvars
+from contextlib import contextmanager
+from typing import Coroutine
+
+from constants import NWS_REQUEST_TIMEOUT_SECONDS
+from tracing import current_span
+
+# Event-loop time by which the current tool call must finish, if it has a deadline
+current_deadline: contextvars.ContextVar[float | None] = contextvars.ContextVar("current_deadline", default=None)
+
+
+@contextmanager
+def deadline_scope(seconds: float):
+    """Give everything awaited inside a budget of `seconds`; a nested scope can only shorten it."""
+    deadline = asyncio.get_running_loop().time() + seconds
+    outer = current_deadline.get()
+    if outer is not None:
+        deadline = min(deadline, outer)
+    token = current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        current_deadline.reset(token)
+
+
+def remaining() -> float | None:
+    """Seconds left before the current deadline, or None without one."""
+    deadline = current_deadline.get()
+    if deadline is None:
+        return None
+    return deadline - asyncio.get_running_loop().time()
+
+
+def request_timeout() -> float:
+    """Timeout for the next upstream request: the remaining budget, capped per request."""
+    left = remaining()
+    return NWS_REQUEST_TIMEOUT_SECONDS if left is None else min(left, NWS_REQUEST_TIMEOUT_SECONDS)
+
+
+def create_detached_task(coro: Coroutine) -> asyncio.Task:
+    """Start background work that must not inherit the deadline (or trace) of the call that triggered it."""
+    context = contextvars.copy_context()
+    context.run(current_deadline.set, None)
+    context.run(current_span.set, None)
+    return asyncio.get_running_loop().create_task(coro, context=context)
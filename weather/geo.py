@@ -0,0 +1,235 @@
+import heapq
+import math
+from typing import Any, Iterable
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometers."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _to_unit_vector(lat: float, lon: float) -> tuple[float, float, float]:
+    phi, lam = math.radians(lat), math.radians(lon)
+    return (math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam), math.sin(phi))
+
+
+def _from_vector(x: float, y: float, z: float) -> tuple[float, float]:
+    norm = math.sqrt(x * x + y * y + z * z) or 1.0
+    return (math.degrees(math.asin(z / norm)), math.degrees(math.atan2(y, x)))
+
+
+class _BallNode:
+    __slots__ = ("lat", "lon", "radius_km", "items", "left", "right")
+
+    def __init__(self, lat: float, lon: float, radius_km: float):
+        self.lat = lat
+        self.lon = lon
+        self.radius_km = radius_km
+        self.items: list[tuple[float, float, Any]] | None = None
+        self.left: "_BallNode | None" = None
+        self.right: "_BallNode | None" = None
+
+
+class BallTree:
+    """Ball tree over (lat, lon) points using great-circle distance.
+
+    Each node stores a center and the radius of the smallest ball around that
+    center containing all its points, so whole subtrees can be skipped with
+    the triangle inequality during nearest-N and within-radius queries.
+    """
+
+    LEAF_SIZE = 8
+
+    def __init__(self, points: Iterable[tuple[float, float, Any]]):
+        """
+        Args:
+            points: Iterable of (latitude, longitude, payload) tuples
+        """
+        items = [(float(lat), float(lon), payload) for lat, lon, payload in points]
+        self.size = len(items)
+        self._root = self._build(items) if items else None
+
+    def _build(self, items: list[tuple[float, float, Any]]) -> _BallNode:
+        vectors = [_to_unit_vector(lat, lon) for lat, lon, _ in items]
+        center_lat, center_lon = _from_vector(
+            sum(v[0] for v in vectors), sum(v[1] for v in vectors), sum(v[2] for v in vectors)
+        )
+        radius = max(haversine_km(center_lat, center_lon, lat, lon) for lat, lon, _ in items)
+        node = _BallNode(center_lat, center_lon, radius)
+
+        if len(items) <= self.LEAF_SIZE:
+            node.items = items
+            return node
+
+        # Split along the axis of greatest spread in 3D so the halves stay compact on the sphere
+        spreads = [max(v[axis] for v in vectors) - min(v[axis] for v in vectors) for axis in range(3)]
+        axis = spreads.index(max(spreads))
+        order = sorted(range(len(items)), key=lambda i: vectors[i][axis])
+        middle = len(order) // 2
+        node.left = self._build([items[i] for i in order[:middle]])
+        node.right = self._build([items[i] for i in order[middle:]])
+        return node
+
+    def nearest(self, lat: float, lon: float, k: int = 1, max_km: float | None = None) -> list[tuple[float, Any]]:
+        """Return up to k (distance_km, payload) pairs closest to the point, nearest first."""
+        if self._root is None or k <= 0:
+            return []
+
+        bound = math.inf if max_km is None else max_km
+        best: list[tuple[float, int, Any]] = []  # max-heap via negated distances
+        counter = 0
+
+        def visit(node: _BallNode) -> None:
+            nonlocal counter
+            limit = -best[0][0] if len(best) == k else bound
+            if haversine_km(lat, lon, node.lat, node.lon) - node.radius_km > limit:
+                return
+            if node.items is not None:
+                for item_lat, item_lon, payload in node.items:
+                    distance = haversine_km(lat, lon, item_lat, item_lon)
+                    if distance > bound:
+                        continue
+                    counter += 1
+                    if len(best) < k:
+                        heapq.heappush(best, (-distance, counter, payload))
+                    elif distance < -best[0][0]:
+                        heapq.heapreplace(best, (-distance, counter, payload))
+                return
+            # Descend into the closer child first to tighten the bound early
+            children = sorted(
+                (node.left, node.right),
+                key=lambda child: haversine_km(lat, lon, child.lat, child.lon),
+            )
+            for child in children:
+                visit(child)
+
+        visit(self._root)
+        return sorted(((-neg, payload) for neg, _, payload in best), key=lambda pair: pair[0])
+
+    def within(self, lat: float, lon: float, radius_km: float) -> list[tuple[float, Any]]:
+        """Return all (distance_km, payload) pairs within radius_km of the point, nearest first."""
+        if self._root is None:
+            return []
+
+        found: list[tuple[float, Any]] = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if haversine_km(lat, lon, node.lat, node.lon) - node.radius_km > radius_km:
+                continue
+            if node.items is not None:
+                for item_lat, item_lon, payload in node.items:
+                    distance = haversine_km(lat, lon, item_lat, item_lon)
+                    if distance <= radius_km:
+                        found.append((distance, payload))
+            else:
+                stack.extend((node.left, node.right))
+
+        found.sort(key=lambda pair: pair[0])
+        return found
+
+
+def _point_in_ring(lat: float, lon: float, ring: list[list[float]]) -> bool:
+    # Ray casting on a GeoJSON ring of [lon, lat] positions
+    inside = False
+    j = len(ring) - 1
+    for i in range(len(ring)):
+        xi, yi = ring[i][0], ring[i][1]
+        xj, yj = ring[j][0], ring[j][1]
+        if (yi > lat) != (yj > lat) and lon < (xj - xi) * (lat - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+
+def point_in_geometry(lat: float, lon: float, geometry: dict) -> bool:
+    """Check whether a point falls inside a GeoJSON Polygon or MultiPolygon (holes respected)."""
+    if not geometry:
+        return False
+    if geometry.get("type") == "Polygon":
+        polygons = [geometry["coordinates"]]
+    elif geometry.get("type") == "MultiPolygon":
+        polygons = geometry["coordinates"]
+    else:
+        return False
+
+    for rings in polygons:
+        if rings and _point_in_ring(lat, lon, rings[0]) and not any(
+            _point_in_ring(lat, lon, hole) for hole in rings[1:]
+        ):
+            return True
+    return False
+
+
+def _segment_distance_km(lat: float, lon: float, start: list[float], end: list[float]) -> float:
+    # Distance from the point to a [lon, lat] edge, on a flat projection centred on the point;
+    # alert polygons are small enough next to the Earth's curvature
+    km_per_lon = math.radians(EARTH_RADIUS_KM) * math.cos(math.radians(lat))
+    km_per_lat = math.radians(EARTH_RADIUS_KM)
+    x1, y1 = (start[0] - lon) * km_per_lon, (start[1] - lat) * km_per_lat
+    x2, y2 = (end[0] - lon) * km_per_lon, (end[1] - lat) * km_per_lat
+    dx, dy = x2 - x1, y2 - y1
+    length_squared = dx * dx + dy * dy
+    t = max(0.0, min(1.0, -(x1 * dx + y1 * dy) / length_squared)) if length_squared else 0.0
+    return math.hypot(x1 + t * dx, y1 + t * dy)
+
+
+def distance_to_geometry_km(lat: float, lon: float, geometry: dict) -> float:
+    """Distance from a point to the nearest edge of a GeoJSON Polygon or MultiPolygon's outer rings.
+
+    Zero inside the geometry; infinite if it has no polygon rings.
+    """
+    if point_in_geometry(lat, lon, geometry):
+        return 0.0
+    if not geometry or geometry.get("type") not in ("Polygon", "MultiPolygon"):
+        return math.inf
+    polygons = [geometry["coordinates"]] if geometry["type"] == "Polygon" else geometry["coordinates"]
+    return min(
+        (
+            _segment_distance_km(lat, lon, start, end)
+            for rings in polygons for ring in rings[:1] for start, end in zip(ring, ring[1:])
+        ),
+        default=math.inf,
+    )
+
+
+def geometry_bounds(geometry: dict) -> tuple[float, float, float, float] | None:
+    """Bounding box of a GeoJSON Polygon or MultiPolygon as (min_lat, min_lon, max_lat, max_lon)."""
+    if not geometry or geometry.get("type") not in ("Polygon", "MultiPolygon"):
+        return None
+    polygons = [geometry["coordinates"]] if geometry["type"] == "Polygon" else geometry["coordinates"]
+    lons = [pos[0] for rings in polygons for ring in rings[:1] for pos in ring]
+    lats = [pos[1] for rings in polygons for ring in rings[:1] for pos in ring]
+    if not lats:
+        return None
+    return (min(lats), min(lons), max(lats), max(lons))
+
+
+class GridIndex:
+    """Uniform lat/lon bucket index of bounding boxes for fast candidate lookup."""
+
+    def __init__(self, cell_degrees: float = 1.0):
+        self.cell_degrees = cell_degrees
+        self._cells: dict[tuple[int, int], list[Any]] = {}
+        self.size = 0
+
+    def _cell(self, lat: float, lon: float) -> tuple[int, int]:
+        return (math.floor(lat / self.cell_degrees), math.floor(lon / self.cell_degrees))
+
+    def insert(self, bounds: tuple[float, float, float, float], payload: Any) -> None:
+        min_lat, min_lon, max_lat, max_lon = bounds
+        low_row, low_col = self._cell(min_lat, min_lon)
+        high_row, high_col = self._cell(max_lat, max_lon)
+        for row in range(low_row, high_row + 1):
+            for col in range(low_col, high_col + 1):
+                self._cells.setdefault((row, col), []).append(payload)
+        self.size += 1
+
+    def candidates(self, lat: float, lon: float) -> list[Any]:
+        return self._cells.get(self._cell(lat, lon), [])
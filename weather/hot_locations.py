@@ -0,0 +1,178 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+from constants import (
+    HOT_HALF_LIFE_SECONDS,
+    HOT_PERSIST_SECONDS,
+    HOT_PREFETCH_CONCURRENCY,
+    HOT_REFRESH_AHEAD_SECONDS,
+    HOT_REFRESH_CHECK_SECONDS,
+    HOT_SET_PATH_ENV,
+    HOT_SET_SIZE,
+)
+from snapshot import LocationSnapshot, get_snapshot, snapshot_listeners
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOT_SET_PATH = Path.home() / ".cache" / "weather-mcp" / "hot_locations.json"
+
+# Facets kept warm for hot locations; grid metadata is loaded along the way
+PREFETCH_FACETS = ("periods", "zone_alerts")
+
+
+def hot_set_path() -> Path | None:
+    """Where the hot set is persisted; an empty WEATHER_HOT_SET_PATH disables persistence."""
+    configured = os.environ.get(HOT_SET_PATH_ENV)
+    if configured is None:
+        return DEFAULT_HOT_SET_PATH
+    return Path(configured).expanduser() if configured.strip() else None
+
+
+class HotLocationTracker:
+    """Tracks request popularity per gridpoint and keeps the most popular ones warm.
+
+    Popularity is an exponentially decayed request count, so the hot set
+    follows shifting traffic. Coordinates that resolve to the same NWS
+    gridpoint share one entry. The hot set is persisted so a restarted server
+    can prefetch it before the first request, and a background loop refreshes
+    hot facets shortly before they expire so readers never wait on NWS.
+    """
+
+    def __init__(self, size: int = HOT_SET_SIZE, half_life_seconds: float = HOT_HALF_LIFE_SECONDS,
+                 max_tracked: int = 1024):
+        self.size = size
+        self.half_life_seconds = half_life_seconds
+        self.max_tracked = max_tracked
+        # key -> [score, scored_at, latitude, longitude]
+        self._entries: dict[str, list[float]] = {}
+        self._task: asyncio.Task | None = None
+
+    def _decayed(self, entry: list[float], now: float) -> float:
+        return entry[0] * 0.5 ** ((now - entry[1]) / self.half_life_seconds)
+
+    def record(self, snapshot: LocationSnapshot) -> None:
+        """Count one request for a location."""
+        now = time.time()
+        coords_key = f"{snapshot.latitude},{snapshot.longitude}"
+        key = snapshot.gridpoint or coords_key
+        entry = self._entries.get(key)
+        if entry is None:
+            # Fold in the count gathered before the location's gridpoint was known
+            entry = self._entries.pop(coords_key, None) if key != coords_key else None
+            if entry is None:
+                entry = [0.0, now, snapshot.latitude, snapshot.longitude]
+            self._entries[key] = entry
+        entry[0] = self._decayed(entry, now) + 1.0
+        entry[1] = now
+        entry[2], entry[3] = snapshot.latitude, snapshot.longitude
+
+        if len(self._entries) > self.max_tracked:
+            coldest = min(self._entries, key=lambda k: self._decayed(self._entries[k], now))
+            del self._entries[coldest]
+
+    def hot(self, count: int | None = None) -> list[tuple[str, float, float, float]]:
+        """The most popular locations as (key, latitude, longitude, score), hottest first."""
+        now = time.time()
+        ranked = sorted(
+            ((key, entry[2], entry[3], self._decayed(entry, now)) for key, entry in self._entries.items()),
+            key=lambda item: item[3],
+            reverse=True,
+        )
+        return ranked[:self.size if count is None else count]
+
+    def save(self, path: Path | None = None) -> bool:
+        """Persist the hot set. Returns False if persistence is disabled or fails."""
+        path = path or hot_set_path()
+        if path is None:
+            return False
+        data = {
+            "saved_at": time.time(),
+            "locations": [
+                {"key": key, "latitude": lat, "longitude": lon, "score": round(score, 4)}
+                for key, lat, lon, score in self.hot()
+            ],
+        }
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(data))
+            os.replace(tmp_path, path)
+            return True
+        except OSError:
+            logger.warning("Could not persist hot location set to %s", path)
+            return False
+
+    def load(self, path: Path | None = None) -> int:
+        """Restore a persisted hot set, decayed for the time the server was down."""
+        path = path or hot_set_path()
+        if path is None or not path.exists():
+            return 0
+        try:
+            data = json.loads(path.read_text())
+            saved_at = float(data["saved_at"])
+            for location in data["locations"]:
+                self._entries.setdefault(location["key"], [
+                    float(location["score"]), saved_at,
+                    float(location["latitude"]), float(location["longitude"]),
+                ])
+        except (OSError, ValueError, KeyError, TypeError):
+            logger.warning("Ignoring unreadable hot location set at %s", path)
+            return 0
+        return len(data["locations"])
+
+    async def refresh_hot(self, ahead_seconds: float = HOT_REFRESH_AHEAD_SECONDS,
+                          concurrency: int = HOT_PREFETCH_CONCURRENCY) -> int:
+        """Load or refresh hot facets that are missing or about to expire. Returns the number refreshed."""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def refresh(location: LocationSnapshot, facet: str) -> bool:
+            async with semaphore:
+                return await location.refresh(facet)
+
+        jobs = []
+        for _, latitude, longitude, _ in self.hot():
+            location = get_snapshot(latitude, longitude, track=False)
+            for facet in PREFETCH_FACETS:
+                remaining = location.expires_in(facet)
+                if remaining is None or remaining < ahead_seconds:
+                    jobs.append(refresh(location, facet))
+
+        results = await asyncio.gather(*jobs, return_exceptions=True)
+        return sum(1 for result in results if result is True)
+
+    async def _run(self) -> None:
+        last_saved = time.monotonic()
+        while True:
+            try:
+                await self.refresh_hot()
+            except Exception:
+                logger.exception("Hot location refresh failed")
+            if time.monotonic() - last_saved > HOT_PERSIST_SECONDS:
+                self.save()
+                last_saved = time.monotonic()
+            await asyncio.sleep(HOT_REFRESH_CHECK_SECONDS)
+
+    def start(self) -> None:
+        """Load the persisted hot set and start prefetching and refreshing it in the background."""
+        if self._task is None or self._task.done():
+            logger.info("Warming %d hot locations", self.load())
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background refresh and persist the hot set."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.save()
+
+
+hot_locations = HotLocationTracker()
+snapshot_listeners.append(hot_locations.record)
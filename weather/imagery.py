@@ -0,0 +1,203 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import deadline
+from cache_manager import cache_manager
+from constants import IMAGE_FRESH_SECONDS, IMAGE_THUMBNAIL_SIZE, IMAGE_THUMBNAIL_WORKERS
+from tracing import span
+from utils import nws_client
+
+# GOES imagery directories per region, and the rolling animation NESDIS keeps in each
+SATELLITE_REGIONS = {
+    "us": ("https://cdn.star.nesdis.noaa.gov/GOES16/ABI/CONUS/", "GOES16-CONUS-GEOCOLOR-625x375.gif"),
+    "conus": ("https://cdn.star.nesdis.noaa.gov/GOES16/ABI/CONUS/", "GOES16-CONUS-GEOCOLOR-625x375.gif"),
+    "alaska": ("https://cdn.star.nesdis.noaa.gov/GOES17/ABI/ALASKA/", "GOES17-ALASKA-GEOCOLOR-600x600.gif"),
+    "hawaii": ("https://cdn.star.nesdis.noaa.gov/GOES17/ABI/HAWAII/", "GOES17-HAWAII-GEOCOLOR-600x600.gif"),
+    "pr": ("https://cdn.star.nesdis.noaa.gov/GOES16/ABI/MESO/", "GOES16-MESO-GEOCOLOR-600x600.gif"),
+    "guam": ("https://cdn.star.nesdis.noaa.gov/GOES17/ABI/GUAM/", "GOES17-GUAM-GEOCOLOR-600x600.gif"),
+}
+
+# Band directory per satellite product
+SATELLITE_BANDS = {"geocolor": "GEOCOLOR", "infrared": "Band13"}
+
+RADAR_IMAGE_BASE = "https://radar.weather.gov/ridge/standard"
+
+
+def satellite_image_url(region: str, band: str = "geocolor") -> str:
+    return f"{SATELLITE_REGIONS[region][0]}{SATELLITE_BANDS[band]}/latest.jpg"
+
+
+def satellite_loop_url(region: str) -> str:
+    base, loop = SATELLITE_REGIONS[region]
+    return f"{base}GEOCOLOR/{loop}"
+
+
+def radar_image_url(station: str) -> str:
+    """Latest reflectivity frame of a radar station (e.g. KTLX)."""
+    return f"{RADAR_IMAGE_BASE}/{station.upper()}_0.gif"
+
+
+def radar_loop_url(station: str) -> str:
+    return f"{RADAR_IMAGE_BASE}/{station.upper()}_loop.gif"
+
+
+class CachedImage:
+    """One upstream image with the validators needed to revalidate it."""
+
+    __slots__ = ("url", "content", "mime_type", "etag", "last_modified", "checked_at", "thumbnail")
+
+    def __init__(self, url: str, content: bytes, mime_type: str, etag: str | None, last_modified: str | None):
+        self.url = url
+        self.content = content
+        self.mime_type = mime_type
+        self.etag = etag
+        self.last_modified = last_modified
+        self.checked_at = time.monotonic()
+        self.thumbnail: bytes | None = None
+
+    @property
+    def size(self) -> int:
+        return len(self.content) + len(self.thumbnail or b"")
+
+
+def _make_thumbnail(content: bytes, size: int) -> bytes:
+    """Downsize an image to a PNG whose longest edge is `size` (first frame of animations)."""
+    try:
+        from PIL import Image
+    except ImportError:
+        raise RuntimeError("Thumbnails need Pillow (install the 'images' extra)") from None
+    with Image.open(BytesIO(content)) as image:
+        image.thumbnail((size, size))
+        buffer = BytesIO()
+        image.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+
+class ImageCache:
+    """Cache of upstream weather images, evicted by the shared cache manager.
+
+    Every client reading the same image shares one download: concurrent reads
+    wait on a single in-flight fetch, and once an image is older than
+    fresh_seconds it is revalidated with its ETag / Last-Modified, so an
+    unchanged frame costs a 304 instead of a download. If upstream fails,
+    the last copy keeps being served. Thumbnails are generated once per
+    image version in a thread pool, off the event loop.
+    """
+
+    def __init__(self, fresh_seconds: float = IMAGE_FRESH_SECONDS, thumbnail_size: int = IMAGE_THUMBNAIL_SIZE,
+                 thumbnail_workers: int = IMAGE_THUMBNAIL_WORKERS):
+        self.fresh_seconds = fresh_seconds
+        self.thumbnail_size = thumbnail_size
+        self.thumbnail_workers = thumbnail_workers
+        self.stats = {"hits": 0, "downloads": 0, "revalidated": 0, "stale": 0, "thumbnails": 0}
+        self._entries: dict[str, CachedImage] = {}
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._thumbnailing: dict[CachedImage, asyncio.Future] = {}
+        self._pool: ThreadPoolExecutor | None = None
+        cache_manager.register("images", self._evict, lambda: self.stats)
+
+    async def get(self, url: str) -> CachedImage | None:
+        """The image at url, from the cache when fresh; None if it was never fetched successfully."""
+        entry = self._entries.get(url)
+        if entry is not None and time.monotonic() - entry.checked_at < self.fresh_seconds:
+            self.stats["hits"] += 1
+            cache_manager.hit("images", url)
+            return entry
+
+        task = self._inflight.get(url)
+        if task is None:
+            # Shared by every reader, so it runs under none of their deadlines or spans
+            task = self._inflight[url] = deadline.create_detached_task(self._fetch(url, entry))
+            task.add_done_callback(lambda _: self._inflight.pop(url, None))
+        # A reader that is cancelled or out of time leaves the shared fetch running for
+        # the others, and falls back to the last copy
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), deadline.remaining())
+        except TimeoutError:
+            if entry is not None:
+                self.stats["stale"] += 1
+            return entry
+
+    async def _fetch(self, url: str, entry: CachedImage | None) -> CachedImage | None:
+        headers = {"Accept": "image/*"}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+
+        timeout = deadline.request_timeout()
+        started = time.monotonic()
+        with span("image.request", url=url, revalidate=entry is not None) as request_span:
+            try:
+                if timeout <= 0:
+                    raise TimeoutError
+                async with asyncio.timeout(timeout):
+                    response = await nws_client().get(url, headers=headers, timeout=timeout)
+                request_span.set(status_code=response.status_code)
+                if response.status_code == 304 and entry is not None:
+                    entry.checked_at = time.monotonic()
+                    self.stats["revalidated"] += 1
+                    if self._entries.get(url) is not entry:
+                        self._store(entry, time.monotonic() - started)  # Evicted while being revalidated
+                    return entry
+                response.raise_for_status()
+            except Exception as e:
+                request_span.set(outcome=type(e).__name__)
+                if entry is not None:
+                    self.stats["stale"] += 1
+                return entry
+
+        self.stats["downloads"] += 1
+        fetched = CachedImage(
+            url,
+            response.content,
+            response.headers.get("Content-Type", "application/octet-stream").split(";")[0],
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+        )
+        self._store(fetched, time.monotonic() - started)
+        return fetched
+
+    def _store(self, entry: CachedImage, cost: float) -> None:
+        # One larger than the whole budget is evicted at once: served once, not cached
+        self._entries[entry.url] = entry
+        cache_manager.put("images", entry.url, entry.size, cost)
+
+    def _evict(self, url: str) -> None:
+        self._entries.pop(url, None)
+
+    async def thumbnail(self, url: str) -> bytes | None:
+        """PNG thumbnail of the image at url, generated once per image version."""
+        entry = await self.get(url)
+        if entry is None:
+            return None
+        if entry.thumbnail is not None:
+            return entry.thumbnail
+
+        future = self._thumbnailing.get(entry)
+        if future is None:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(self.thumbnail_workers, thread_name_prefix="thumbnail")
+            loop = asyncio.get_running_loop()
+            future = self._thumbnailing[entry] = loop.run_in_executor(
+                self._pool, _make_thumbnail, entry.content, self.thumbnail_size
+            )
+            future.add_done_callback(lambda _: self._thumbnailing.pop(entry, None))
+        thumbnail = await asyncio.shield(future)
+
+        if entry.thumbnail is None and self._entries.get(url) is entry:
+            entry.thumbnail = thumbnail
+            self.stats["thumbnails"] += 1
+            cache_manager.resize("images", url, entry.size)
+        return thumbnail
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+image_cache = ImageCache()
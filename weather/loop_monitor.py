@@ -0,0 +1,71 @@
+import asyncio
+import logging
+import statistics
+from collections import deque
+from typing import Any
+
+from constants import LOOP_LAG_INTERVAL_SECONDS, LOOP_LAG_STALL_SECONDS, LOOP_LAG_WINDOW
+from deadline import create_detached_task
+
+logger = logging.getLogger(__name__)
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop runs a timer that should fire every interval.
+
+    Lag is time the loop spent on something else, usually CPU-bound work done
+    inline by one tool call, during which every other call stood still.
+    """
+
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL_SECONDS, window: int = LOOP_LAG_WINDOW,
+                 stall_seconds: float = LOOP_LAG_STALL_SECONDS):
+        self.interval = interval
+        self.stall_seconds = stall_seconds
+        self.max_seconds = 0.0
+        self.stalls = 0
+        self._samples: deque[float] = deque(maxlen=window)
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = create_detached_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def record(self, lag: float) -> None:
+        self._samples.append(lag)
+        self.max_seconds = max(self.max_seconds, lag)
+        if lag >= self.stall_seconds:
+            self.stalls += 1
+            logger.debug("Event loop stalled for %.0f ms", lag * 1000)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.record(max(0.0, loop.time() - started - self.interval))
+
+    def stats(self) -> dict[str, Any]:
+        """Lag over the recent window in milliseconds, plus the all-time maximum and stall count."""
+        samples = sorted(self._samples)
+        if not samples:
+            return {"samples": 0, "max_ms": round(self.max_seconds * 1000, 1), "stalls": self.stalls}
+        return {
+            "samples": len(samples),
+            "current_ms": round(self._samples[-1] * 1000, 1),
+            "mean_ms": round(statistics.fmean(samples) * 1000, 1),
+            "p99_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000, 1),
+            "max_ms": round(self.max_seconds * 1000, 1),
+            "stalls": self.stalls,
+        }
+
+
+loop_monitor = LoopLagMonitor()
@@ -1,4 +1,80 @@
-from server import mcp
+import argparse
+import os
+
+from constants import (
+    CACHE_BUNDLE_ENV,
+    CACHE_BUNDLE_PIN_ENV,
+    CACHE_MEMORY_ENV,
+    OUTPUT_MODE_ENV,
+    TOOL_PROFILE_ENV,
+    TRACE_ENV,
+)
+
 
 if __name__ == "__main__":
-    mcp.run(transport='stdio')
+    parser = argparse.ArgumentParser(description="Weather MCP server")
+    parser.add_argument(
+        "--profile",
+        help="Tool profile to register (full, alerts-only, forecast-core, planning) "
+             "or a comma-separated list of tool groups",
+    )
+    parser.add_argument(
+        "--output",
+        choices=["text", "compact"],
+        help="Tool output mode: human-readable text (default) or compact JSON data",
+    )
+    parser.add_argument(
+        "--cache-bundle",
+        help="Cache bundle file to load on startup and write on shutdown (or on SIGUSR1)",
+    )
+    parser.add_argument(
+        "--pin-cache",
+        action="store_true",
+        help="Serve cache bundle data regardless of age, for offline or test deployments",
+    )
+    parser.add_argument(
+        "--cache-memory",
+        type=float,
+        metavar="MB",
+        help="Memory budget shared by the location snapshot, rendered-result and image caches, in MiB (default: 256)",
+    )
+    parser.add_argument(
+        "--trace",
+        help='Export spans for tool calls and NWS requests: "console" (stderr) or a JSON-lines file path',
+    )
+    parser.add_argument(
+        "--a2a",
+        type=int,
+        metavar="PORT",
+        help="Serve the tools as an A2A agent over HTTP on this port instead of MCP over stdio",
+    )
+    parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="Interface the A2A agent listens on (default: 127.0.0.1)",
+    )
+    args = parser.parse_args()
+
+    # The server registers tools at import time, so the profile must be set first
+    if args.profile:
+        os.environ[TOOL_PROFILE_ENV] = args.profile
+    if args.output:
+        os.environ[OUTPUT_MODE_ENV] = args.output
+    if args.cache_bundle:
+        os.environ[CACHE_BUNDLE_ENV] = args.cache_bundle
+    if args.pin_cache:
+        os.environ[CACHE_BUNDLE_PIN_ENV] = "1"
+    if args.cache_memory:
+        os.environ[CACHE_MEMORY_ENV] = str(args.cache_memory)
+    if args.trace:
+        os.environ[TRACE_ENV] = args.trace
+
+    from server import mcp
+
+    if args.a2a:
+        import uvicorn
+        from a2a_agent import create_a2a_app
+
+        uvicorn.run(create_a2a_app(mcp), host=args.host, port=args.a2a)
+    else:
+        mcp.run(transport='stdio')
@@ -0,0 +1,295 @@
+import asyncio
+import logging
+import math
+import time
+from array import array
+from datetime import datetime
+from typing import Any
+
+from constants import (
+    NWS_API_BASE,
+    OBSERVATION_BACKFILL,
+    OBSERVATION_HISTORY,
+    OBSERVATION_HOT_SECONDS,
+    OBSERVATION_REFRESH_SECONDS,
+    OBSERVATION_STATION_MAX_PAGES,
+    OBSERVATION_STATION_REFRESH_SECONDS,
+    OBSERVATION_STATION_RETRY_SECONDS,
+)
+from deadline import create_detached_task
+from geo import BallTree
+from snapshot import get_snapshot
+from utils import make_nws_request
+
+logger = logging.getLogger(__name__)
+
+
+class ObservationStationIndex:
+    """Locally indexed copy of the NWS observation station catalog.
+
+    The catalog spans several pages of /stations, so it loads in the
+    background like the zone index; until it is ready, callers fall back to
+    the station list NWS gives for a point.
+    """
+
+    def __init__(self, refresh_seconds: float = OBSERVATION_STATION_REFRESH_SECONDS,
+                 retry_seconds: float = OBSERVATION_STATION_RETRY_SECONDS,
+                 max_pages: int = OBSERVATION_STATION_MAX_PAGES):
+        self.refresh_seconds = refresh_seconds
+        self.retry_seconds = retry_seconds
+        self.max_pages = max_pages
+        self.loaded_at: float | None = None
+        self._tree: BallTree | None = None
+        self._refresh_task: asyncio.Task | None = None
+        self._last_attempt: float | None = None
+        self._failures = 0
+
+    @property
+    def is_stale(self) -> bool:
+        return self.loaded_at is None or time.time() - self.loaded_at > self.refresh_seconds
+
+    @property
+    def is_ready(self) -> bool:
+        return self._tree is not None
+
+    def load(self, features: list[dict]) -> int:
+        """Build the spatial index from station GeoJSON features."""
+        points = []
+        for feature in features:
+            coords = (feature.get("geometry") or {}).get("coordinates")
+            props = feature.get("properties") or {}
+            if coords and len(coords) >= 2 and props.get("stationIdentifier"):
+                points.append((coords[1], coords[0], {
+                    "id": props["stationIdentifier"],
+                    "name": props.get("name"),
+                    "time_zone": props.get("timeZone"),
+                }))
+        self._tree = BallTree(points)
+        return self._tree.size
+
+    async def refresh(self) -> bool:
+        """Fetch every page of the station catalog and rebuild the index. Returns whether it all loaded.
+
+        A catalog cut short by a failed page or the page cap is not indexed, as its
+        nearest stations could be far off; the previous index (or the /points
+        fallback) stays in use and the load is retried.
+        """
+        self._last_attempt = time.time()
+        features: list[dict] = []
+        url = f"{NWS_API_BASE}/stations?limit=500"
+        complete = False
+        for _ in range(self.max_pages):
+            data = await make_nws_request(url)
+            if not data or "features" not in data:
+                break
+            features.extend(data["features"])
+            # NWS links a next page until one comes back empty
+            url = (data.get("pagination") or {}).get("next")
+            if not url or not data["features"]:
+                complete = True
+                break
+
+        if complete and features:
+            self.load(features)
+            self.loaded_at = time.time()
+            self._failures = 0
+            return True
+        self._failures += 1
+        return False
+
+    def retry_delay(self) -> float:
+        """Seconds to wait after the last attempt: doubles with each consecutive failure."""
+        if not self._failures:
+            return 0.0
+        return min(self.retry_seconds * 2 ** (self._failures - 1), self.refresh_seconds)
+
+    def ensure_fresh(self) -> None:
+        """Schedule a background refresh if the index is missing or stale, backing off after failures."""
+        if not self.is_stale or (self._refresh_task is not None and not self._refresh_task.done()):
+            return
+        if self._last_attempt is not None and time.time() - self._last_attempt < self.retry_delay():
+            return
+        self._refresh_task = create_detached_task(self.refresh())
+
+    def nearest(self, latitude: float, longitude: float) -> tuple[float, dict[str, Any]] | None:
+        """Closest station as (distance_km, station), or None until the index is ready."""
+        self.ensure_fresh()
+        if self._tree is None:
+            return None
+        found = self._tree.nearest(latitude, longitude, 1)
+        return found[0] if found else None
+
+
+observation_station_index = ObservationStationIndex()
+
+
+async def resolve_station(latitude: float, longitude: float) -> tuple[float | None, dict[str, Any]] | None:
+    """Nearest observation station as (distance_km, station), via the local index or /points."""
+    found = observation_station_index.nearest(latitude, longitude)
+    if found:
+        return found
+
+    grid = await get_snapshot(latitude, longitude).grid()
+    if not grid or not grid.get("observationStations"):
+        return None
+    data = await make_nws_request(grid["observationStations"])
+    if not data or not data.get("features"):
+        return None
+    # NWS lists a point's stations nearest first
+    props = data["features"][0]["properties"]
+    return (None, {"id": props["stationIdentifier"], "name": props.get("name"), "time_zone": props.get("timeZone")})
+
+
+class ObservationSeries:
+    """Fixed-size ring buffer of one station's recent observations.
+
+    Numeric values live in array-backed columns (NaN when not reported) in
+    the units NWS reports them in: °C, km/h, degrees, Pa, percent, meters.
+    """
+
+    COLUMNS = {
+        "temperature": "temperature",
+        "dewpoint": "dewpoint",
+        "humidity": "relativeHumidity",
+        "wind_speed": "windSpeed",
+        "wind_direction": "windDirection",
+        "wind_gust": "windGust",
+        "pressure": "barometricPressure",
+        "visibility": "visibility",
+    }
+
+    def __init__(self, capacity: int = OBSERVATION_HISTORY):
+        self.capacity = capacity
+        self.timestamps = array("d", [math.nan]) * capacity
+        self.columns = {name: array("d", [math.nan]) * capacity for name in self.COLUMNS}
+        self.descriptions: list[str | None] = [None] * capacity
+        self.count = 0
+        self._next = 0
+
+    @property
+    def latest_timestamp(self) -> float | None:
+        return self.timestamps[(self._next - 1) % self.capacity] if self.count else None
+
+    def append(self, props: dict) -> bool:
+        """Add one observation (NWS properties); older or repeated observations are ignored."""
+        try:
+            stamp = datetime.fromisoformat(props["timestamp"]).timestamp()
+        except (KeyError, TypeError, ValueError):
+            return False
+        latest = self.latest_timestamp
+        if latest is not None and stamp <= latest:
+            return False
+
+        slot = self._next
+        self.timestamps[slot] = stamp
+        for name, field in self.COLUMNS.items():
+            value = (props.get(field) or {}).get("value")
+            self.columns[name][slot] = math.nan if value is None else float(value)
+        self.descriptions[slot] = props.get("textDescription") or None
+        self._next = (slot + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        return True
+
+    def _slot(self, age: int) -> int:
+        return (self._next - 1 - age) % self.capacity
+
+    def row(self, age: int = 0) -> dict[str, Any] | None:
+        """Observation `age` steps back from the latest (0 = latest), with None for missing values."""
+        if age >= self.count:
+            return None
+        slot = self._slot(age)
+        row = {"timestamp": self.timestamps[slot], "description": self.descriptions[slot]}
+        for name, column in self.columns.items():
+            value = column[slot]
+            row[name] = None if math.isnan(value) else value
+        return row
+
+    def change_since(self, column: str, seconds: float) -> float | None:
+        """Change of a column between the latest value and the one about `seconds` earlier."""
+        latest = self.row(0)
+        if latest is None or latest[column] is None:
+            return None
+        target = latest["timestamp"] - seconds
+        for age in range(1, self.count):
+            slot = self._slot(age)
+            if self.timestamps[slot] <= target:
+                value = self.columns[column][slot]
+                return None if math.isnan(value) else latest[column] - value
+        return None
+
+
+class ObservationStore:
+    """Recent observations per station, refreshed in the background for hot stations.
+
+    A station becomes hot when it is read; while it stays hot a background
+    loop keeps its series current, so reads are served from memory.
+    """
+
+    def __init__(self, refresh_seconds: float = OBSERVATION_REFRESH_SECONDS,
+                 hot_seconds: float = OBSERVATION_HOT_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self.hot_seconds = hot_seconds
+        self.series: dict[str, ObservationSeries] = {}
+        self._fetched_at: dict[str, float] = {}
+        self._last_read: dict[str, float] = {}
+        self._task: asyncio.Task | None = None
+
+    async def _backfill(self, station_id: str) -> bool:
+        data = await make_nws_request(
+            f"{NWS_API_BASE}/stations/{station_id}/observations?limit={OBSERVATION_BACKFILL}"
+        )
+        if not data or "features" not in data:
+            return False
+        series = self.series.setdefault(station_id, ObservationSeries())
+        # NWS returns newest first; the ring buffer is filled oldest first
+        for feature in reversed(data["features"]):
+            series.append(feature["properties"])
+        self._fetched_at[station_id] = time.time()
+        return True
+
+    async def _refresh_latest(self, station_id: str) -> bool:
+        data = await make_nws_request(f"{NWS_API_BASE}/stations/{station_id}/observations/latest")
+        if not data or "properties" not in data:
+            return False
+        self.series[station_id].append(data["properties"])
+        self._fetched_at[station_id] = time.time()
+        return True
+
+    async def read(self, station_id: str) -> ObservationSeries | None:
+        """The station's series, fetched only if it is not already being kept current."""
+        self._last_read[station_id] = time.time()
+        if self._task is None or self._task.done():
+            self._task = create_detached_task(self._refresh_loop())
+
+        if station_id not in self.series:
+            await self._backfill(station_id)
+        elif time.time() - self._fetched_at.get(station_id, 0) > 2 * self.refresh_seconds:
+            # Not kept current by the background loop (or it fell behind)
+            await self._refresh_latest(station_id)
+
+        series = self.series.get(station_id)
+        return series if series is not None and series.count else None
+
+    async def refresh_hot(self) -> int:
+        """Refresh every hot station's latest observation. Returns the number refreshed."""
+        now = time.time()
+        for station_id in [s for s, read_at in self._last_read.items() if now - read_at > self.hot_seconds]:
+            # Cold again: drop it so the store only holds what is being asked for
+            del self._last_read[station_id]
+            self.series.pop(station_id, None)
+            self._fetched_at.pop(station_id, None)
+
+        due = [s for s in self._last_read if s in self.series and now - self._fetched_at.get(s, 0) >= self.refresh_seconds]
+        results = await asyncio.gather(*(self._refresh_latest(s) for s in due), return_exceptions=True)
+        return sum(1 for result in results if result is True)
+
+    async def _refresh_loop(self) -> None:
+        while self._last_read:
+            await asyncio.sleep(self.refresh_seconds)
+            try:
+                await self.refresh_hot()
+            except Exception:
+                logger.exception("Observation refresh failed")
+
+
+observation_store = ObservationStore()
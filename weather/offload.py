@@ -0,0 +1,103 @@
+import asyncio
+import contextvars
+import json
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, TypeVar
+
+from constants import (
+    OFFLOAD_DECODE_MIN_BYTES,
+    OFFLOAD_PROCESS_WORKERS,
+    OFFLOAD_THREAD_MIN_ITEMS,
+    OFFLOAD_THREAD_WORKERS,
+)
+from tracing import span
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Where work ran: inline on the event loop, in a worker process or thread, or
+# inline after the process pool failed
+offload_stats = {"inline": 0, "process": 0, "thread": 0, "fallback": 0}
+
+_processes: ProcessPoolExecutor | None = None
+_threads: ThreadPoolExecutor | None = None
+
+
+def _process_pool() -> ProcessPoolExecutor:
+    global _processes
+    if _processes is None:
+        # Spawned rather than forked: the server process runs threads of its own
+        _processes = ProcessPoolExecutor(OFFLOAD_PROCESS_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _processes
+
+
+def _thread_pool() -> ThreadPoolExecutor:
+    global _threads
+    if _threads is None:
+        _threads = ThreadPoolExecutor(OFFLOAD_THREAD_WORKERS, thread_name_prefix="offload")
+    return _threads
+
+
+def _decode(content: bytes, transform: Callable[[Any], Any] | None) -> Any:
+    data = json.loads(content)
+    return transform(data) if transform is not None else data
+
+
+async def decode_json(content: bytes, transform: Callable[[Any], Any] | None = None) -> Any:
+    """Decode a JSON response body, then apply transform to it if given.
+
+    Large bodies with a transform are decoded and transformed in a worker
+    process, so the event loop only unpickles the (much smaller) result.
+    Everything else is decoded inline: json.loads holds the GIL throughout, so
+    moving a plain decode to a thread would stall the loop just the same, and
+    shipping the full payload back from a process costs more than decoding it.
+    The transform must be picklable (a module-level function or a partial of one).
+    """
+    global _processes
+    if transform is None or len(content) < OFFLOAD_DECODE_MIN_BYTES:
+        offload_stats["inline"] += 1
+        return _decode(content, transform)
+
+    with span("offload.decode", bytes=len(content)):
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(_process_pool(), _decode, content, transform)
+        except BrokenProcessPool:
+            logger.warning("Offload process pool broke; decoding inline")
+            _processes.shutdown(wait=False, cancel_futures=True)
+            _processes = None
+            offload_stats["fallback"] += 1
+            return _decode(content, transform)
+    offload_stats["process"] += 1
+    return result
+
+
+async def run_bulk(function: Callable[..., T], items: list, *args: Any) -> T:
+    """Run function(items, *args), in a worker thread when there are many items.
+
+    For pure-Python bulk work (filtering or classifying thousands of features):
+    a thread gives the GIL back to the event loop every switch interval, so
+    concurrent calls keep running. Few items stay inline on the fast path.
+    """
+    if len(items) < OFFLOAD_THREAD_MIN_ITEMS:
+        offload_stats["inline"] += 1
+        return function(items, *args)
+
+    context = contextvars.copy_context()
+    with span("offload.thread", items=len(items)):
+        result = await asyncio.get_running_loop().run_in_executor(
+            _thread_pool(), context.run, function, items, *args
+        )
+    offload_stats["thread"] += 1
+    return result
+
+
+def shutdown() -> None:
+    global _processes, _threads
+    for pool in (_processes, _threads):
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+    _processes = _threads = None
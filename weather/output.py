@@ -0,0 +1,71 @@
+import json
+import os
+from contextvars import ContextVar
+from typing import Any, Callable
+
+from constants import OUTPUT_MODE_ENV
+from tracing import span
+
+OUTPUT_MODES = ("text", "compact")
+
+# Per-call override of the server-wide output mode (e.g. for in-process agent callers)
+output_mode_override: ContextVar[str | None] = ContextVar("output_mode_override", default=None)
+
+
+def output_mode() -> str:
+    """Active output mode: the per-call override, else the server setting, else "text"."""
+    mode = output_mode_override.get() or os.environ.get(OUTPUT_MODE_ENV, "text")
+    return mode if mode in OUTPUT_MODES else "text"
+
+
+def is_compact() -> bool:
+    return output_mode() == "compact"
+
+
+def _prune(value: Any) -> Any:
+    # Drop missing fields so compact payloads carry only data that is present
+    if isinstance(value, dict):
+        return {key: _prune(item) for key, item in value.items() if item is not None and item != ""}
+    if isinstance(value, list):
+        return [_prune(item) for item in value]
+    return value
+
+
+def columnar(records: list[dict[str, Any]]) -> dict[str, list]:
+    """Records as one "fields" header and a row of values per record, for compact views.
+
+    Cheaper than repeating every key on long lists of short records; a field a
+    record lacks is null in its row so the columns stay aligned.
+    """
+    fields = list(dict.fromkeys(field for record in records for field in record))
+    return {"fields": fields, "rows": [[record.get(field) for field in fields] for record in records]}
+
+
+def to_compact_json(data: Any) -> str:
+    return json.dumps(_prune(data), separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def render(data: Any, text_renderer: Callable[[Any], str],
+           compact_view: Callable[[Any], Any] | None = None) -> str:
+    """Render tool data as compact JSON or, in text mode, with its human-readable renderer.
+
+    The text renderer only runs in text mode, so compact callers skip formatting entirely.
+    compact_view, if given, reshapes the data for compact mode (shorter keys,
+    trimmed free text) and likewise only runs there.
+    """
+    with span("render", mode=output_mode()):
+        if is_compact():
+            return to_compact_json(compact_view(data) if compact_view is not None else data)
+        return text_renderer(data)
+
+
+def render_error(message: str) -> str:
+    """Render a tool failure message in the active output mode."""
+    if is_compact():
+        return to_compact_json({"error": message})
+    return message
+
+
+def is_error(result: str) -> bool:
+    """Check whether a compact-mode result is an error payload."""
+    return result.startswith('{"error":')
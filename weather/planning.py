@@ -0,0 +1,178 @@
+import asyncio
+from array import array
+from datetime import datetime
+from itertools import accumulate
+from typing import Any
+
+from constants import WINDOW_SEARCH_FETCH_CONCURRENCY
+from snapshot import get_snapshot
+from utils import wind_mph
+
+# Scoring profiles: comfortable temperature range (°F) and how far outside it
+# still scores, wind and precipitation chance tolerated, which part of the day
+# counts (True = daytime only, False = night only, None = any hour), and
+# forecast terms that rule an hour out or scale its score down
+WINDOW_PROFILES = {
+    "hiking": {"temp": (50, 75), "tolerance": 15, "max_wind": 20, "max_precip": 30, "daytime": True,
+               "exclude": ("thunder",), "penalize": {"rain": 0.4, "snow": 0.4, "showers": 0.5}},
+    "outdoor_event": {"temp": (65, 82), "tolerance": 12, "max_wind": 15, "max_precip": 20, "daytime": True,
+                      "exclude": ("thunder",), "penalize": {"rain": 0.3, "showers": 0.4, "snow": 0.3}},
+    "running": {"temp": (45, 65), "tolerance": 15, "max_wind": 15, "max_precip": 40, "daytime": None,
+                "exclude": ("thunder",), "penalize": {"rain": 0.6, "snow": 0.5, "fog": 0.8}},
+    "cycling": {"temp": (55, 78), "tolerance": 12, "max_wind": 12, "max_precip": 20, "daytime": True,
+                "exclude": ("thunder",), "penalize": {"rain": 0.3, "snow": 0.2, "fog": 0.7}},
+    "beach": {"temp": (78, 92), "tolerance": 8, "max_wind": 15, "max_precip": 20, "daytime": True,
+              "exclude": ("thunder",), "penalize": {"rain": 0.3, "showers": 0.4, "cloudy": 0.7}},
+    "stargazing": {"temp": (40, 75), "tolerance": 20, "max_wind": 15, "max_precip": 10, "daytime": False,
+                   "exclude": ("thunder", "rain", "snow", "fog"), "penalize": {"partly cloudy": 0.6, "cloudy": 0.2}},
+}
+
+
+def _fahrenheit(period: dict) -> float | None:
+    temp = period.get("temperature")
+    if temp is None:
+        return None
+    return temp * 9 / 5 + 32 if period.get("temperatureUnit") == "C" else float(temp)
+
+
+def _precip(period: dict) -> float:
+    return float((period.get("probabilityOfPrecipitation") or {}).get("value") or 0)
+
+
+def hour_score(period: dict, profile: dict) -> float | None:
+    """Suitability of one forecast hour from 0 to 1, or None if the hour rules a window out."""
+    conditions = (period.get("shortForecast") or "").lower()
+    daytime = profile["daytime"]
+    if daytime is not None and bool(period.get("isDaytime")) != daytime:
+        return None
+    if any(term in conditions for term in profile["exclude"]):
+        return None
+
+    temp = _fahrenheit(period)
+    low, high = profile["temp"]
+    if temp is None:
+        temp_score = 0.5
+    else:
+        distance = low - temp if temp < low else temp - high if temp > high else 0
+        temp_score = max(0.0, 1 - distance / profile["tolerance"])
+
+    wind = wind_mph(period.get("windSpeed")) or 0
+    max_wind = profile["max_wind"]
+    wind_score = 1.0 if wind <= max_wind else max(0.0, 1 - (wind - max_wind) / max_wind)
+
+    precip = _precip(period)
+    precip_score = 1 - precip / 100
+    if precip > profile["max_precip"]:
+        precip_score /= 2
+
+    score = 0.4 * temp_score + 0.25 * wind_score + 0.35 * precip_score
+    for term, factor in profile["penalize"].items():
+        if term in conditions:
+            score *= factor
+            break
+    return score
+
+
+class LocationHours:
+    """One location's hourly forecast, scored hour by hour for a profile.
+
+    Scores, rule-out marks and start times are kept in flat arrays with prefix
+    sums, so every window of any length is scored in constant time.
+    """
+
+    def __init__(self, latitude: float, longitude: float, place: str | None, periods: list[dict], profile: dict):
+        self.latitude = latitude
+        self.longitude = longitude
+        self.place = place
+        self.periods = periods
+        scores = array("d")
+        excluded = array("d")
+        self.starts = array("d")
+        for period in periods:
+            try:
+                self.starts.append(datetime.fromisoformat(period["startTime"]).timestamp())
+            except (KeyError, TypeError, ValueError):
+                self.starts.append(float("nan"))
+            score = hour_score(period, profile)
+            scores.append(score or 0.0)
+            excluded.append(1.0 if score is None else 0.0)
+        self.score_sums = array("d", accumulate(scores, initial=0.0))
+        self.excluded_sums = array("d", accumulate(excluded, initial=0.0))
+
+    def windows(self, hours: int) -> list[tuple[float, int]]:
+        """(mean score, start index) of every window of consecutive, allowed hours."""
+        found = []
+        span_seconds = (hours - 1) * 3600
+        sums, excluded, starts = self.score_sums, self.excluded_sums, self.starts
+        for start in range(len(self.periods) - hours + 1):
+            end = start + hours
+            # NaN start times fail the contiguity test too
+            if excluded[end] - excluded[start] == 0 and starts[end - 1] - starts[start] == span_seconds:
+                found.append(((sums[end] - sums[start]) / hours, start))
+        return found
+
+    def window_record(self, start: int, hours: int, score: float) -> dict[str, Any]:
+        periods = self.periods[start:start + hours]
+        temps = [period["temperature"] for period in periods if period.get("temperature") is not None]
+        winds = [wind for wind in (wind_mph(period.get("windSpeed")) for period in periods) if wind is not None]
+        return {
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+            "place": self.place,
+            "start": periods[0].get("startTime"),
+            "end": periods[-1].get("endTime"),
+            "score": round(score * 100),
+            "temp_min": min(temps, default=None),
+            "temp_max": max(temps, default=None),
+            "unit": periods[0].get("temperatureUnit"),
+            "wind_max_mph": max(winds, default=None),
+            "precip_max": round(max(_precip(period) for period in periods)),
+            "conditions": list(dict.fromkeys(period.get("shortForecast") for period in periods if period.get("shortForecast"))),
+        }
+
+
+def _place(grid: dict) -> str | None:
+    props = (grid.get("relativeLocation") or {}).get("properties") or {}
+    if props.get("city"):
+        return f"{props['city']}, {props.get('state', '')}".rstrip(", ")
+    return None
+
+
+async def load_locations(locations: list[tuple[float, float]], profile: dict, days: int,
+                         concurrency: int = WINDOW_SEARCH_FETCH_CONCURRENCY) -> tuple[list[LocationHours], list[tuple[float, float]]]:
+    """Scored hourly forecasts for each location, and the locations that could not be loaded."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def load(latitude: float, longitude: float) -> LocationHours | None:
+        async with semaphore:
+            # Fan-out lookups: candidate locations shouldn't count toward hot locations
+            location = get_snapshot(latitude, longitude, track=False)
+            periods = await location.hourly()
+            grid = await location.grid()
+        if not periods or not grid:
+            return None
+        return LocationHours(latitude, longitude, _place(grid), periods[:days * 24], profile)
+
+    loaded = await asyncio.gather(*(load(latitude, longitude) for latitude, longitude in locations))
+    unavailable = [point for point, hours in zip(locations, loaded) if hours is None]
+    return [hours for hours in loaded if hours is not None], unavailable
+
+
+def best_windows(locations: list[LocationHours], hours: int, top_k: int) -> list[dict[str, Any]]:
+    """The top_k windows across all locations, best first; windows at one place never overlap."""
+    candidates = (
+        (score, index, start)
+        for index, location in enumerate(locations)
+        for score, start in location.windows(hours)
+    )
+    chosen: list[dict[str, Any]] = []
+    taken: dict[int, list[int]] = {}
+    # Walk candidates best first, skipping windows overlapping one already picked at the same place
+    for score, index, start in sorted(candidates, key=lambda c: (-c[0], c[2])):
+        if any(abs(start - other) < hours for other in taken.get(index, ())):
+            continue
+        taken.setdefault(index, []).append(start)
+        chosen.append(locations[index].window_record(start, hours, score))
+        if len(chosen) == top_k:
+            break
+    return chosen
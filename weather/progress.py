@@ -0,0 +1,52 @@
+import logging
+from typing import Any, Callable
+
+from output import is_compact, to_compact_json
+
+logger = logging.getLogger(__name__)
+
+PARTIAL_LOGGER_NAME = "weather.partial"
+
+
+class PartialResults:
+    """Streams the sections of a multi-fetch tool result as they complete.
+
+    Each finished section goes out as a progress notification (when the
+    client sent a progress token) and as an info log message carrying the
+    rendered section, so the client can show it before the final result,
+    which is still assembled and returned as usual. Calls made outside an MCP
+    request (e.g. in-process) have no one to notify and only return the final
+    result.
+    """
+
+    def __init__(self, ctx: Any, tool_name: str, total: int):
+        self.ctx = ctx
+        self.tool_name = tool_name
+        self.total = total
+        self.done = 0
+
+    @property
+    def is_active(self) -> bool:
+        if self.ctx is None:
+            return False
+        try:
+            self.ctx.request_context
+        except (LookupError, ValueError):
+            return False
+        return True
+
+    async def emit(self, section: str, data: Any, text_renderer: Callable[[Any], str]) -> None:
+        """Report one completed section, rendered in the active output mode."""
+        self.done += 1
+        if not self.is_active:
+            return
+        if is_compact():
+            message = to_compact_json({"tool": self.tool_name, "section": section, "data": data})
+        else:
+            message = f"[{self.tool_name}] {section}:\n{text_renderer(data).strip()}"
+        try:
+            await self.ctx.report_progress(self.done, self.total, message=section)
+            await self.ctx.log("info", message, logger_name=PARTIAL_LOGGER_NAME)
+        except Exception:
+            # Partial results are best effort; the final result still goes out
+            logger.debug("Could not send partial result for %s", self.tool_name, exc_info=True)
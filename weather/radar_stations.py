@@ -0,0 +1,79 @@
+import asyncio
+import time
+from typing import Any
+
+from constants import NWS_API_BASE, RADAR_STATION_REFRESH_SECONDS
+from geo import BallTree
+from utils import make_nws_request
+
+
+def station_id(properties: dict[str, Any]) -> str:
+    """Station ID (e.g. KTWX) of a /radar/stations feature, which carries it as "id"."""
+    return properties.get("id") or properties.get("stationIdentifier") or ""
+
+
+class RadarStationIndex:
+    """Locally indexed copy of the NWS radar station catalog.
+
+    The catalog is a small, nearly static set, so it is fetched once and
+    refreshed daily instead of querying /radar/stations on every request.
+    """
+
+    def __init__(self, refresh_seconds: float = RADAR_STATION_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self.loaded_at: float | None = None
+        self.features: list[dict] = []
+        self._tree: BallTree | None = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_stale(self) -> bool:
+        return self.loaded_at is None or time.time() - self.loaded_at > self.refresh_seconds
+
+    def load(self, features: list[dict], loaded_at: float | None = None) -> int:
+        """Build the spatial index from radar station GeoJSON features.
+
+        loaded_at backdates the catalog, e.g. when it comes from a cache bundle.
+        """
+        points = []
+        for feature in features:
+            coords = (feature.get("geometry") or {}).get("coordinates")
+            if not coords or len(coords) < 2:
+                continue
+            points.append((coords[1], coords[0], feature["properties"]))
+
+        self._tree = BallTree(points)
+        self.features = features
+        self.loaded_at = time.time() if loaded_at is None else loaded_at
+        return self._tree.size
+
+    async def ensure_loaded(self) -> bool:
+        """Load or refresh the catalog if needed. Returns False if no catalog is available."""
+        if not self.is_stale:
+            return True
+
+        async with self._lock:
+            if not self.is_stale:
+                return True
+            data = await make_nws_request(f"{NWS_API_BASE}/radar/stations")
+            if data and data.get("features"):
+                self.load(data["features"])
+
+        # Keep serving a stale catalog rather than failing when a refresh does not succeed
+        return self._tree is not None
+
+    def nearest(self, latitude: float, longitude: float, count: int = 5,
+                radius_km: float | None = None) -> list[tuple[float, dict[str, Any]]]:
+        """Nearest stations as (distance_km, properties) pairs, optionally limited to a radius."""
+        if self._tree is None:
+            return []
+        return self._tree.nearest(latitude, longitude, count, max_km=radius_km)
+
+    def within(self, latitude: float, longitude: float, radius_km: float) -> list[tuple[float, dict[str, Any]]]:
+        """All stations within radius_km as (distance_km, properties) pairs, nearest first."""
+        if self._tree is None:
+            return []
+        return self._tree.within(latitude, longitude, radius_km)
+
+
+radar_station_index = RadarStationIndex()
@@ -0,0 +1,129 @@
+import functools
+import inspect
+import sys
+import time
+from typing import Any, Awaitable, Callable, Hashable
+
+from cache_manager import cache_manager
+from output import output_mode
+from utils import lazy_import
+
+snapshot = lazy_import("snapshot")
+alert_watch = lazy_import("alert_watch")
+
+# Computes the version of the data a tool call would render, or None if it is not
+# (reliably) available, from the call's arguments; awaiting it loads that data
+DataVersion = Callable[[dict[str, Any]], Awaitable[Hashable | None]]
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _normalize(arguments: dict[str, Any]) -> Hashable:
+    # Arguments that name the same data share a key: coordinates rounded as for
+    # location snapshots, state and area codes in upper case
+    normalized = {}
+    for name, value in arguments.items():
+        if name in ("latitude", "longitude") and isinstance(value, (int, float)):
+            value = round(float(value), 4)
+        elif name in ("state", "area") and isinstance(value, str):
+            value = value.upper()
+        normalized[name] = value
+    return _freeze(normalized)
+
+
+class RenderCache:
+    """Store of rendered tool results, evicted by the shared cache manager.
+
+    Results are keyed on the tool, its normalized arguments, the output mode
+    and the version of the data they were rendered from, so an entry can only
+    be reused while that data is unchanged and never needs invalidating.
+    """
+
+    def __init__(self):
+        self.stats = {"hits": 0, "misses": 0}
+        self._entries: dict[Hashable, str] = {}
+        cache_manager.register("render", self._evict, lambda: self.stats)
+
+    def get(self, key: Hashable) -> str | None:
+        result = self._entries.get(key)
+        if result is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        cache_manager.hit("render", key)
+        return result
+
+    def put(self, key: Hashable, result: str, cost: float) -> None:
+        """Keep a result that took cost seconds to produce."""
+        self._entries[key] = result
+        cache_manager.put("render", key, sys.getsizeof(result), cost)
+
+    def _evict(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        for key in self._entries:
+            cache_manager.discard("render", key)
+        self._entries.clear()
+
+
+render_cache = RenderCache()
+
+
+def memoize_render(data_version: DataVersion):
+    """Reuse a tool's rendered result while the data it is built from is unchanged.
+
+    The wrapped tool only runs when there is no result for the same arguments,
+    output mode and data version; calls whose data version is None always run.
+    """
+    def decorator(tool: Callable[..., Awaitable[str]]):
+        signature = inspect.signature(tool)
+
+        @functools.wraps(tool)
+        async def wrapper(*args, **kwargs) -> str:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            version = await data_version(bound.arguments)
+            if version is None:
+                return await tool(*args, **kwargs)
+
+            key = (tool.__name__, _normalize(bound.arguments), output_mode(), version)
+            result = render_cache.get(key)
+            if result is None:
+                started = time.monotonic()
+                result = await tool(*args, **kwargs)
+                render_cache.put(key, result, time.monotonic() - started)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def facet_version(*facets: str) -> DataVersion:
+    """Data version of a location tool: the generations of the snapshot facets it reads."""
+    async def version(arguments: dict[str, Any]) -> Hashable | None:
+        location = snapshot.get_snapshot(arguments["latitude"], arguments["longitude"])
+        for facet in facets:
+            if await getattr(location, facet)() is None:
+                return None
+        return location.version(*facets)
+
+    return version
+
+
+def alert_scope_version(scope_for: Callable[[dict[str, Any]], Any]) -> DataVersion:
+    """Data version of an alert tool: the fingerprint of its scope's current alert set."""
+    async def version(arguments: dict[str, Any]) -> Hashable | None:
+        scope = scope_for(arguments)
+        if await alert_watch.alert_watcher.read(scope) is None:
+            return None
+        return alert_watch.alert_watcher.fingerprint(scope)
+
+    return version
@@ -0,0 +1,262 @@
+import asyncio
+import math
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable
+
+from constants import ROUTE_CELL_KM, ROUTE_FETCH_CONCURRENCY, ROUTE_MAX_SAMPLES, ROUTE_SAMPLE_SPACING_KM
+from geo import haversine_km
+from snapshot import LocationSnapshot, get_snapshot
+from utils import wind_mph
+
+KM_PER_DEGREE_LATITUDE = 111.2
+
+
+def decode_polyline(polyline: str, precision: int = 5) -> list[tuple[float, float]]:
+    """Decode an encoded polyline (the Google / OSRM format) into (lat, lon) points."""
+    points = []
+    index = latitude = longitude = 0
+    factor = 10 ** precision
+    while index < len(polyline):
+        deltas = []
+        for _ in range(2):
+            shift = result = 0
+            while True:
+                if index >= len(polyline):
+                    raise ValueError("Truncated polyline")
+                byte = ord(polyline[index]) - 63
+                index += 1
+                result |= (byte & 0x1F) << shift
+                shift += 5
+                if byte < 0x20:
+                    break
+            deltas.append(~(result >> 1) if result & 1 else result >> 1)
+        latitude += deltas[0]
+        longitude += deltas[1]
+        points.append((latitude / factor, longitude / factor))
+    return points
+
+
+def sample_route(points: list[tuple[float, float]], spacing_km: float = ROUTE_SAMPLE_SPACING_KM,
+                 max_samples: int = ROUTE_MAX_SAMPLES) -> list[tuple[float, float, float]]:
+    """Points every spacing_km along a route as (lat, lon, km_from_start), both ends included.
+
+    Long routes get a wider spacing so no more than max_samples are taken.
+    """
+    if not points:
+        return []
+    lengths = [haversine_km(*a, *b) for a, b in zip(points, points[1:])]
+    total = sum(lengths)
+    spacing = max(spacing_km, total / max(max_samples - 1, 1), 0.1)
+
+    samples = [(points[0][0], points[0][1], 0.0)]
+    travelled = 0.0
+    next_at = spacing
+    for (lat1, lon1), (lat2, lon2), length in zip(points, points[1:], lengths):
+        # Segments are short next to the Earth's curvature, so interpolate linearly
+        while length and next_at <= travelled + length and len(samples) < max_samples - 1:
+            fraction = (next_at - travelled) / length
+            samples.append((lat1 + (lat2 - lat1) * fraction, lon1 + (lon2 - lon1) * fraction, next_at))
+            next_at += spacing
+        travelled += length
+    if total > samples[-1][2]:
+        samples.append((points[-1][0], points[-1][1], total))
+    return samples
+
+
+def _lattice_key(latitude: float, longitude: float) -> tuple[int, int]:
+    lat_step = ROUTE_CELL_KM / KM_PER_DEGREE_LATITUDE
+    lon_step = lat_step / max(math.cos(math.radians(latitude)), 0.01)
+    return (math.floor(latitude / lat_step), math.floor(longitude / lon_step))
+
+
+class CorridorCell:
+    """One NWS gridpoint crossed by a route, with the stretch of route it covers."""
+
+    __slots__ = ("gridpoint", "location", "from_km", "to_km", "samples", "county", "hourly")
+
+    def __init__(self, gridpoint: str, location: LocationSnapshot):
+        self.gridpoint = gridpoint
+        self.location = location
+        self.from_km = math.inf
+        self.to_km = 0.0
+        self.samples = 0
+        self.county: str | None = None
+        self.hourly: list[dict] | None = None
+
+    def add(self, samples: list[tuple[float, float, float]]) -> None:
+        """Extend the cell over route samples (lat, lon, km_from_start) that fall in it."""
+        for _, _, km in samples:
+            self.from_km = min(self.from_km, km)
+            self.to_km = max(self.to_km, km)
+        self.samples += len(samples)
+
+
+class Corridor:
+    """Weather for every unique gridpoint and county along a sampled route.
+
+    Samples in the same 2.5 km lattice square share one /points lookup, and
+    each gridpoint's forecast and each county's alerts are fetched once, with
+    at most `concurrency` fetches in flight.
+    """
+
+    def __init__(self, samples: list[tuple[float, float, float]], concurrency: int = ROUTE_FETCH_CONCURRENCY):
+        self.samples = samples
+        self.concurrency = concurrency
+        self.lookups = 0
+        self.unresolved = 0
+        self.cells: list[CorridorCell] = []
+        self.alerts: dict[str, list[dict]] = {}
+
+    async def load(self) -> "Corridor":
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(coro):
+            async with semaphore:
+                return await coro
+
+        # Nearby samples share a lookup; keep the stretch of route each lattice square covers
+        squares: dict[tuple[int, int], list[tuple[float, float, float]]] = {}
+        for sample in self.samples:
+            squares.setdefault(_lattice_key(sample[0], sample[1]), []).append(sample)
+        self.lookups = len(squares)
+
+        # Background-style lookups: route samples shouldn't count toward hot locations
+        locations = [get_snapshot(group[0][0], group[0][1], track=False) for group in squares.values()]
+        grids = await asyncio.gather(*(bounded(location.grid()) for location in locations))
+
+        cells: dict[str, CorridorCell] = {}
+        for group, location, grid in zip(squares.values(), locations, grids):
+            if not grid:
+                self.unresolved += len(group)
+                continue
+            cell = cells.get(location.gridpoint)
+            if cell is None:
+                cell = cells[location.gridpoint] = CorridorCell(location.gridpoint, location)
+            cell.add(group)
+        self.cells = sorted(cells.values(), key=lambda cell: cell.from_km)
+
+        counties = await asyncio.gather(*(cell.location.county_code() for cell in self.cells))
+        by_county: dict[str, CorridorCell] = {}
+        for cell, county in zip(self.cells, counties):
+            cell.county = county
+            if county:
+                by_county.setdefault(county, cell)
+
+        hourly, alerts = await asyncio.gather(
+            asyncio.gather(*(bounded(cell.location.hourly()) for cell in self.cells)),
+            asyncio.gather(*(bounded(cell.location.zone_alerts()) for cell in by_county.values())),
+        )
+        for cell, periods in zip(self.cells, hourly):
+            cell.hourly = periods
+        self.alerts = {county: features or [] for county, features in zip(by_county, alerts)}
+        return self
+
+
+def _hour(start_time: str | None) -> datetime | None:
+    try:
+        return datetime.fromisoformat(start_time).astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _precip(period: dict) -> int | None:
+    return (period.get("probabilityOfPrecipitation") or {}).get("value")
+
+
+def _period_at(periods: Iterable[dict], when: datetime) -> dict | None:
+    """The forecast period covering a moment (the first one if it is before the forecast)."""
+    found = None
+    for period in periods:
+        start = _hour(period.get("startTime"))
+        if start is None:
+            continue
+        if found is not None and start > when:
+            break
+        found = period
+    return found
+
+
+def corridor_summary(corridor: Corridor, hours: int, average_speed_kmh: float = 0) -> dict[str, Any]:
+    """Merge per-cell forecasts into an hour-by-hour timeline for the whole route.
+
+    With an average speed, each stretch also gets the forecast for the hour it
+    is reached when leaving now.
+    """
+    timeline: dict[datetime, dict[str, Any]] = {}
+    for cell in corridor.cells:
+        for period in (cell.hourly or [])[:hours]:
+            hour = _hour(period.get("startTime"))
+            if hour is None:
+                continue
+            row = timeline.setdefault(hour, {"temps": [], "winds": [], "precip": [], "conditions": {}, "unit": None})
+            if period.get("temperature") is not None:
+                row["temps"].append(period["temperature"])
+            row["unit"] = row["unit"] or period.get("temperatureUnit")
+            wind = wind_mph(period.get("windSpeed"))
+            if wind is not None:
+                row["winds"].append(wind)
+            if _precip(period) is not None:
+                row["precip"].append(_precip(period))
+            if period.get("shortForecast"):
+                row["conditions"][period["shortForecast"]] = None
+
+    hours_out = []
+    for hour in sorted(timeline)[:hours]:
+        row = timeline[hour]
+        hours_out.append({
+            "time": hour.isoformat(),
+            "temp_min": min(row["temps"], default=None),
+            "temp_max": max(row["temps"], default=None),
+            "unit": row["unit"],
+            "wind_max_mph": max(row["winds"], default=None),
+            "precip_max": max(row["precip"], default=None),
+            "conditions": list(row["conditions"]),
+        })
+
+    now = datetime.fromtimestamp(time.time(), timezone.utc)
+    segments = []
+    for cell in corridor.cells:
+        reached = now + timedelta(hours=cell.from_km / average_speed_kmh) if average_speed_kmh > 0 else now
+        period = _period_at(cell.hourly or [], reached)
+        segment = {
+            "from_km": round(cell.from_km, 1),
+            "to_km": round(cell.to_km, 1),
+            "gridpoint": cell.gridpoint,
+            "county": cell.county,
+            "alerts": list(dict.fromkeys(
+                feature["properties"].get("event", "Unknown") for feature in corridor.alerts.get(cell.county, [])
+            )),
+        }
+        if average_speed_kmh > 0:
+            segment["eta"] = reached.isoformat(timespec="minutes")
+        if period is not None:
+            segment["forecast"] = {
+                "temp": period.get("temperature"),
+                "unit": period.get("temperatureUnit"),
+                "wind": period.get("windSpeed"),
+                "precip": _precip(period),
+                "forecast": period.get("shortForecast"),
+            }
+        segments.append(segment)
+
+    alerts: dict[str, dict[str, Any]] = {}
+    for county, features in corridor.alerts.items():
+        for feature in features:
+            props = feature["properties"]
+            alert = alerts.setdefault(props.get("id") or feature.get("id") or props.get("event"), {
+                "event": props.get("event", "Unknown"), "severity": props.get("severity"), "counties": [],
+            })
+            alert["counties"].append(county)
+
+    return {
+        "distance_km": round(corridor.samples[-1][2], 1) if corridor.samples else 0.0,
+        "samples": len(corridor.samples),
+        "lookups": corridor.lookups,
+        "gridpoints": len(corridor.cells),
+        "counties": len(corridor.alerts),
+        "unresolved_samples": corridor.unresolved,
+        "timeline": hours_out,
+        "segments": segments,
+        "alerts": list(alerts.values()),
+    }
@@ -1,20 +1,97 @@
+import asyncio
+import json
+import os
+import signal
+from contextlib import asynccontextmanager
+
 from mcp.server.fastmcp import FastMCP
-from tools import (
-    register_weather_tools, 
-    register_forecast_tools,
-    register_weather_map_tools,
-    register_severe_weather_tools,
-    register_weather_recommendation_tools,
-    register_web_enhanced_tools
-)
+from admission import admission_controller, current_session_key
+from constants import TOOL_DEADLINE_ENV, TOOL_DEADLINE_SECONDS, TOOL_PROFILE_ENV
+from deadline import deadline_scope
+from tools import DEFAULT_TOOL_PROFILE, register_tool_profile
+from tracing import span
+from utils import close_nws_client
+
+
+class WeatherMCP(FastMCP):
+    """FastMCP server that gives every tool call an end-to-end deadline.
+
+    Upstream NWS requests made by the tool only get the remaining budget, and
+    a call cancelled by the client cancels its in-flight requests with it.
+    Calls are admitted through the admission controller's bulkheads first.
+    """
+
+    def __init__(self, *args, tool_deadline: float = TOOL_DEADLINE_SECONDS, **kwargs):
+        self.tool_deadline = tool_deadline
+        super().__init__(*args, **kwargs)
+
+    def _session_key(self):
+        try:
+            return id(self._mcp_server.request_context.session)
+        except LookupError:
+            return current_session_key.get()  # In-process call, e.g. from the A2A front-end
+
+    async def call_tool(self, name, arguments):
+        with span("tool", tool=name), deadline_scope(self.tool_deadline):
+            async with admission_controller.admit(name, self._session_key()):
+                return await super().call_tool(name, arguments)
+
+
+@asynccontextmanager
+async def lifespan(server):
+    import cache_bundle
+    import offload
+    from alert_aggregates import alert_aggregator
+    from alert_watch import alert_watcher
+    from hot_locations import hot_locations
+    from imagery import image_cache
+    from loop_monitor import loop_monitor
+
+    # Seed the caches from the configured bundle; SIGUSR1 re-exports it on demand
+    cache_bundle.load_configured_bundle()
+    loop = asyncio.get_running_loop()
+    if hasattr(signal, "SIGUSR1"):
+        loop.add_signal_handler(signal.SIGUSR1, cache_bundle.save_configured_bundle)
+
+    # Prefetch the persisted hot locations and keep them fresh while the server runs
+    hot_locations.start()
+    loop_monitor.start()
+    try:
+        yield {}
+    finally:
+        await loop_monitor.stop()
+        await hot_locations.stop()
+        await alert_aggregator.stop()
+        await alert_watcher.stop()
+        if hasattr(signal, "SIGUSR1"):
+            loop.remove_signal_handler(signal.SIGUSR1)
+        cache_bundle.save_configured_bundle()
+        image_cache.shutdown()
+        offload.shutdown()
+        await close_nws_client()
+
 
 # Initialize FastMCP server
-mcp = FastMCP("weather")
-
-# Register all weather tools
-register_weather_tools(mcp)
-register_forecast_tools(mcp)
-register_weather_map_tools(mcp)
-register_severe_weather_tools(mcp)
-register_weather_recommendation_tools(mcp)
-register_web_enhanced_tools(mcp)
\ No newline at end of file
+mcp = WeatherMCP(
+    "weather",
+    lifespan=lifespan,
+    tool_deadline=float(os.environ.get(TOOL_DEADLINE_ENV, TOOL_DEADLINE_SECONDS)),
+)
+
+# Register the tools for the configured profile (all tools by default)
+register_tool_profile(mcp, os.environ.get(TOOL_PROFILE_ENV, DEFAULT_TOOL_PROFILE))
+
+
+@mcp.resource("metrics://server", mime_type="application/json")
+def server_metrics() -> str:
+    """Event loop lag, work moved off the event loop, admission control state and cache occupancy."""
+    from cache_manager import cache_manager
+    from loop_monitor import loop_monitor
+    from offload import offload_stats
+
+    return json.dumps({
+        "event_loop_lag": loop_monitor.stats(),
+        "offload": offload_stats,
+        "admission": admission_controller.stats(),
+        "caches": cache_manager.stats(),
+    })
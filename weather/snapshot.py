@@ -0,0 +1,275 @@
+import asyncio
+import functools
+import itertools
+import time
+from collections import OrderedDict
+from typing import Any
+
+from constants import (
+    NWS_API_BASE,
+    SNAPSHOT_ALERTS_TTL_SECONDS,
+    SNAPSHOT_FORECAST_TTL_SECONDS,
+    SNAPSHOT_GRID_TTL_SECONDS,
+    SNAPSHOT_MAX_LOCATIONS,
+    SNAPSHOT_SEEDED_COST_SECONDS,
+)
+import deadline
+from cache_manager import approx_size, cache_manager
+from tracing import span
+from utils import make_nws_request
+from zones import zone_index
+
+# Facet reads served from memory vs. those that had to wait for an upstream fetch
+facet_stats = {"hits": 0, "misses": 0}
+
+# Numbers each fetched or installed facet value, see LocationSnapshot.version
+_generations = itertools.count(1)
+
+
+class LocationSnapshot:
+    """Shared, lazily loaded weather data for one location.
+
+    Each facet (grid metadata, forecast periods, hourly periods, zone alerts)
+    is fetched on first use, memoized for its TTL and shared by every tool
+    that asks for it, so calling several location tools for one place
+    fetches and parses the data once. Concurrent callers await the same
+    in-flight fetch, which is cancelled if all of them are. Failed fetches
+    are not memoized.
+    """
+
+    FACET_TTLS = {
+        "grid": SNAPSHOT_GRID_TTL_SECONDS,
+        "periods": SNAPSHOT_FORECAST_TTL_SECONDS,
+        "hourly": SNAPSHOT_FORECAST_TTL_SECONDS,
+        "zone_alerts": SNAPSHOT_ALERTS_TTL_SECONDS,
+    }
+
+    def __init__(self, latitude: float, longitude: float):
+        self.latitude = latitude
+        self.longitude = longitude
+        self._facets: dict[str, tuple[float, asyncio.Future]] = {}
+        self._generations: dict[str, int] = {}
+        self._waiters: dict[str, int] = {}
+
+    def _fresh_value(self, name: str) -> Any:
+        entry = self._facets.get(name)
+        if entry is None:
+            return None
+        expires_at, future = entry
+        if (future.done() and time.monotonic() < expires_at and not future.cancelled()
+                and future.exception() is None):
+            return future.result()
+        return None
+
+    async def _facet(self, name: str) -> Any:
+        with span("cache.facet", facet=name) as facet_span:
+            value = self._fresh_value(name)
+            facet_span.set(hit=value is not None)
+            if value is not None:
+                facet_stats["hits"] += 1
+                cache_manager.hit("snapshot", self._cache_key(name))
+                return value
+            return await self._load_facet(name)
+
+    async def _load_facet(self, name: str) -> Any:
+        facet_stats["misses"] += 1
+        entry = self._facets.get(name)
+        if entry is not None and not entry[1].done():
+            future = entry[1]
+        else:
+            # Shared by every caller, so it runs under none of their deadlines or spans
+            future = deadline.create_detached_task(getattr(self, f"_load_{name}")())
+            future.add_done_callback(functools.partial(self._loaded, name, time.monotonic()))
+            self._facets[name] = (time.monotonic() + self.FACET_TTLS[name], future)
+            self._generations[name] = next(_generations)
+
+        self._waiters[name] = self._waiters.get(name, 0) + 1
+        try:
+            # Each caller waits only as long as its own deadline allows
+            return await asyncio.wait_for(asyncio.shield(future), deadline.remaining())
+        except asyncio.CancelledError:
+            # Stop the shared fetch once every caller waiting on it has gone away
+            if self._waiters[name] == 1:
+                future.cancel()
+            raise
+        except Exception:
+            return None
+        finally:
+            self._waiters[name] -= 1
+
+    def _cache_key(self, name: str) -> tuple[float, float, str]:
+        return self.latitude, self.longitude, name
+
+    def _loaded(self, name: str, started: float, future: asyncio.Future) -> None:
+        # Account for a fetched value with the shared cache manager, weighted by the fetch time
+        entry = self._facets.get(name)
+        if entry is None or entry[1] is not future:
+            return
+        if future.cancelled() or future.exception() is not None or future.result() is None:
+            cache_manager.discard("snapshot", self._cache_key(name))
+        else:
+            cache_manager.put("snapshot", self._cache_key(name), approx_size(future.result()),
+                              time.monotonic() - started)
+
+    def _evict(self, name: str) -> None:
+        entry = self._facets.get(name)
+        if entry is not None and entry[1].done():
+            del self._facets[name]
+
+    def forget(self) -> None:
+        """Stop accounting for this snapshot's facets (when the snapshot itself is dropped)."""
+        for name in self.FACET_TTLS:
+            cache_manager.discard("snapshot", self._cache_key(name))
+
+    def expires_in(self, name: str) -> float | None:
+        """Seconds until a loaded facet expires, or None if it is not loaded."""
+        if self._fresh_value(name) is None:
+            return None
+        return self._facets[name][0] - time.monotonic()
+
+    async def refresh(self, name: str) -> bool:
+        """Reload a facet in the background of readers.
+
+        The current value keeps being served until the new one arrives, and a
+        failed reload leaves it in place. Returns whether the reload succeeded.
+        """
+        started = time.monotonic()
+        try:
+            value = await getattr(self, f"_load_{name}")()
+        except Exception:
+            return False
+        if value is None:
+            return False
+        self._install(name, value, time.monotonic() + self.FACET_TTLS[name], time.monotonic() - started)
+        return True
+
+    def _install(self, name: str, value: Any, expires_at: float, cost: float) -> None:
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(value)
+        self._facets[name] = (expires_at, future)
+        self._generations[name] = next(_generations)
+        cache_manager.put("snapshot", self._cache_key(name), approx_size(value), cost)
+
+    def export_facets(self) -> dict[str, tuple[float, Any]]:
+        """Loaded facets as name -> (wall-clock expiry time, value)."""
+        offset = time.time() - time.monotonic()
+        exported = {}
+        for name in self.FACET_TTLS:
+            value = self._fresh_value(name)
+            if value is not None:
+                exported[name] = (self._facets[name][0] + offset, value)
+        return exported
+
+    def seed(self, name: str, value: Any, expires_at: float) -> None:
+        """Install a facet value that expires at a wall-clock time (math.inf never expires)."""
+        if name not in self.FACET_TTLS:
+            raise ValueError(f"Unknown snapshot facet: {name!r}")
+        self._install(name, value, expires_at - (time.time() - time.monotonic()), SNAPSHOT_SEEDED_COST_SECONDS)
+
+    async def _load_grid(self):
+        data = await make_nws_request(f"{NWS_API_BASE}/points/{self.latitude},{self.longitude}")
+        return data["properties"] if data else None
+
+    async def _load_periods(self):
+        grid = await self.grid()
+        if not grid:
+            return None
+        data = await make_nws_request(grid["forecast"])
+        return data["properties"]["periods"] if data else None
+
+    async def _load_hourly(self):
+        grid = await self.grid()
+        if not grid or not grid.get("forecastHourly"):
+            return None
+        data = await make_nws_request(grid["forecastHourly"])
+        return data["properties"]["periods"] if data else None
+
+    async def _load_zone_alerts(self):
+        county_code = await self.county_code()
+        if not county_code:
+            return None
+        data = await make_nws_request(f"{NWS_API_BASE}/alerts/active/zone/{county_code}")
+        return data.get("features", []) if data else None
+
+    async def grid(self) -> dict[str, Any] | None:
+        """The /points properties: forecast office, grid cell, zone and forecast URLs."""
+        return await self._facet("grid")
+
+    async def periods(self) -> list[dict] | None:
+        """Twelve-hour forecast periods."""
+        return await self._facet("periods")
+
+    async def hourly(self) -> list[dict] | None:
+        """Hourly forecast periods."""
+        return await self._facet("hourly")
+
+    async def zone_alerts(self) -> list[dict] | None:
+        """Active alert features for the location's county."""
+        return await self._facet("zone_alerts")
+
+    async def county_code(self) -> str | None:
+        """County zone code, from the local zone index when possible, else from the grid metadata."""
+        county_code = zone_index.lookup(self.latitude, self.longitude, "county")
+        if county_code:
+            return county_code
+        grid = await self.grid()
+        county = grid.get("county") if grid else None
+        return county.split("/")[-1] if county else None
+
+    def version(self, *names: str) -> tuple[int, ...] | None:
+        """Generation of each named facet's value, or None unless all of them are loaded and fresh.
+
+        A facet gets a new generation whenever it is refetched, so this identifies
+        the data a result was built from.
+        """
+        if any(self._fresh_value(name) is None for name in names):
+            return None
+        return tuple(self._generations[name] for name in names)
+
+    @property
+    def gridpoint(self) -> str | None:
+        """Gridpoint key like "TOP/32,81" once grid metadata is loaded."""
+        grid = self._fresh_value("grid")
+        if not grid:
+            return None
+        return f"{grid['gridId']}/{grid['gridX']},{grid['gridY']}"
+
+
+_snapshots: "OrderedDict[tuple[float, float], LocationSnapshot]" = OrderedDict()
+
+# Called with each snapshot handed out, e.g. to track location popularity
+snapshot_listeners: list = []
+
+
+def get_snapshot(latitude: float, longitude: float, track: bool = True) -> LocationSnapshot:
+    """Shared snapshot for a location; coordinates are rounded to the 4 decimals NWS resolves.
+
+    Listeners are told about the access unless track is False (used by background refreshes).
+    """
+    key = (round(latitude, 4), round(longitude, 4))
+    snapshot = _snapshots.get(key)
+    if snapshot is None:
+        snapshot = _snapshots[key] = LocationSnapshot(*key)
+        if len(_snapshots) > SNAPSHOT_MAX_LOCATIONS:
+            _snapshots.popitem(last=False)[1].forget()
+    else:
+        _snapshots.move_to_end(key)
+    if track:
+        for listener in snapshot_listeners:
+            listener(snapshot)
+    return snapshot
+
+
+def _evict_facet(key: tuple[float, float, str]) -> None:
+    latitude, longitude, name = key
+    snapshot = _snapshots.get((latitude, longitude))
+    if snapshot is not None:
+        snapshot._evict(name)
+
+
+cache_manager.register("snapshot", _evict_facet, lambda: facet_stats)
+
+
+def cached_snapshots() -> list[LocationSnapshot]:
+    """Snapshots currently held, least recently used first."""
+    return list(_snapshots.values())
@@ -0,0 +1,50 @@
+"""Unit tests for tool admission control (admission.py).
+
+Run from the weather/ directory:
+    python -m unittest discover tests
+"""
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from admission import AdmissionController, Overloaded
+
+LIMITS = {
+    "light": {"max_concurrent": 4, "max_queued": 4, "max_wait_seconds": 0.05},
+    "standard": {"max_concurrent": 4, "max_queued": 4, "max_wait_seconds": 0.05},
+    "heavy": {"max_concurrent": 2, "max_queued": 0, "max_wait_seconds": 0.05},
+}
+
+
+class BulkheadIsolationTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.controller = AdmissionController(LIMITS, session_max_concurrent=8)
+        self.release = asyncio.Event()
+        self.held = [asyncio.create_task(self.hold("get_route_weather")) for _ in range(2)]
+        await asyncio.sleep(0)
+        self.assertEqual(self.controller.bulkheads["heavy"].active, 2)
+
+    async def asyncTearDown(self):
+        self.release.set()
+        await asyncio.gather(*self.held)
+
+    async def hold(self, tool_name: str) -> None:
+        async with self.controller.admit(tool_name):
+            await self.release.wait()
+
+    async def test_heavy_tool_is_rejected_when_its_bulkhead_is_full(self):
+        with self.assertRaises(Overloaded):
+            async with self.controller.admit("get_alerts_batch"):
+                pass
+
+    async def test_cached_alert_tools_are_admitted_while_heavy_is_full(self):
+        for tool_name in ("get_alerts", "get_storm_reports", "get_alert_summary"):
+            async with self.controller.admit(tool_name):
+                self.assertNotEqual(self.controller.bulkhead_for(tool_name).name, "heavy")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""Unit tests for the versioned alert change log (alert_log.py).
+
+Run from the weather/ directory:
+    python -m unittest discover tests
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alert_log import AlertLog
+from compact_alerts import CompactAlert
+
+
+def alert(alert_id: str, sent: str, severity: str = "Severe", expires: str = "2026-10-19T20:00:00-05:00") -> CompactAlert:
+    return CompactAlert({"properties": {
+        "id": alert_id, "sent": sent, "event": "Flood Warning", "severity": severity,
+        "areaDesc": "Clay, KS", "expires": expires,
+    }})
+
+
+class ChangesSinceTest(unittest.TestCase):
+    def setUp(self):
+        self.log = AlertLog()
+        self.log.ingest("s", [alert("a", "t1"), alert("b", "t1")])
+        self.cursor = self.log.cursor("s")
+
+    def test_empty_cursor_resyncs(self):
+        changes = self.log.changes_since("s")
+        self.assertTrue(changes["reset"])
+        self.assertEqual([record["id"] for record in changes["new"]], ["a", "b"])
+
+    def test_new_updated_and_expired(self):
+        self.log.ingest("s", [alert("a", "t2", severity="Extreme"), alert("c", "t2")])
+        changes = self.log.changes_since("s", self.cursor)
+        self.assertFalse(changes["reset"])
+        self.assertEqual([record["id"] for record in changes["new"]], ["c"])
+        self.assertEqual([(record["id"], record["changed"]) for record in changes["updated"]], [("a", ["severity"])])
+        self.assertEqual(changes["expired"], ["b"])
+
+    def test_update_compares_with_what_the_cursor_saw(self):
+        self.log.ingest("s", [alert("a", "t2", expires="later"), alert("b", "t1")])
+        self.log.ingest("s", [alert("a", "t3", expires="later", severity="Extreme"), alert("b", "t1")])
+        updated = self.log.changes_since("s", self.cursor)["updated"]
+        self.assertEqual(updated[0]["changed"], ["severity", "expires"])
+
+    def test_expired_then_reappeared(self):
+        self.log.ingest("s", [alert("b", "t1")])
+        self.log.ingest("s", [alert("a", "t1"), alert("b", "t1")])
+        changes = self.log.changes_since("s", self.cursor)
+        self.assertEqual(changes["new"], [])
+        self.assertEqual(changes["expired"], [])
+        self.assertEqual([(record["id"], record["changed"]) for record in changes["updated"]], [("a", [])])
+
+    def test_expired_then_reappeared_changed(self):
+        self.log.ingest("s", [alert("b", "t1")])
+        self.log.ingest("s", [alert("a", "t2", severity="Minor"), alert("b", "t1")])
+        updated = self.log.changes_since("s", self.cursor)["updated"]
+        self.assertEqual([(record["id"], record["changed"]) for record in updated], [("a", ["severity"])])
+
+    def test_new_then_expired_is_not_reported(self):
+        self.log.ingest("s", [alert("a", "t1"), alert("b", "t1"), alert("c", "t1")])
+        self.log.ingest("s", [alert("a", "t1"), alert("b", "t1")])
+        changes = self.log.changes_since("s", self.cursor)
+        self.assertEqual((changes["new"], changes["updated"], changes["expired"]), ([], [], []))
+
+    def test_foreign_cursor_resyncs(self):
+        self.assertTrue(self.log.changes_since("other", self.cursor)["reset"])
+        self.assertTrue(AlertLog().changes_since("s", self.cursor)["reset"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+"""Unit tests for alert scopes and the alert watcher's idle scope eviction (alert_watch.py).
+
+Run from the weather/ directory:
+    python -m unittest discover tests
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alert_log import alert_log
+from alert_watch import AlertScope, AlertWatcher
+
+
+class PointScopeTest(unittest.TestCase):
+    def test_nearby_points_share_a_scope(self):
+        self.assertEqual(AlertScope.point(39.74012, -104.99031, 25).uri, AlertScope.point(39.7432, -104.9914, 25.0).uri)
+
+    def test_uri_round_trips(self):
+        scope = AlertScope.point(39.74012, -104.99031, 25.04)
+        self.assertEqual(AlertScope.from_uri(scope.uri).uri, scope.uri)
+
+
+class IdleEvictionTest(unittest.TestCase):
+    def setUp(self):
+        self.watcher = AlertWatcher(idle_seconds=60, max_idle_scopes=2)
+        self.scopes = [AlertScope.state(state) for state in ("KS", "MO", "NE")]
+        self.addCleanup(lambda: [alert_log.forget(scope.uri) for scope in self.scopes])
+
+    def test_unsubscribed_scopes_beyond_the_cap_are_forgotten_oldest_first(self):
+        for scope in self.scopes:
+            self.watcher._record(scope, [])
+        self.assertEqual(list(self.watcher.snapshots), [self.scopes[1].uri, self.scopes[2].uri])
+        self.assertNotIn(self.scopes[0].uri, alert_log._scopes)
+
+    def test_refetching_keeps_a_scope(self):
+        self.watcher._record(self.scopes[0], [])
+        self.watcher._record(self.scopes[1], [])
+        self.watcher._record(self.scopes[0], [])
+        self.watcher._record(self.scopes[2], [])
+        self.assertEqual(list(self.watcher.snapshots), [self.scopes[0].uri, self.scopes[2].uri])
+
+    def test_subscribed_scopes_are_kept(self):
+        # As subscribe() does, without starting the poll loop
+        self.watcher.scopes[self.scopes[0].uri] = self.scopes[0]
+        self.watcher.idle_seconds = -1
+        for scope in self.scopes:
+            self.watcher._record(scope, [])
+        self.assertEqual(list(self.watcher.snapshots), [self.scopes[0].uri])
+        self.assertIn(self.scopes[0].uri, alert_log._scopes)
+
+    def test_scopes_idle_too_long_are_forgotten(self):
+        self.watcher._record(self.scopes[0], [])
+        self.watcher.idle_seconds = -1
+        self.watcher._record(self.scopes[1], [])
+        self.assertEqual(list(self.watcher.snapshots), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+"""Unit tests for the shared cache memory budget (cache_manager.py).
+
+Run from the weather/ directory:
+    python -m unittest discover tests
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache_manager import CacheManager
+from constants import CACHE_MIN_COST_SECONDS
+
+
+class RecordingCache:
+    """A registered cache that remembers what the manager evicted from it."""
+
+    def __init__(self, manager: CacheManager, name: str):
+        self.evicted = []
+        manager.register(name, self.evicted.append, lambda: {"own": name})
+
+
+class EvictionOrderTest(unittest.TestCase):
+    def setUp(self):
+        self.manager = CacheManager(budget_bytes=100)
+        self.cache = RecordingCache(self.manager, "a")
+
+    def test_cheapest_to_refetch_per_byte_goes_first(self):
+        self.manager.put("a", "slow", 40, cost=10.0)
+        self.manager.put("a", "fast", 40, cost=1.0)
+        self.manager.put("a", "medium", 40, cost=5.0)
+        self.assertEqual(self.cache.evicted, ["fast"])
+
+    def test_larger_entry_goes_first_at_equal_cost(self):
+        self.manager.put("a", "small", 20, cost=1.0)
+        self.manager.put("a", "large", 60, cost=1.0)
+        self.manager.put("a", "new", 30, cost=1.0)
+        self.assertEqual(self.cache.evicted, ["large"])
+
+    def test_hits_keep_an_entry(self):
+        self.manager.put("a", "popular", 40, cost=1.0)
+        self.manager.put("a", "unused", 40, cost=1.0)
+        self.manager.hit("a", "popular")
+        self.manager.put("a", "new", 40, cost=1.0)
+        self.assertEqual(self.cache.evicted, ["unused"])
+
+    def test_clock_ages_out_entries_that_stop_being_used(self):
+        self.manager.put("a", "old", 50, cost=2.0)
+        for _ in range(3):
+            self.manager.hit("a", "old")
+        # Each eviction raises the clock, so fresh entries overtake the old one's stale priority
+        for i in range(20):
+            self.manager.put("a", i, 50, cost=1.0)
+        self.assertIn("old", self.cache.evicted)
+        self.assertLess(self.cache.evicted.index("old"), 19)
+
+    def test_evicts_across_caches(self):
+        other = RecordingCache(self.manager, "b")
+        self.manager.put("a", "cheap", 50, cost=1.0)
+        self.manager.put("b", "dear", 50, cost=10.0)
+        self.manager.put("b", "new", 50, cost=10.0)
+        self.assertEqual(self.cache.evicted, ["cheap"])
+        self.assertEqual(other.evicted, [])
+
+
+class BudgetAccountingTest(unittest.TestCase):
+    def setUp(self):
+        self.manager = CacheManager(budget_bytes=100)
+        self.a = RecordingCache(self.manager, "a")
+        self.b = RecordingCache(self.manager, "b")
+
+    def occupancy(self, cache: str) -> dict:
+        return {key: self.manager.stats()["caches"][cache][key] for key in ("entries", "bytes", "evictions")}
+
+    def test_totals_per_cache_and_overall(self):
+        self.manager.put("a", 1, 30, cost=1.0)
+        self.manager.put("a", 2, 20, cost=1.0)
+        self.manager.put("b", 1, 40, cost=1.0)
+        self.assertEqual(self.manager.bytes, 90)
+        self.assertEqual(self.occupancy("a"), {"entries": 2, "bytes": 50, "evictions": 0})
+        self.assertEqual(self.occupancy("b"), {"entries": 1, "bytes": 40, "evictions": 0})
+
+    def test_stays_within_budget(self):
+        for i in range(50):
+            self.manager.put("a" if i % 2 else "b", i, 15, cost=1.0 + i % 7)
+            self.assertLessEqual(self.manager.bytes, self.manager.budget_bytes)
+        evicted = len(self.a.evicted) + len(self.b.evicted)
+        self.assertEqual(self.occupancy("a")["evictions"] + self.occupancy("b")["evictions"], evicted)
+        self.assertEqual(self.manager.bytes, 15 * (50 - evicted))
+
+    def test_replacing_an_entry_keeps_its_hits(self):
+        self.manager.put("a", "key", 30, cost=1.0)
+        self.manager.hit("a", "key")
+        self.manager.put("a", "key", 10, cost=1.0)
+        self.assertEqual(self.manager.bytes, 10)
+        self.assertEqual(self.occupancy("a")["entries"], 1)
+        self.assertEqual(self.manager._entries["a", "key"].hits, 2)
+
+    def test_resize(self):
+        self.manager.put("a", "key", 30, cost=1.0)
+        self.manager.resize("a", "key", 45)
+        self.assertEqual(self.manager.bytes, 45)
+        self.manager.resize("a", "missing", 10)
+        self.assertEqual(self.manager.bytes, 45)
+
+    def test_discard_does_not_count_as_eviction(self):
+        self.manager.put("a", "key", 30, cost=1.0)
+        self.manager.discard("a", "key")
+        self.assertEqual(self.manager.bytes, 0)
+        self.assertEqual(self.occupancy("a"), {"entries": 0, "bytes": 0, "evictions": 0})
+        self.assertEqual(self.a.evicted, [])
+
+    def test_entry_over_the_whole_budget_is_evicted_at_once(self):
+        self.manager.put("a", "small", 30, cost=1.0)
+        self.manager.put("a", "huge", 150, cost=100.0)
+        self.assertEqual(self.a.evicted, ["huge"])
+        self.assertEqual(self.manager.bytes, 30)
+
+    def test_cost_has_a_floor(self):
+        self.manager.put("a", "key", 10, cost=0.0)
+        self.assertEqual(self.manager._entries["a", "key"].cost, CACHE_MIN_COST_SECONDS)
+
+    def test_stats_include_each_cache_own_counters(self):
+        stats = self.manager.stats()
+        self.assertEqual(stats["budget_bytes"], 100)
+        self.assertEqual(stats["caches"]["a"]["own"], "a")
+
+
+if __name__ == "__main__":
+    unittest.main()
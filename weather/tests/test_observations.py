@@ -0,0 +1,66 @@
+"""Unit tests for the observation station catalog index (observations.py).
+
+Run from the weather/ directory:
+    python -m unittest discover tests
+"""
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from observations import ObservationStationIndex
+
+
+def station(number: int) -> dict:
+    return {
+        "geometry": {"type": "Point", "coordinates": [-97.0 + number / 100, 39.0]},
+        "properties": {"stationIdentifier": f"K{number:03d}", "name": f"Station {number}"},
+    }
+
+
+def catalog(pages: int, fail_at: int | None = None):
+    """A fake paged /stations endpoint; the page after the last comes back empty, as NWS does."""
+    async def request(url: str):
+        page = int(url.rpartition("cursor=")[2] or 0) if "cursor=" in url else 0
+        if page == fail_at:
+            return None
+        features = [station(page)] if page < pages else []
+        return {"features": features, "pagination": {"next": f"https://api.weather.gov/stations?cursor={page + 1}"}}
+    return mock.patch("observations.make_nws_request", side_effect=request)
+
+
+class RefreshTest(unittest.IsolatedAsyncioTestCase):
+    async def test_pages_until_the_catalog_runs_out(self):
+        index = ObservationStationIndex()
+        with catalog(60):
+            self.assertTrue(await index.refresh())
+        self.assertEqual(index._tree.size, 60)
+        self.assertFalse(index.is_stale)
+
+    async def test_catalog_over_the_page_cap_is_not_served(self):
+        index = ObservationStationIndex(max_pages=10)
+        with catalog(60):
+            self.assertFalse(await index.refresh())
+        self.assertFalse(index.is_ready)
+        self.assertTrue(index.is_stale)
+        self.assertEqual(index.retry_delay(), index.retry_seconds)
+
+    async def test_failed_page_keeps_the_previous_catalog_and_retries(self):
+        index = ObservationStationIndex()
+        with catalog(5):
+            await index.refresh()
+        index.loaded_at -= index.refresh_seconds + 1
+        with catalog(8, fail_at=6):
+            self.assertFalse(await index.refresh())
+        self.assertEqual(index._tree.size, 5)
+        self.assertTrue(index.is_stale)
+        with catalog(8):
+            self.assertTrue(await index.refresh())
+        self.assertEqual(index._tree.size, 8)
+        self.assertEqual(index.retry_delay(), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,15 +1,84 @@
-from .get_weather import register_weather_tools
-from .get_forecast import register_forecast_tools
-from .get_weather_maps import register_weather_map_tools
-from .severe_weather_tracker import register_severe_weather_tools
-from .weather_recommendations import register_weather_recommendation_tools
-from .web_enhanced_tools import register_web_enhanced_tools
+from importlib import import_module
+
+# Register functions are resolved on first access so only the tool modules
+# a server actually registers get imported at startup.
+_REGISTER_MODULES = {
+    "register_weather_tools": ".get_weather",
+    "register_forecast_tools": ".get_forecast",
+    "register_weather_map_tools": ".get_weather_maps",
+    "register_severe_weather_tools": ".severe_weather_tracker",
+    "register_weather_recommendation_tools": ".weather_recommendations",
+    "register_web_enhanced_tools": ".web_enhanced_tools",
+    "register_alert_resources": ".alert_resources",
+}
+
+
+def __getattr__(name: str):
+    if name not in _REGISTER_MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    register = getattr(import_module(_REGISTER_MODULES[name], __name__), name)
+    globals()[name] = register
+    return register
+
+
+# Tool groups, named for configuration, mapped to the register function for each
+TOOL_GROUPS = {
+    "alerts": "register_weather_tools",
+    "forecast": "register_forecast_tools",
+    "maps": "register_weather_map_tools",
+    "severe": "register_severe_weather_tools",
+    "recommendations": "register_weather_recommendation_tools",
+    "web": "register_web_enhanced_tools",
+    "subscriptions": "register_alert_resources",
+}
+
+# Named deployment profiles; only the listed groups are registered and advertised
+TOOL_PROFILES = {
+    "full": list(TOOL_GROUPS),
+    "alerts-only": ["alerts", "severe", "subscriptions"],
+    "forecast-core": ["forecast", "web"],
+    "planning": ["forecast", "recommendations"],
+}
+
+DEFAULT_TOOL_PROFILE = "full"
+
+
+def resolve_tool_profile(profile: str) -> list[str]:
+    """Turn a profile name, or a comma-separated list of group names, into tool groups."""
+    profile = (profile or DEFAULT_TOOL_PROFILE).strip().lower()
+    if profile in TOOL_PROFILES:
+        return list(dict.fromkeys(TOOL_PROFILES[profile]))
+
+    # A group listed twice is registered once
+    groups = list(dict.fromkeys(group.strip() for group in profile.split(",") if group.strip()))
+    unknown = [group for group in groups if group not in TOOL_GROUPS]
+    if unknown or not groups:
+        raise ValueError(
+            f"Unknown tool profile or group: {profile!r}. "
+            f"Profiles: {', '.join(TOOL_PROFILES)}; groups: {', '.join(TOOL_GROUPS)}"
+        )
+    return groups
+
+
+def register_tool_profile(mcp, profile: str = DEFAULT_TOOL_PROFILE) -> list[str]:
+    """Register only the tool groups selected by a profile. Returns the registered groups."""
+    groups = resolve_tool_profile(profile)
+    for group in groups:
+        register = __getattr__(TOOL_GROUPS[group])
+        register(mcp)
+    return groups
+
 
 __all__ = [
-    "register_weather_tools", 
+    "DEFAULT_TOOL_PROFILE",
+    "TOOL_GROUPS",
+    "TOOL_PROFILES",
+    "register_tool_profile",
+    "register_weather_tools",
     "register_forecast_tools",
     "register_weather_map_tools",
-    "register_severe_weather_tools", 
+    "register_severe_weather_tools",
     "register_weather_recommendation_tools",
-    "register_web_enhanced_tools"
-]
\ No newline at end of file
+    "register_web_enhanced_tools",
+    "register_alert_resources"
+]
@@ -0,0 +1,48 @@
+from utils import lazy_import
+from output import to_compact_json
+
+alert_watch = lazy_import("alert_watch")
+
+
+async def _read_scope(scope) -> str:
+    alerts = await alert_watch.alert_watcher.read(scope)
+    if alerts is None:
+        return to_compact_json({"scope": scope.uri, "error": "Unable to fetch alerts."})
+    return to_compact_json({
+        "scope": scope.uri,
+        "alerts": [alert.record(alert_watch.ALERT_RESOURCE_FIELDS) for alert in alerts],
+    })
+
+
+def register_alert_resources(mcp):
+    """Expose active alerts as subscribable resources.
+
+    Subscribers receive resources/updated notifications when the alert set of
+    a scope changes, instead of polling get_alerts or track_severe_weather.
+    """
+    @mcp.resource("alerts://state/{state}", mime_type="application/json")
+    async def state_alerts(state: str) -> str:
+        """Active alerts for a US state (two-letter code)."""
+        return await _read_scope(alert_watch.AlertScope.state(state))
+
+    @mcp.resource("alerts://zone/{zone}", mime_type="application/json")
+    async def zone_alerts(zone: str) -> str:
+        """Active alerts for an NWS county or forecast zone (e.g. TXC453, KSZ009)."""
+        return await _read_scope(alert_watch.AlertScope.zone(zone))
+
+    @mcp.resource("alerts://point/{latitude}/{longitude}/{radius_km}", mime_type="application/json")
+    async def point_alerts(latitude: float, longitude: float, radius_km: float) -> str:
+        """Active alerts within radius_km of a location."""
+        return await _read_scope(alert_watch.AlertScope.point(latitude, longitude, radius_km))
+
+    server = mcp._mcp_server
+
+    @server.subscribe_resource()
+    async def subscribe(uri) -> None:
+        alert_watch.alert_watcher.subscribe(str(uri), server.request_context.session)
+
+    @server.unsubscribe_resource()
+    async def unsubscribe(uri) -> None:
+        alert_watch.alert_watcher.unsubscribe(str(uri), server.request_context.session)
+
+    alert_watch.enable_resource_subscriptions(mcp)
@@ -1,10 +1,95 @@
-from constants import NWS_API_BASE
-from utils import make_nws_request
-from web_weather_fallback import smart_weather_fallback, get_location_from_coords
+from utils import period_record, lazy_import
+from output import render, render_error
+from render_cache import facet_version, memoize_render
+
+from datetime import datetime, timezone
+
+web_weather_fallback = lazy_import("web_weather_fallback")
+snapshot = lazy_import("snapshot")
+observations = lazy_import("observations")
+
+COMPASS_POINTS = ["N", "NNE", "NE", "ENE", "E", "ESE", "SE", "SSE", "S", "SSW", "SW", "WSW", "W", "WNW", "NW", "NNW"]
+
+# Pressure tendency and temperature trend are measured over this window
+TREND_SECONDS = 3 * 60 * 60
+
+
+def _format_forecast(data: dict) -> str:
+    forecasts = []
+    for period in data["periods"]:
+        forecast = f"""
+{period['name']}:
+Temperature: {period['temp']}°{period['unit']}
+Wind: {period['wind']} {period['wind_dir']}
+Forecast: {period['forecast']}
+"""
+        forecasts.append(forecast)
+
+    return "\n---\n".join(forecasts)
+
+
+def _round(value, digits=0):
+    if value is None:
+        return None
+    return round(value, digits) if digits else round(value)
+
+
+def _conditions_record(series) -> dict:
+    # Convert the station's SI readings to the units the forecast tools use
+    latest = series.row(0)
+    c_to_f = lambda c: None if c is None else c * 9 / 5 + 32
+    kmh_to_mph = lambda kmh: None if kmh is None else kmh * 0.621371
+    temperature_change = series.change_since("temperature", TREND_SECONDS)
+    pressure_change = series.change_since("pressure", TREND_SECONDS)
+    direction = latest["wind_direction"]
+    return {
+        "observed_at": datetime.fromtimestamp(latest["timestamp"], timezone.utc).isoformat(),
+        "age_minutes": round((datetime.now(timezone.utc).timestamp() - latest["timestamp"]) / 60),
+        "description": latest["description"],
+        "temperature_f": _round(c_to_f(latest["temperature"])),
+        "dewpoint_f": _round(c_to_f(latest["dewpoint"])),
+        "humidity": _round(latest["humidity"]),
+        "wind_mph": _round(kmh_to_mph(latest["wind_speed"])),
+        "wind_dir": None if direction is None else COMPASS_POINTS[round(direction / 22.5) % 16],
+        "wind_gust_mph": _round(kmh_to_mph(latest["wind_gust"])),
+        "pressure_inhg": _round(None if latest["pressure"] is None else latest["pressure"] / 3386.389, 2),
+        "visibility_mi": _round(None if latest["visibility"] is None else latest["visibility"] / 1609.344, 1),
+        "temperature_change_3h_f": _round(None if temperature_change is None else temperature_change * 9 / 5, 1),
+        "pressure_change_3h_mb": _round(None if pressure_change is None else pressure_change / 100, 1),
+    }
+
+
+def _format_current_conditions(data: dict) -> str:
+    station = data["station"]
+    distance = f", {station['distance_km']} km away" if station.get("distance_km") is not None else ""
+    now = data["current"]
+    lines = [
+        f"🌡️ Current Conditions at {station['name'] or station['id']} ({station['id']}){distance}",
+        f"Observed: {now['observed_at']} ({now['age_minutes']} min ago)",
+        f"Conditions: {now['description'] or 'Not reported'}",
+    ]
+    if now["temperature_f"] is not None:
+        details = [f"dew point {now['dewpoint_f']}°F" if now["dewpoint_f"] is not None else None,
+                   f"humidity {now['humidity']}%" if now["humidity"] is not None else None]
+        details = ", ".join(detail for detail in details if detail)
+        trend = now["temperature_change_3h_f"]
+        trend = f", {trend:+}°F in 3 h" if trend is not None else ""
+        lines.append(f"Temperature: {now['temperature_f']}°F" + (f" ({details}{trend})" if details or trend else ""))
+    if now["wind_mph"] is not None:
+        gust = f", gusts {now['wind_gust_mph']} mph" if now["wind_gust_mph"] is not None else ""
+        lines.append(f"Wind: {now['wind_mph']} mph {now['wind_dir'] or ''}{gust}".replace("  ", " "))
+    if now["pressure_inhg"] is not None:
+        tendency = now["pressure_change_3h_mb"]
+        tendency = f" ({tendency:+} mb in 3 h)" if tendency is not None else ""
+        lines.append(f"Pressure: {now['pressure_inhg']} inHg{tendency}")
+    if now["visibility_mi"] is not None:
+        lines.append(f"Visibility: {now['visibility_mi']} mi")
+    return "\n".join(lines)
 
 
 def register_forecast_tools(mcp):
     @mcp.tool()
+    @memoize_render(facet_version("grid", "periods"))
     async def get_forecast(latitude: float, longitude: float) -> str:
         """Get weather forecast for a location with web fallback.
 
@@ -13,37 +98,60 @@ def register_forecast_tools(mcp):
             longitude: Longitude of the location
         """
         async def _get_forecast_api():
-            # First get the forecast grid endpoint
-            points_url = f"{NWS_API_BASE}/points/{latitude},{longitude}"
-            points_data = await make_nws_request(points_url)
-
-            if not points_data:
-                return "Unable to fetch forecast data for this location."
+            # First get the forecast grid endpoint (shared with other location tools)
+            location = snapshot.get_snapshot(latitude, longitude)
 
-            # Get the forecast URL from the points response
-            forecast_url = points_data["properties"]["forecast"]
-            forecast_data = await make_nws_request(forecast_url)
+            if not await location.grid():
+                return render_error("Unable to fetch forecast data for this location.")
 
-            if not forecast_data:
-                return "Unable to fetch detailed forecast."
+            # Get the forecast periods for that grid
+            forecast_periods = await location.periods()
 
-            # Format the periods into a readable forecast
-            periods = forecast_data["properties"]["periods"]
-            forecasts = []
-            for period in periods[:5]:  # Only show next 5 periods
-                forecast = f"""
-{period['name']}:
-Temperature: {period['temperature']}°{period['temperatureUnit']}
-Wind: {period['windSpeed']} {period['windDirection']}
-Forecast: {period['detailedForecast']}
-"""
-                forecasts.append(forecast)
+            if not forecast_periods:
+                return render_error("Unable to fetch detailed forecast.")
 
-            return "\n---\n".join(forecasts)
+            # Only show next 5 periods
+            periods = forecast_periods[:5]
+            return render(
+                {"latitude": latitude, "longitude": longitude,
+                 "periods": [period_record(period, detailed=True) for period in periods]},
+                _format_forecast,
+            )
         
         # Use smart fallback wrapper
-        return await smart_weather_fallback(
-            location=get_location_from_coords(latitude, longitude),
+        return await web_weather_fallback.smart_weather_fallback(
+            location=web_weather_fallback.get_location_from_coords(latitude, longitude),
             tool_name="Weather Forecast",
             api_function=_get_forecast_api
-        )
\ No newline at end of file
+        )
+
+    @mcp.tool()
+    async def get_current_conditions(latitude: float, longitude: float) -> str:
+        """Get observed current conditions from the nearest NWS observation station.
+
+        Args:
+            latitude: Latitude of the location
+            longitude: Longitude of the location
+        """
+        async def _get_current_conditions_api():
+            found = await observations.resolve_station(latitude, longitude)
+            if not found:
+                return render_error("Unable to find an observation station near this location.")
+            distance_km, station = found
+
+            series = await observations.observation_store.read(station["id"])
+            if series is None:
+                return render_error(f"Unable to fetch observations from station {station['id']}.")
+
+            return render({
+                "latitude": latitude,
+                "longitude": longitude,
+                "station": {**station, "distance_km": _round(distance_km, 1)},
+                "current": _conditions_record(series),
+            }, _format_current_conditions)
+
+        return await web_weather_fallback.smart_weather_fallback(
+            location=web_weather_fallback.get_location_from_coords(latitude, longitude),
+            tool_name="Current Conditions",
+            api_function=_get_current_conditions_api
+        )
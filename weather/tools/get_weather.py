@@ -1,6 +1,81 @@
 from constants import NWS_API_BASE
-from utils import make_nws_request, format_alert
-from web_weather_fallback import smart_weather_fallback, get_location_from_coords, create_fallback_response
+from utils import make_nws_request, format_alert_record, alert_record, compact_alert_record, lazy_import, ALERT_TEXT_FIELDS
+from output import columnar, render, render_error
+
+web_weather_fallback = lazy_import("web_weather_fallback")
+alert_watch = lazy_import("alert_watch")
+alert_log = lazy_import("alert_log")
+
+
+def _format_alerts(data: dict) -> str:
+    if not data["alerts"]:
+        return "No active alerts for this state."
+    return "\n---\n".join(format_alert_record(alert) for alert in data["alerts"])
+
+
+def _compact_alerts(data: dict) -> dict:
+    return {"state": data["state"], "alerts": [compact_alert_record(alert, data["state"]) for alert in data["alerts"]]}
+
+
+def _format_area_alerts(data: dict) -> str:
+    sections = []
+    for area, result in data["areas"].items():
+        if "error" in result:
+            sections.append(f"=== {area} ===\n{result['error']}")
+        elif not result["alerts"]:
+            sections.append(f"=== {area} (0 alerts) ===\nNo active alerts for this area.")
+        else:
+            sections.append(
+                f"=== {area} ({len(result['alerts'])} alerts) ===\n"
+                + "\n---\n".join(format_alert_record(alert) for alert in result["alerts"])
+            )
+    return "\n\n".join(sections)
+
+
+def _compact_area_alerts(data: dict) -> dict:
+    # State and zone codes both start with the state, which the areas then leave out
+    return {"areas": {
+        area: {"alerts": [compact_alert_record(alert, area[:2]) for alert in result["alerts"]]}
+        if "alerts" in result else result
+        for area, result in data["areas"].items()
+    }}
+
+
+def _format_alert_changes(data: dict) -> str:
+    lines = [f"Alert changes for {data['area']}" + (" (full resync)" if data["reset"] else "") + ":"]
+    for label, key in (("NEW", "new"), ("UPDATED", "updated")):
+        for alert in data[key]:
+            lines.append(
+                f"{label}: {alert.get('event') or 'Unknown'} | {alert.get('severity') or 'Unknown'} | "
+                f"{alert.get('area') or 'Unknown'} | expires {alert.get('expires') or 'Unknown'} | {alert.get('id')}"
+            )
+    for alert_id in data["expired"]:
+        lines.append(f"EXPIRED: {alert_id}")
+    if len(lines) == 1:
+        lines.append("No changes.")
+    lines.append(f"Next cursor: {data['cursor']}")
+    return "\n".join(lines)
+
+
+def _compact_alert_changes(data: dict) -> dict:
+    # New alerts as rows under one header, updates carry only the alert ID and the
+    # fields that changed, and empty change lists are left out
+    state = data["area"][:2]
+    new = [compact_alert_record(alert, state) for alert in data["new"]]
+    changes = {
+        "new": columnar(new) if new else None,
+        "updated": [
+            compact_alert_record({"id": alert["id"], **{field: alert[field] for field in alert["changed"]}}, state)
+            for alert in data["updated"]
+        ],
+        "expired": data["expired"],
+    }
+    return {
+        "area": data["area"],
+        "cursor": data["cursor"],
+        "reset": data["reset"],
+        **{change: alerts for change, alerts in changes.items() if alerts},
+    }
 
 
 def register_weather_tools(mcp):
@@ -16,17 +91,70 @@ def register_weather_tools(mcp):
             data = await make_nws_request(url)
 
             if not data or "features" not in data:
-                return "Unable to fetch alerts or no alerts found."
-
-            if not data["features"]:
-                return "No active alerts for this state."
+                return render_error("Unable to fetch alerts or no alerts found.")
 
-            alerts = [format_alert(feature) for feature in data["features"]]
-            return "\n---\n".join(alerts)
+            return render(
+                {"state": state, "alerts": [alert_record(feature, ALERT_TEXT_FIELDS) for feature in data["features"]]},
+                _format_alerts,
+                _compact_alerts,
+            )
         
         # Use smart fallback wrapper
-        return await smart_weather_fallback(
+        return await web_weather_fallback.smart_weather_fallback(
             location=f"State: {state}",
             tool_name="Weather Alerts",
             api_function=_get_alerts_api
-        )
\ No newline at end of file
+        )
+
+    @mcp.tool()
+    async def get_alerts_batch(areas: list[str]) -> str:
+        """Get weather alerts for several US states and/or NWS zones at once, grouped per area.
+
+        Uses as few upstream requests as possible instead of one call per area.
+
+        Args:
+            areas: Two-letter state codes (e.g. KS, MO) and/or zone codes (e.g. TXC453, KSZ009)
+        """
+        scopes = list({scope.uri: scope for scope in map(alert_watch.AlertScope.area, areas)}.values())
+        if not scopes:
+            return render_error("No areas given.")
+
+        async def _get_alerts_batch_api():
+            results = await alert_watch.alert_watcher.read_many(scopes)
+            if all(alerts is None for alerts in results.values()):
+                return render_error("Unable to fetch alerts for the requested areas.")
+
+            grouped = {}
+            for scope in scopes:
+                alerts = results[scope.uri]
+                grouped[scope.key] = (
+                    {"error": "Unable to fetch alerts."} if alerts is None
+                    else {"alerts": [alert.record(ALERT_TEXT_FIELDS) for alert in alerts]}
+                )
+            return render({"areas": grouped}, _format_area_alerts, _compact_area_alerts)
+
+        return await web_weather_fallback.smart_weather_fallback(
+            location="Areas: " + ", ".join(scope.key for scope in scopes),
+            tool_name="Weather Alerts",
+            api_function=_get_alerts_batch_api
+        )
+
+    @mcp.tool()
+    async def get_alert_changes(area: str, cursor: str = "") -> str:
+        """Get only the alerts that are new, updated or expired since a previous call.
+
+        Pass the cursor returned by the previous call; omit it to get the full current set.
+
+        Args:
+            area: Two-letter US state code (e.g. CA) or NWS zone code (e.g. TXC453)
+            cursor: Opaque cursor from the previous get_alert_changes result
+        """
+        scope = alert_watch.AlertScope.area(area)
+        area = scope.key
+
+        alerts = await alert_watch.alert_watcher.read(scope)
+        if alerts is None:
+            return render_error("Unable to fetch alerts.")
+
+        changes = alert_log.alert_log.changes_since(scope.uri, cursor)
+        return render({"area": area, **changes}, _format_alert_changes, _compact_alert_changes)
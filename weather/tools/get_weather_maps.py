@@ -1,43 +1,131 @@
 from constants import NWS_API_BASE
-from utils import make_nws_request
+from utils import make_nws_request, lazy_import
+from output import columnar, render, render_error
 import json
 
+radar_stations = lazy_import("radar_stations")
+imagery = lazy_import("imagery")
+
+
+def _format_radar_stations(data: dict) -> str:
+    if not data["stations"]:
+        return "No radar stations found in the specified area."
+        
+    stations = []
+    for station in data["stations"]:
+        station_info = f"""
+Station: {station['id'] or 'Unknown'}
+Name: {station['name'] or 'Unknown'}
+Distance: {station['distance_km']:.1f} km
+Type: {station['type'] or 'Unknown'}
+Radar URL: {station['radar_url']}
+Cached Image: {station['image_resource']}
+"""
+        stations.append(station_info.strip())
+        
+    return "\n---\n".join(stations)
+
+
+def _compact_radar_stations(data: dict) -> dict:
+    # Stations as rows under one header
+    return {"stations": columnar(data["stations"])}
+
+
+def _format_satellite_imagery(data: dict) -> str:
+    imagery_info = f"""
+Satellite Imagery for {data['region'].upper()}:
+
+Latest Color Image:
+{data['color']}
+
+Latest Infrared:
+{data['infrared']}
+
+Animation (Last 24 hours):
+{data['animation']}
+
+Cached Image Resources (one shared download, revalidated every few minutes):
+- Color: {data['resources']['color']} (thumbnail: {data['resources']['color_thumbnail']})
+- Infrared: {data['resources']['infrared']} (thumbnail: {data['resources']['infrared_thumbnail']})
+
+Real-time Updates:
+- Images update every 10-15 minutes
+- Best viewed during daylight hours for visible imagery
+- Infrared shows cloud temperatures (useful at night)
+
+Usage: Copy URLs to view current satellite imagery in your browser
+"""
+    
+    return imagery_info.strip()
+
+
+def _format_map_layers(data: dict) -> str:
+    layers = data["layers"]
+    radar_station = data.get("radar_station")
+    radar_image = f"\n   - Nearest Radar ({radar_station['id']}): {radar_station['image_resource']}" if radar_station else ""
+    map_layers = f"""
+Weather Map Layers for {data['latitude']}, {data['longitude']}:
+
+Regional Forecast Office: {data['office']}
+
+Available Map Layers:
+1. Doppler Radar: 
+   - Base: {layers['radar_base']}
+   - Velocity: {layers['radar_velocity']}{radar_image}
+
+2. Temperature Maps:
+   - Current: {layers['temperature_current']}
+   - Forecast: {layers['temperature_forecast']}
+
+3. Precipitation Maps:
+   - 24hr Forecast: {layers['precipitation_24h']}
+   - 48hr Forecast: {layers['precipitation_48h']}
+
+4. Wind Maps:
+   - Surface Winds: {layers['surface_winds']}
+   - Wind Speed: {layers['wind_speed']}
+
+5. Pressure Maps:
+   - Sea Level Pressure: {layers['sea_level_pressure']}
+
+Interactive Maps:
+- NWS Interactive: https://forecast.weather.gov/
+- Radar Interactive: https://radar.weather.gov/
+"""
+    
+    return map_layers.strip()
+
 
 def register_weather_map_tools(mcp):
     @mcp.tool()
-    async def get_radar_stations(latitude: float, longitude: float, radius_km: int = 50) -> str:
+    async def get_radar_stations(latitude: float, longitude: float, radius_km: int = 50, limit: int = 10) -> str:
         """Get nearby radar stations for weather visualization.
         
         Args:
             latitude: Latitude of the location
             longitude: Longitude of the location  
             radius_km: Search radius in kilometers (default: 50)
+            limit: Maximum number of stations to return, nearest first (default: 10)
         """
-        # Convert km to miles for NWS API
-        radius_miles = radius_km * 0.621371
-        
-        url = f"{NWS_API_BASE}/radar/stations?lat={latitude}&lon={longitude}&range={radius_miles}"
-        data = await make_nws_request(url)
-        
-        if not data or "features" not in data:
-            return "Unable to fetch radar station data."
-            
-        if not data["features"]:
-            return "No radar stations found in the specified area."
+        # Stations are answered from the locally indexed catalog, refreshed daily
+        if not await radar_stations.radar_station_index.ensure_loaded():
+            return render_error("Unable to fetch radar station data.")
             
+        nearby = radar_stations.radar_station_index.nearest(latitude, longitude, count=limit, radius_km=radius_km)
+        
         stations = []
-        for feature in data["features"]:
-            props = feature["properties"]
-            station_info = f"""
-Station: {props.get('stationIdentifier', 'Unknown')}
-Name: {props.get('name', 'Unknown')}
-Distance: {props.get('distance', 'Unknown')} km
-Type: {props.get('type', 'Unknown')}
-Radar URL: https://radar.weather.gov/ridge/standard/{props.get('stationIdentifier', '').lower()}_loop.gif
-"""
-            stations.append(station_info.strip())
+        for distance_km, props in nearby:
+            station_id = radar_stations.station_id(props)
+            stations.append({
+                "id": station_id,
+                "name": props.get('name'),
+                "distance_km": round(distance_km, 1),
+                "type": props.get('stationType', props.get('type')),
+                "radar_url": imagery.radar_loop_url(station_id),
+                "image_resource": f"radar://{station_id}/latest",
+            })
             
-        return "\n---\n".join(stations)
+        return render({"stations": stations}, _format_radar_stations, _compact_radar_stations)
 
     @mcp.tool()  
     async def get_satellite_imagery(region: str = "us") -> str:
@@ -46,43 +134,22 @@ Radar URL: https://radar.weather.gov/ridge/standard/{props.get('stationIdentifie
         Args:
             region: Region for satellite imagery (us, conus, alaska, hawaii, pr, guam)
         """
-        # NWS satellite imagery endpoints
-        satellite_urls = {
-            "us": "https://cdn.star.nesdis.noaa.gov/GOES16/ABI/CONUS/GEOCOLOR/",
-            "conus": "https://cdn.star.nesdis.noaa.gov/GOES16/ABI/CONUS/GEOCOLOR/",
-            "alaska": "https://cdn.star.nesdis.noaa.gov/GOES17/ABI/ALASKA/GEOCOLOR/",
-            "hawaii": "https://cdn.star.nesdis.noaa.gov/GOES17/ABI/HAWAII/GEOCOLOR/",
-            "pr": "https://cdn.star.nesdis.noaa.gov/GOES16/ABI/MESO/GEOCOLOR/",
-            "guam": "https://cdn.star.nesdis.noaa.gov/GOES17/ABI/GUAM/GEOCOLOR/"
-        }
-        
-        if region not in satellite_urls:
-            return f"Invalid region. Available regions: {', '.join(satellite_urls.keys())}"
+        if region not in imagery.SATELLITE_REGIONS:
+            return render_error(f"Invalid region. Available regions: {', '.join(imagery.SATELLITE_REGIONS)}")
             
-        base_url = satellite_urls[region]
-        
-        # Generate common satellite imagery URLs
-        imagery_info = f"""
-Satellite Imagery for {region.upper()}:
-
-Latest Color Image:
-{base_url}latest.jpg
-
-Latest Infrared:
-{base_url.replace('GEOCOLOR', 'Band13')}/latest.jpg
-
-Animation (Last 24 hours):
-{base_url}20241203_loop.gif
-
-Real-time Updates:
-- Images update every 10-15 minutes
-- Best viewed during daylight hours for visible imagery
-- Infrared shows cloud temperatures (useful at night)
-
-Usage: Copy URLs to view current satellite imagery in your browser
-"""
-        
-        return imagery_info.strip()
+        # Latest frames and the rolling animation NESDIS publishes for the region
+        return render({
+            "region": region,
+            "color": imagery.satellite_image_url(region, "geocolor"),
+            "infrared": imagery.satellite_image_url(region, "infrared"),
+            "animation": imagery.satellite_loop_url(region),
+            "resources": {
+                "color": f"satellite://{region}/geocolor",
+                "color_thumbnail": f"satellite://{region}/geocolor/thumbnail",
+                "infrared": f"satellite://{region}/infrared",
+                "infrared_thumbnail": f"satellite://{region}/infrared/thumbnail",
+            },
+        }, _format_satellite_imagery)
 
     @mcp.tool()
     async def get_weather_map_layers(latitude: float, longitude: float) -> str:
@@ -97,38 +164,83 @@ Usage: Copy URLs to view current satellite imagery in your browser
         points_data = await make_nws_request(points_url)
         
         if not points_data:
-            return "Unable to fetch location data for weather maps."
+            return render_error("Unable to fetch location data for weather maps.")
             
         cwa = points_data["properties"]["cwa"]
         
-        map_layers = f"""
-Weather Map Layers for {latitude}, {longitude}:
-
-Regional Forecast Office: {cwa}
-
-Available Map Layers:
-1. Doppler Radar: 
-   - Base: https://radar.weather.gov/ridge/standard/{cwa.lower()}_loop.gif
-   - Velocity: https://radar.weather.gov/ridge/standard/{cwa.lower()}_vel_loop.gif
-
-2. Temperature Maps:
-   - Current: https://graphical.weather.gov/images/conus/MaxT1_conus.png
-   - Forecast: https://graphical.weather.gov/images/conus/MaxT3_conus.png
-
-3. Precipitation Maps:
-   - 24hr Forecast: https://graphical.weather.gov/images/conus/QtPf1_conus.png
-   - 48hr Forecast: https://graphical.weather.gov/images/conus/QtPf2_conus.png
-
-4. Wind Maps:
-   - Surface Winds: https://graphical.weather.gov/images/conus/WxSfc_conus.png
-   - Wind Speed: https://graphical.weather.gov/images/conus/WindSpd_conus.png
-
-5. Pressure Maps:
-   - Sea Level Pressure: https://graphical.weather.gov/images/conus/mslp_conus.png
-
-Interactive Maps:
-- NWS Interactive: https://forecast.weather.gov/
-- Radar Interactive: https://radar.weather.gov/
-"""
+        layers = {
+            "radar_base": f"https://radar.weather.gov/ridge/standard/{cwa.lower()}_loop.gif",
+            "radar_velocity": f"https://radar.weather.gov/ridge/standard/{cwa.lower()}_vel_loop.gif",
+            "temperature_current": "https://graphical.weather.gov/images/conus/MaxT1_conus.png",
+            "temperature_forecast": "https://graphical.weather.gov/images/conus/MaxT3_conus.png",
+            "precipitation_24h": "https://graphical.weather.gov/images/conus/QtPf1_conus.png",
+            "precipitation_48h": "https://graphical.weather.gov/images/conus/QtPf2_conus.png",
+            "surface_winds": "https://graphical.weather.gov/images/conus/WxSfc_conus.png",
+            "wind_speed": "https://graphical.weather.gov/images/conus/WindSpd_conus.png",
+            "sea_level_pressure": "https://graphical.weather.gov/images/conus/mslp_conus.png",
+        }
+        
+        data = {"latitude": latitude, "longitude": longitude, "office": cwa, "layers": layers}
+        
+        # Point at the nearest radar's cached image when the station catalog is loaded
+        nearest = radar_stations.radar_station_index.nearest(latitude, longitude, count=1)
+        if nearest:
+            station_id = radar_stations.station_id(nearest[0][1])
+            data["radar_station"] = {"id": station_id, "image_resource": f"radar://{station_id}/latest"}
         
-        return map_layers.strip()
\ No newline at end of file
+        return render(data, _format_map_layers)
+
+    register_weather_map_resources(mcp)
+
+
+async def _read_image(url: str, thumbnail: bool = False) -> bytes:
+    if thumbnail:
+        content = await imagery.image_cache.thumbnail(url)
+    else:
+        image = await imagery.image_cache.get(url)
+        content = image.content if image else None
+    if content is None:
+        raise ValueError(f"Unable to fetch image {url}")
+    return content
+
+
+def _satellite_url(region: str, band: str) -> str:
+    if region not in imagery.SATELLITE_REGIONS or band not in imagery.SATELLITE_BANDS:
+        raise ValueError(
+            f"Unknown region or band. Regions: {', '.join(imagery.SATELLITE_REGIONS)}; "
+            f"bands: {', '.join(imagery.SATELLITE_BANDS)}"
+        )
+    return imagery.satellite_image_url(region, band)
+
+
+def _radar_url(station: str) -> str:
+    if not station.isalnum():
+        raise ValueError(f"Invalid radar station: {station!r}")
+    return imagery.radar_image_url(station)
+
+
+def register_weather_map_resources(mcp):
+    """Expose the latest satellite and radar images as binary resources.
+
+    Images are proxied through the server's shared image cache, so many
+    clients reading the same frame cost one upstream download.
+    """
+    @mcp.resource("satellite://{region}/{band}", mime_type="image/jpeg")
+    async def satellite_image(region: str, band: str) -> bytes:
+        """Latest satellite image for a region (us, conus, alaska, hawaii, pr, guam); band is geocolor or infrared."""
+        return await _read_image(_satellite_url(region, band))
+
+    @mcp.resource("satellite://{region}/{band}/thumbnail", mime_type="image/png")
+    async def satellite_thumbnail(region: str, band: str) -> bytes:
+        """Downsized PNG of the latest satellite image for a region and band."""
+        return await _read_image(_satellite_url(region, band), thumbnail=True)
+
+    @mcp.resource("radar://{station}/latest", mime_type="image/gif")
+    async def radar_image(station: str) -> bytes:
+        """Latest reflectivity frame of a radar station (e.g. KTLX)."""
+        return await _read_image(_radar_url(station))
+
+    @mcp.resource("radar://{station}/thumbnail", mime_type="image/png")
+    async def radar_thumbnail(station: str) -> bytes:
+        """Downsized PNG of a radar station's latest frame."""
+        return await _read_image(_radar_url(station), thumbnail=True)
@@ -1,8 +1,190 @@
 from constants import NWS_API_BASE
-from utils import make_nws_request, format_alert
+from compact_alerts import AlertFlag, compact_alerts, compact_feed
+from utils import compact_alert_record, make_nws_request, lazy_import
+from output import render, render_error
+from render_cache import alert_scope_version, facet_version, memoize_render
+from functools import partial
 from typing import Dict, List
 import json
 
+snapshot = lazy_import("snapshot")
+alert_watch = lazy_import("alert_watch")
+alert_aggregates = lazy_import("alert_aggregates")
+
+SEVERE_ALERT_FIELDS = ("event", "severity", "urgency", "area", "onset", "expires", "description", "instruction")
+WATCH_WARNING_FIELDS = ("event", "severity", "urgency", "effective", "expires", "area", "headline")
+STORM_REPORT_FIELDS = ("event", "area", "severity", "effective")
+
+SEVERITY_INDICATORS = {
+    "Extreme": "🔴",
+    "Severe": "🟠", 
+    "Moderate": "🟡",
+    "Minor": "🟢",
+    "Unknown": "⚪"
+}
+
+
+def _format_severe_alerts(data: dict) -> str:
+    if not data["alerts"]:
+        return "No severe weather alerts found in the specified area."
+        
+    severe_alerts = []
+    for alert in data["alerts"]:
+        alert_info = f"""
+🚨 SEVERE WEATHER ALERT 🚨
+Event: {alert.get('event') or 'Unknown'}
+Severity: {alert.get('severity') or 'Unknown'}
+Urgency: {alert.get('urgency') or 'Unknown'}
+Area: {alert.get('area') or 'Unknown'}
+Onset: {alert.get('onset') or 'Unknown'}
+Expires: {alert.get('expires') or 'Unknown'}
+Description: {alert.get('description') or 'No description'}
+Instructions: {alert.get('instruction') or 'No instructions'}
+"""
+        severe_alerts.append(alert_info.strip())
+        
+    return "\n" + "="*50 + "\n".join(severe_alerts)
+
+
+def _compact_severe_alerts(data: dict) -> dict:
+    return {"alerts": [compact_alert_record(alert) for alert in data["alerts"]]}
+
+
+def _format_storm_reports(data: dict) -> str:
+    state = data["state"]
+    if not data["categories"]:
+        return f"No active storm reports for {state}."
+        
+    report_sections = []
+    
+    for category, reports in data["categories"].items():
+        section = f"\n{category.replace('_', ' ').title()} Reports ({reports['count']}):\n" + "-" * 40
+        for report in reports["reports"]:
+            section += f"""
+• {report.get('event') or 'Unknown Event'}
+  Area: {report.get('area') or 'Unknown'}
+  Severity: {report.get('severity') or 'Unknown'}
+  Time: {report.get('effective') or 'Unknown'}
+"""
+        report_sections.append(section)
+        
+    return f"Storm Reports for {state}:\n" + "\n".join(report_sections)
+
+
+def _compact_storm_categories(categories: dict, state: str) -> dict:
+    return {
+        category: {"count": reports["count"], "reports": [compact_alert_record(report, state) for report in reports["reports"]]}
+        for category, reports in categories.items()
+    }
+
+
+def _compact_storm_reports(data: dict) -> dict:
+    return {"state": data["state"], "categories": _compact_storm_categories(data["categories"], data["state"])}
+
+
+def _format_watches_warnings(data: dict) -> str:
+    if not data["alerts"]:
+        return "No active watches or warnings for this location."
+        
+    result_sections = []
+    
+    for alert_type, alerts in data["alerts"].items():
+        section = f"\n{alert_type.upper()} ({len(alerts)}):\n" + "=" * 30
+        
+        for alert in alerts:
+            severity = alert.get("severity") or "Unknown"
+            urgency = alert.get("urgency") or "Unknown"
+            
+            # Add severity indicators
+            severity_indicator = SEVERITY_INDICATORS.get(severity, "⚪")
+            
+            alert_info = f"""
+{severity_indicator} {alert.get('event') or 'Unknown Event'}
+   Severity: {severity} | Urgency: {urgency}
+   Effective: {alert.get('effective') or 'Unknown'}
+   Expires: {alert.get('expires') or 'Unknown'}
+   Areas: {alert.get('area') or 'Unknown'}
+   Summary: {alert.get('headline') or 'No headline available'}
+"""
+            section += alert_info
+            
+        result_sections.append(section)
+        
+    location_info = f"Weather Alerts for {data['latitude']}, {data['longitude']}:"
+    return location_info + "\n".join(result_sections)
+
+
+def _storm_report_categories(alerts: list) -> dict:
+    # Categorize by storm type
+    storm_categories = {
+        "tornado": [],
+        "severe_thunderstorm": [], 
+        "flood": [],
+        "winter": [],
+        "other": []
+    }
+    
+    for alert in alerts:
+        storm_categories[alert.category].append(alert)
+            
+    categories = {}
+    for category, category_alerts in storm_categories.items():
+        if category_alerts:
+            categories[category] = {
+                "count": len(category_alerts),
+                "reports": [alert.record(STORM_REPORT_FIELDS) for alert in category_alerts[:3]],  # Limit to 3 per category
+            }
+    return categories
+
+
+def _format_storm_reports_batch(data: dict) -> str:
+    sections = []
+    for state, result in data["states"].items():
+        if "error" in result:
+            sections.append(f"Storm Reports for {state}:\n{result['error']}")
+        else:
+            sections.append(_format_storm_reports({"state": state, "categories": result["categories"]}))
+    return "\n\n".join(sections)
+
+
+def _compact_storm_reports_batch(data: dict) -> dict:
+    return {"states": {
+        state: {"categories": _compact_storm_categories(result["categories"], state)} if "categories" in result else result
+        for state, result in data["states"].items()
+    }}
+
+
+def _compact_watches_warnings(data: dict) -> dict:
+    # The county code starts with the state, which the areas then leave out
+    return {**data, "alerts": {
+        alert_type: [compact_alert_record(alert, data["county"][:2]) for alert in alerts]
+        for alert_type, alerts in data["alerts"].items()
+    }}
+
+
+def _format_alert_summary(data: dict) -> str:
+    where = data["state"] or "the US"
+    lines = [f"Active Alert Summary for {where} ({data['active_alerts']} alerts, as of {data['as_of'] or 'unknown'}):"]
+    if not data["categories"]:
+        lines.append("No matching active alerts.")
+    for category, severities in data["categories"].items():
+        breakdown = ", ".join(
+            f"{SEVERITY_INDICATORS.get(severity, '⚪')} {severity}: {count}" for severity, count in severities.items()
+        )
+        lines.append(f"• {category.replace('_', ' ').title()} ({sum(severities.values())}): {breakdown}")
+
+    if data.get("states"):
+        busiest = sorted(data["states"].items(), key=lambda item: -item[1])[:10]
+        lines.append("\nMost alerts by state: " + ", ".join(f"{state} {count}" for state, count in busiest))
+    if data["zones_by_highest_severity"]:
+        lines.append("Zones nationwide by highest severity in effect: " + ", ".join(
+            f"{severity} {count}" for severity, count in data["zones_by_highest_severity"].items()
+        ))
+    if "zone" in data:
+        zone = data["zone"]
+        lines.append(f"Zone {zone['code']}: {zone['highest_severity'] or 'no active alerts'}")
+    return "\n".join(lines)
+
 
 def register_severe_weather_tools(mcp):
     @mcp.tool()
@@ -14,52 +196,19 @@ def register_severe_weather_tools(mcp):
             longitude: Longitude of the center location
             radius_miles: Search radius in miles (default: 100)
         """
-        # Get all active alerts
+        # Get all active alerts, keeping severe weather types that carry a polygon;
+        # the multi-megabyte national feed is decoded and filtered off the event loop
         url = f"{NWS_API_BASE}/alerts/active"
-        data = await make_nws_request(url)
+        alerts = await make_nws_request(url, partial(compact_feed, flags=AlertFlag.SEVERE | AlertFlag.HAS_GEOMETRY))
         
-        if not data or "features" not in data:
-            return "Unable to fetch severe weather data."
+        if alerts is None:
+            return render_error("Unable to fetch severe weather data.")
             
-        if not data["features"]:
-            return "No active severe weather alerts found."
-            
-        # Filter for severe weather types
-        severe_events = [
-            "Tornado Warning", "Tornado Watch", "Severe Thunderstorm Warning", 
-            "Severe Thunderstorm Watch", "Flash Flood Warning", "Flood Warning",
-            "High Wind Warning", "Hurricane Warning", "Hurricane Watch",
-            "Blizzard Warning", "Ice Storm Warning", "Freezing Rain Advisory"
-        ]
-        
-        severe_alerts = []
-        for feature in data["features"]:
-            props = feature["properties"]
-            event = props.get("event", "")
-            
-            if any(severe_event in event for severe_event in severe_events):
-                # Calculate approximate distance (simplified)
-                alert_coords = feature.get("geometry", {})
-                if alert_coords and alert_coords.get("coordinates"):
-                    alert_info = f"""
-🚨 SEVERE WEATHER ALERT 🚨
-Event: {props.get('event', 'Unknown')}
-Severity: {props.get('severity', 'Unknown')}
-Urgency: {props.get('urgency', 'Unknown')}
-Area: {props.get('areaDesc', 'Unknown')}
-Onset: {props.get('onset', 'Unknown')}
-Expires: {props.get('expires', 'Unknown')}
-Description: {props.get('description', 'No description')}
-Instructions: {props.get('instruction', 'No instructions')}
-"""
-                    severe_alerts.append(alert_info.strip())
-                    
-        if not severe_alerts:
-            return "No severe weather alerts found in the specified area."
-            
-        return "\n" + "="*50 + "\n".join(severe_alerts)
+        severe_alerts = [alert.record(SEVERE_ALERT_FIELDS) for alert in alerts]
+        return render({"alerts": severe_alerts}, _format_severe_alerts, _compact_severe_alerts)
 
     @mcp.tool()
+    @memoize_render(alert_scope_version(lambda arguments: alert_watch.AlertScope.state(arguments["state"])))
     async def get_storm_reports(state: str) -> str:
         """Get recent storm reports for a state.
         
@@ -67,60 +216,71 @@ Instructions: {props.get('instruction', 'No instructions')}
             state: Two-letter US state code (e.g. TX, FL)
         """
         # NWS doesn't have a direct storm reports API, but we can get recent alerts
-        url = f"{NWS_API_BASE}/alerts/active/area/{state.upper()}"
-        data = await make_nws_request(url)
+        alerts = await alert_watch.alert_watcher.read(alert_watch.AlertScope.state(state))
         
-        if not data or "features" not in data:
-            return f"Unable to fetch storm reports for {state.upper()}."
+        if alerts is None:
+            return render_error(f"Unable to fetch storm reports for {state.upper()}.")
             
-        if not data["features"]:
-            return f"No active storm reports for {state.upper()}."
-            
-        # Categorize by storm type
-        storm_categories = {
-            "tornado": [],
-            "severe_thunderstorm": [], 
-            "flood": [],
-            "winter": [],
-            "other": []
-        }
-        
-        for feature in data["features"]:
-            props = feature["properties"]
-            event = props.get("event", "").lower()
-            
-            if "tornado" in event:
-                storm_categories["tornado"].append(feature)
-            elif "thunderstorm" in event or "hail" in event:
-                storm_categories["severe_thunderstorm"].append(feature)
-            elif "flood" in event:
-                storm_categories["flood"].append(feature)
-            elif any(term in event for term in ["winter", "snow", "ice", "blizzard"]):
-                storm_categories["winter"].append(feature)
-            else:
-                storm_categories["other"].append(feature)
-                
-        report_sections = []
-        
-        for category, alerts in storm_categories.items():
-            if alerts:
-                section = f"\n{category.replace('_', ' ').title()} Reports ({len(alerts)}):\n" + "-" * 40
-                for alert in alerts[:3]:  # Limit to 3 per category
-                    props = alert["properties"]
-                    section += f"""
-• {props.get('event', 'Unknown Event')}
-  Area: {props.get('areaDesc', 'Unknown')}
-  Severity: {props.get('severity', 'Unknown')}
-  Time: {props.get('effective', 'Unknown')}
-"""
-                report_sections.append(section)
-                
-        if not report_sections:
-            return f"No categorized storm reports available for {state.upper()}."
-            
-        return f"Storm Reports for {state.upper()}:\n" + "\n".join(report_sections)
+        categories = _storm_report_categories(alerts)
+        return render({"state": state.upper(), "categories": categories}, _format_storm_reports, _compact_storm_reports)
+
+    @mcp.tool()
+    async def get_storm_reports_batch(states: list[str]) -> str:
+        """Get recent storm reports for several states at once, grouped per state.
+
+        Uses as few upstream requests as possible instead of one call per state.
+
+        Args:
+            states: Two-letter US state codes (e.g. [TX, OK, KS])
+        """
+        scopes = list({scope.uri: scope for scope in (alert_watch.AlertScope.state(state.strip()) for state in states)}.values())
+        if not scopes:
+            return render_error("No states given.")
+
+        results = await alert_watch.alert_watcher.read_many(scopes)
+        if all(alerts is None for alerts in results.values()):
+            return render_error("Unable to fetch storm reports for the requested states.")
+
+        grouped = {}
+        for scope in scopes:
+            alerts = results[scope.uri]
+            grouped[scope.key] = (
+                {"error": f"Unable to fetch storm reports for {scope.key}."} if alerts is None
+                else {"categories": _storm_report_categories(alerts)}
+            )
+        return render({"states": grouped}, _format_storm_reports_batch, _compact_storm_reports_batch)
+
+    @mcp.tool()
+    async def get_alert_summary(state: str = "", category: str = "", zone: str = "") -> str:
+        """Count active weather alerts nationwide or for one state, by storm category and severity.
+
+        Answered from national aggregates kept current in the background, so it
+        is cheap however many alerts are active.
+
+        Args:
+            state: Two-letter US state code to summarize (default: the whole US, with per-state counts)
+            category: Only count one category: tornado, severe_thunderstorm, flood, winter or other
+            zone: County or forecast zone code (e.g. KSC201) to report the highest severity in effect for
+        """
+        category = category.strip().lower()
+        if category and category not in alert_aggregates.CATEGORIES:
+            return render_error(
+                f"Unknown alert category: {category}. Use one of: {', '.join(alert_aggregates.CATEGORIES)}."
+            )
+
+        aggregates = await alert_aggregates.alert_aggregator.read()
+        if aggregates is None:
+            return render_error("Unable to fetch the national alert feed.")
+
+        data = aggregates.summary(state.strip(), category)
+        if not state.strip():
+            data["states"] = aggregates.state_counts(category)
+        if zone.strip():
+            data["zone"] = {"code": zone.strip().upper(), "highest_severity": aggregates.zone_severity(zone.strip())}
+        return render(data, _format_alert_summary)
 
     @mcp.tool()
+    @memoize_render(facet_version("zone_alerts"))
     async def get_weather_watches_warnings(latitude: float, longitude: float) -> str:
         """Get current watches and warnings for a specific location with severity levels.
         
@@ -128,88 +288,39 @@ Instructions: {props.get('instruction', 'No instructions')}
             latitude: Latitude of the location
             longitude: Longitude of the location
         """
-        # Get the county/zone for this location
-        points_url = f"{NWS_API_BASE}/points/{latitude},{longitude}"
-        points_data = await make_nws_request(points_url)
+        # Get the county for this location (local zone index, /points only as a fallback)
+        location = snapshot.get_snapshot(latitude, longitude)
+        county_code = await location.county_code()
         
-        if not points_data:
-            return "Unable to fetch location data."
+        if not county_code:
+            return render_error("Unable to fetch location data.")
             
-        # Get county and forecast zone
-        county = points_data["properties"].get("county")
-        forecast_zone = points_data["properties"].get("forecastZone")
-        
-        # Fetch alerts for this county/zone
-        alerts_data = None
-        if county:
-            county_code = county.split("/")[-1]  # Extract county code from URL
-            alerts_url = f"{NWS_API_BASE}/alerts/active/zone/{county_code}"
-            alerts_data = await make_nws_request(alerts_url)
-            
-        if not alerts_data or "features" not in alerts_data:
-            return "No active watches or warnings for this location."
-            
-        if not alerts_data["features"]:
-            return "No active watches or warnings for this location."
+        # Alerts for this county, shared with the other location tools
+        features = await location.zone_alerts() or []
             
         # Categorize by severity and type
-        severity_order = ["Extreme", "Severe", "Moderate", "Minor", "Unknown"]
         watch_warning_types = {
             "warnings": [],
             "watches": [],
             "advisories": []
         }
         
-        for feature in alerts_data["features"]:
-            props = feature["properties"]
-            event = props.get("event", "").lower()
-            
-            if "warning" in event:
-                watch_warning_types["warnings"].append(feature)
-            elif "watch" in event:
-                watch_warning_types["watches"].append(feature)  
-            elif "advisory" in event:
-                watch_warning_types["advisories"].append(feature)
+        for alert in compact_alerts(features):
+            if alert.has(AlertFlag.WARNING):
+                watch_warning_types["warnings"].append(alert)
+            elif alert.has(AlertFlag.WATCH):
+                watch_warning_types["watches"].append(alert)  
+            elif alert.has(AlertFlag.ADVISORY):
+                watch_warning_types["advisories"].append(alert)
                 
-        result_sections = []
-        
+        categorized = {}
         for alert_type, alerts in watch_warning_types.items():
             if alerts:
-                # Sort by severity
-                alerts.sort(key=lambda x: severity_order.index(
-                    x["properties"].get("severity", "Unknown")
-                ))
+                # Sort by severity, most severe first
+                alerts.sort(key=lambda alert: alert.severity_rank)
+                categorized[alert_type] = [alert.record(WATCH_WARNING_FIELDS) for alert in alerts]
                 
-                section = f"\n{alert_type.upper()} ({len(alerts)}):\n" + "=" * 30
-                
-                for alert in alerts:
-                    props = alert["properties"]
-                    severity = props.get("severity", "Unknown")
-                    urgency = props.get("urgency", "Unknown")
-                    
-                    # Add severity indicators
-                    severity_indicator = {
-                        "Extreme": "🔴",
-                        "Severe": "🟠", 
-                        "Moderate": "🟡",
-                        "Minor": "🟢",
-                        "Unknown": "⚪"
-                    }.get(severity, "⚪")
-                    
-                    alert_info = f"""
-{severity_indicator} {props.get('event', 'Unknown Event')}
-   Severity: {severity} | Urgency: {urgency}
-   Effective: {props.get('effective', 'Unknown')}
-   Expires: {props.get('expires', 'Unknown')}
-   Areas: {props.get('areaDesc', 'Unknown')}
-   Summary: {props.get('headline', 'No headline available')}
-"""
-                    section += alert_info
-                    
-                result_sections.append(section)
-                
-        if not result_sections:
-            return "No active watches, warnings, or advisories for this location."
-            
-        location_info = f"Weather Alerts for {latitude}, {longitude}:"
-        return location_info + "\n".join(result_sections)
\ No newline at end of file
+        data = {"latitude": latitude, "longitude": longitude, "county": county_code, "alerts": categorized}
+        if features and not categorized:
+            return render(data, lambda _: "No active watches, warnings, or advisories for this location.")
+        return render(data, _format_watches_warnings, _compact_watches_warnings)
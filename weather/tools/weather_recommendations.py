@@ -1,11 +1,332 @@
-from constants import NWS_API_BASE
-from utils import make_nws_request
+from constants import ROUTE_SAMPLE_SPACING_KM, WINDOW_SEARCH_MAX_LOCATIONS
+from utils import lazy_import
+from output import columnar, render, render_error
+from progress import PartialResults
+from render_cache import facet_version, memoize_render
+from mcp.server.fastmcp import Context
+import asyncio
 import json
 from typing import Dict, List
 
+snapshot = lazy_import("snapshot")
+route = lazy_import("route")
+planning = lazy_import("planning")
+
+
+def _bullets(items: list[str]) -> str:
+    return chr(10).join(f"• {item}" for item in items)
+
+
+def _format_clothing_recommendations(data: dict) -> str:
+    current = data["current"]
+    next_period = data["next_period"]
+    temp_unit = current["unit"]
+    recommendation = f"""
+👕 Clothing Recommendations for {data['latitude']}, {data['longitude']}
+
+Current Conditions:
+• Temperature: {current['temp']}°{temp_unit} (feels like {current['feels_like']:.0f}°{temp_unit})
+• Wind: {current['wind']}
+• Conditions: {current['forecast'] or 'Unknown'}
+
+Recommended Clothing:
+{_bullets(data['clothing'])}
+
+Footwear:
+{_bullets(data['footwear'])}
+
+Accessories:
+{_bullets(data['accessories'])}
+
+Next Period ({next_period['name'] or 'Later'}):
+• Temperature: {next_period['temp'] if next_period['temp'] is not None else 'Unknown'}°{temp_unit}
+• Conditions: {next_period['forecast'] or 'Unknown'}
+• Consider layering if temperature will change significantly
+"""
+    
+    return recommendation.strip()
+
+
+def _format_activity_recommendations(data: dict) -> str:
+    recommendations = []
+    for period in data["periods"]:
+        period_rec = f"""
+{period['name']} - {period['temp']}°{period['unit']}, {period['forecast'] or 'Unknown'}
+Wind: {period['wind']}
+
+✅ Excellent: {', '.join(period['excellent']) if period['excellent'] else 'None'}
+👍 Good: {', '.join(period['good']) if period['good'] else 'None'}  
+⚠️  Fair: {', '.join(period['fair']) if period['fair'] else 'None'}
+❌ Avoid: {', '.join(period['avoid']) if period['avoid'] else 'None'}
+"""
+        recommendations.append(period_rec.strip())
+        
+    return f"🏃 Activity Recommendations for {data['latitude']}, {data['longitude']}:\n\n" + "\n---\n".join(recommendations)
+
+
+def _compact_activity_recommendations(data: dict) -> dict:
+    # Temperatures as e.g. "44F", and only the rating groups that name any activities, as one string each
+    return {**data, "periods": [
+        {
+            "name": period["name"],
+            "temp": f"{period['temp']}{period['unit']}",
+            "forecast": period["forecast"],
+            "wind": period["wind"],
+            **{rating: ", ".join(period[rating]) for rating in ("excellent", "good", "fair", "avoid") if period[rating]},
+        }
+        for period in data["periods"]
+    ]}
+
+
+def _format_travel_alerts(alerts: list[str]) -> str:
+    travel_advice = ""
+    if alerts:
+        travel_advice += "🚨 TRAVEL ALERTS:\n"
+        for alert in alerts:
+            travel_advice += f"• {alert}\n"
+        travel_advice += "\n"
+    return travel_advice
+
+
+def _format_travel_forecast(forecast: dict) -> str:
+    travel_advice = ""
+    # Compile advice sections
+    if forecast["travel_conditions"]:
+        travel_advice += "⚠️ TRAVEL CONDITIONS:\n"
+        for condition in forecast["travel_conditions"]:
+            travel_advice += f"• {condition}\n"
+        travel_advice += "\n"
+        
+    if forecast["driving_conditions"]:
+        travel_advice += "🚗 DRIVING CONDITIONS:\n"
+        for condition in forecast["driving_conditions"]:
+            travel_advice += f"• {condition}\n"
+        travel_advice += "\n"
+        
+    if forecast["packing"]:
+        travel_advice += "🧳 PACKING SUGGESTIONS:\n"
+        for suggestion in forecast["packing"]:
+            travel_advice += f"• {suggestion}\n"
+        travel_advice += "\n"
+    return travel_advice
+
+
+def _format_travel_advice(data: dict) -> str:
+    travel_advice = f"✈️ Travel Weather Advice for {data['latitude']}, {data['longitude']}:\n\n"
+    travel_advice += _format_travel_alerts(data["alerts"])
+        
+    forecast = data.get("forecast")
+    if forecast is None:
+        return travel_advice
+        
+    travel_advice += _format_travel_forecast(forecast)
+        
+    # General travel tips
+    travel_advice += """📋 GENERAL TRAVEL TIPS:
+• Check road conditions before departure
+• Keep emergency supplies in vehicle
+• Allow extra travel time in poor weather
+• Consider travel insurance for severe weather delays
+• Monitor weather updates during travel
+• Have backup accommodation plans"""
+    
+    return travel_advice
+
+
+def _format_route_weather(data: dict) -> str:
+    lines = [
+        f"🛣️ Route Weather ({data['distance_km']} km, {data['samples']} samples across "
+        f"{data['gridpoints']} forecast grid cells):",
+    ]
+    if data["unresolved_samples"]:
+        lines.append(f"({data['unresolved_samples']} samples outside NWS coverage were skipped)")
+
+    if data["alerts"]:
+        lines.append("\n🚨 ALERTS ALONG THE ROUTE:")
+        for alert in data["alerts"]:
+            lines.append(f"• {alert['event']} ({alert['severity'] or 'Unknown'}) - {', '.join(alert['counties'])}")
+
+    if data["timeline"]:
+        lines.append("\n🕒 CORRIDOR TIMELINE (UTC, range across the route):")
+        for hour in data["timeline"]:
+            temps = f"{hour['temp_min']}-{hour['temp_max']}°{hour['unit']}" if hour["temp_min"] is not None else "n/a"
+            wind = f"wind to {hour['wind_max_mph']} mph" if hour["wind_max_mph"] is not None else "wind n/a"
+            precip = f", precip to {hour['precip_max']}%" if hour["precip_max"] is not None else ""
+            lines.append(f"• {hour['time'][:16].replace('T', ' ')}: {temps}, {wind}{precip} | {', '.join(hour['conditions'])}")
+
+    lines.append("\n📍 ALONG THE ROUTE:")
+    for segment in data["segments"]:
+        stretch = f"km {segment['from_km']:g}-{segment['to_km']:g} ({segment['gridpoint']})"
+        if "eta" in segment:
+            stretch += f", reached {segment['eta'].replace('T', ' ')}"
+        forecast = segment.get("forecast")
+        conditions = (f"{forecast['temp']}°{forecast['unit']}, {forecast['wind']}, {forecast['forecast']}"
+                      if forecast else "No forecast available")
+        lines.append(f"• {stretch}: {conditions}")
+        if segment["alerts"]:
+            lines.append(f"  ⚠️ {', '.join(segment['alerts'])}")
+
+    return "\n".join(lines)
+
+
+def _compact_temp_range(low: int | None, high: int | None, unit: str | None) -> str | None:
+    # e.g. "51F", or "44-51F" when the values differ
+    if low is None:
+        return None
+    return f"{low}{unit or ''}" if low == high else f"{low}-{high}{unit or ''}"
+
+
+def _compact_route_weather(data: dict) -> dict:
+    # Consecutive stretches with the same forecast and alerts merge into one, and
+    # alerts only name their counties when they don't cover the whole route
+    segments = []
+    for segment in data["segments"]:
+        previous = segments[-1] if segments else None
+        if (previous is not None and previous.get("forecast") == segment.get("forecast")
+                and previous.get("alerts") == (segment["alerts"] or None)):
+            previous["to_km"] = segment["to_km"]
+            previous["gridpoints"] += 1
+            if segment["county"] and segment["county"] not in previous["counties"]:
+                previous["counties"].append(segment["county"])
+            continue
+        segments.append({
+            "from_km": segment["from_km"],
+            "to_km": segment["to_km"],
+            "gridpoints": 1,
+            "counties": [segment["county"]] if segment["county"] else [],
+            "eta": segment.get("eta"),
+            "forecast": segment.get("forecast"),
+            "alerts": segment["alerts"] or None,
+        })
+
+    route_counties = {segment["county"] for segment in data["segments"] if segment["county"]}
+    return {
+        **{key: data[key] for key in ("distance_km", "samples", "lookups", "gridpoints", "counties")},
+        "unresolved_samples": data["unresolved_samples"] or None,
+        "timeline": [
+            {
+                "time": hour["time"][:16] + "Z",
+                "temp": _compact_temp_range(hour["temp_min"], hour["temp_max"], hour["unit"]),
+                "wind_max_mph": hour["wind_max_mph"],
+                "precip_max": hour["precip_max"],
+                "conditions": ", ".join(hour["conditions"]),
+            }
+            for hour in data["timeline"]
+        ],
+        "segments": segments,
+        "alerts": [
+            {"ev": alert["event"], "sev": alert["severity"],
+             "counties": alert["counties"] if set(alert["counties"]) != route_counties else None}
+            for alert in data["alerts"]
+        ],
+    }
+
+
+def _format_best_windows(data: dict) -> str:
+    header = (f"🗓️ Best {data['duration_hours']}-hour windows for {data['profile'].replace('_', ' ')} "
+              f"across {data['locations']} location(s):")
+    lines = [header]
+    if data["unavailable"]:
+        lines.append(f"(No hourly forecast for: {', '.join(f'{lat}, {lon}' for lat, lon in data['unavailable'])})")
+    if not data["windows"]:
+        lines.append("\nNo suitable windows found in the forecast period.")
+        return "\n".join(lines)
+        
+    for rank, window in enumerate(data["windows"], 1):
+        place = window["place"] or f"{window['latitude']}, {window['longitude']}"
+        start = (window["start"] or "")[:16].replace("T", " ")
+        end = f" to {window['end'][11:16]}" if window["end"] else ""
+        lines.append(f"\n{rank}. {place}: {start}{end} (score {window['score']}/100)")
+        temps = f"{window['temp_min']}-{window['temp_max']}°{window['unit']}" if window["temp_min"] is not None else "n/a"
+        wind = f"up to {window['wind_max_mph']} mph" if window["wind_max_mph"] is not None else "n/a"
+        lines.append(f"   🌡️ {temps} | 💨 {wind} | 🌧️ {window['precip_max']}% | {', '.join(window['conditions'])}")
+    return "\n".join(lines)
+
+
+def _compact_best_windows(data: dict) -> dict:
+    # Windows as rows under one header, each at its place name or else [lat, lon],
+    # starting at a local time to the minute and ending at a time of day
+    return {
+        **{key: data[key] for key in ("profile", "duration_hours", "locations")},
+        "unavailable": data["unavailable"] or None,
+        "windows": columnar([
+            {
+                "at": window["place"] or [window["latitude"], window["longitude"]],
+                "start": (window["start"] or "")[:16],
+                "end": (window["end"] or "")[11:16] or None,
+                "score": window["score"],
+                "temp": _compact_temp_range(window["temp_min"], window["temp_max"], window["unit"]),
+                "wind_mph": window["wind_max_mph"],
+                "precip": window["precip_max"],
+                "sky": ", ".join(window["conditions"]),
+            }
+            for window in data["windows"]
+        ]),
+    }
+
+
+def _travel_alerts(alert_features: list | None) -> list[str]:
+    # Check for travel-impacting alerts
+    travel_alerts = []
+    if alert_features:
+        for feature in alert_features:
+            event = feature["properties"].get("event", "").lower()
+            if any(keyword in event for keyword in ["warning", "watch", "advisory"]):
+                if any(travel_impact in event for travel_impact in 
+                      ["winter", "snow", "ice", "flood", "wind", "fog", "storm"]):
+                    travel_alerts.append(feature["properties"].get("event", "Unknown"))
+    return travel_alerts
+
+
+def _travel_forecast(forecast_periods: list) -> dict:
+    periods = forecast_periods[:6]  # Next 3 days
+    
+    travel_conditions = []
+    packing_suggestions = []
+    driving_conditions = []
+    
+    for period in periods:
+        temp = period.get("temperature", 70)
+        conditions = period.get("shortForecast", "").lower()
+        wind_speed = period.get("windSpeed", "")
+        
+        # Analyze travel impact
+        if any(keyword in conditions for keyword in ["rain", "shower", "storm"]):
+            driving_conditions.append(f"{period.get('name')}: Wet roads, reduced visibility")
+            packing_suggestions.append("Rain gear, umbrella")
+            
+        if any(keyword in conditions for keyword in ["snow", "ice", "sleet"]):
+            driving_conditions.append(f"{period.get('name')}: HAZARDOUS - Snow/ice conditions")
+            packing_suggestions.append("Winter emergency kit, extra clothing")
+            travel_conditions.append(f"{period.get('name')}: Consider delaying travel")
+            
+        if "fog" in conditions:
+            driving_conditions.append(f"{period.get('name')}: Dense fog, severely reduced visibility")
+            
+        if wind_speed and "mph" in wind_speed:
+            try:
+                wind_mph = int(wind_speed.split()[0])
+                if wind_mph > 25:
+                    driving_conditions.append(f"{period.get('name')}: High winds - difficult driving")
+                    travel_conditions.append(f"{period.get('name')}: Avoid high-profile vehicles")
+            except:
+                pass
+                
+        if temp < 32:
+            packing_suggestions.append("Heavy winter clothing, ice scraper")
+        elif temp > 85:
+            packing_suggestions.append("Light clothing, extra water, sun protection")
+            
+    return {
+        "travel_conditions": list(dict.fromkeys(travel_conditions)),
+        "driving_conditions": list(dict.fromkeys(driving_conditions)),
+        "packing": list(dict.fromkeys(packing_suggestions)),
+    }
+
 
 def register_weather_recommendation_tools(mcp):
     @mcp.tool()
+    @memoize_render(facet_version("grid", "periods"))
     async def get_clothing_recommendations(latitude: float, longitude: float) -> str:
         """Get clothing recommendations based on current and forecast weather conditions.
         
@@ -13,22 +334,20 @@ def register_weather_recommendation_tools(mcp):
             latitude: Latitude of the location
             longitude: Longitude of the location
         """
-        # Get current conditions and forecast
-        points_url = f"{NWS_API_BASE}/points/{latitude},{longitude}"
-        points_data = await make_nws_request(points_url)
+        # Get current conditions and forecast from the shared location snapshot
+        location = snapshot.get_snapshot(latitude, longitude)
         
-        if not points_data:
-            return "Unable to fetch weather data for clothing recommendations."
+        if not await location.grid():
+            return render_error("Unable to fetch weather data for clothing recommendations.")
             
         # Get forecast
-        forecast_url = points_data["properties"]["forecast"]
-        forecast_data = await make_nws_request(forecast_url)
+        periods = await location.periods()
         
-        if not forecast_data:
-            return "Unable to fetch forecast for clothing recommendations."
+        if not periods:
+            return render_error("Unable to fetch forecast for clothing recommendations.")
             
-        current_period = forecast_data["properties"]["periods"][0]
-        next_period = forecast_data["properties"]["periods"][1] if len(forecast_data["properties"]["periods"]) > 1 else current_period
+        current_period = periods[0]
+        next_period = periods[1] if len(periods) > 1 else current_period
         
         # Extract weather info
         temp = current_period.get("temperature", 70)
@@ -108,32 +427,28 @@ def register_weather_recommendation_tools(mcp):
         if wind_mph > 15:
             accessories.append("Windproof outer layer")
             
-        recommendation = f"""
-👕 Clothing Recommendations for {latitude}, {longitude}
-
-Current Conditions:
-• Temperature: {temp}°{temp_unit} (feels like {feels_like:.0f}°{temp_unit})
-• Wind: {wind_speed}
-• Conditions: {current_period.get('shortForecast', 'Unknown')}
-
-Recommended Clothing:
-{chr(10).join(f"• {item}" for item in clothing_layers)}
-
-Footwear:
-{chr(10).join(f"• {item}" for item in footwear)}
-
-Accessories:
-{chr(10).join(f"• {item}" for item in accessories)}
-
-Next Period ({next_period.get('name', 'Later')}):
-• Temperature: {next_period.get('temperature', 'Unknown')}°{temp_unit}
-• Conditions: {next_period.get('shortForecast', 'Unknown')}
-• Consider layering if temperature will change significantly
-"""
-        
-        return recommendation.strip()
+        return render({
+            "latitude": latitude,
+            "longitude": longitude,
+            "current": {
+                "temp": temp,
+                "unit": temp_unit,
+                "feels_like": round(feels_like),
+                "wind": wind_speed,
+                "forecast": current_period.get("shortForecast"),
+            },
+            "clothing": clothing_layers,
+            "footwear": footwear,
+            "accessories": accessories,
+            "next_period": {
+                "name": next_period.get("name"),
+                "temp": next_period.get("temperature"),
+                "forecast": next_period.get("shortForecast"),
+            },
+        }, _format_clothing_recommendations)
 
     @mcp.tool()
+    @memoize_render(facet_version("grid", "periods"))
     async def get_activity_recommendations(latitude: float, longitude: float) -> str:
         """Get outdoor activity recommendations based on weather conditions.
         
@@ -141,21 +456,19 @@ Next Period ({next_period.get('name', 'Later')}):
             latitude: Latitude of the location
             longitude: Longitude of the location
         """
-        # Get forecast data
-        points_url = f"{NWS_API_BASE}/points/{latitude},{longitude}"
-        points_data = await make_nws_request(points_url)
+        # Get forecast data from the shared location snapshot
+        location = snapshot.get_snapshot(latitude, longitude)
         
-        if not points_data:
-            return "Unable to fetch weather data for activity recommendations."
+        if not await location.grid():
+            return render_error("Unable to fetch weather data for activity recommendations.")
             
-        forecast_url = points_data["properties"]["forecast"]
-        forecast_data = await make_nws_request(forecast_url)
+        forecast_periods = await location.periods()
         
-        if not forecast_data:
-            return "Unable to fetch forecast for activity recommendations."
+        if not forecast_periods:
+            return render_error("Unable to fetch forecast for activity recommendations.")
             
         # Analyze next few periods
-        periods = forecast_data["properties"]["periods"][:4]  # Next 2 days
+        periods = forecast_periods[:4]  # Next 2 days
         
         recommendations = []
         
@@ -224,134 +537,146 @@ Next Period ({next_period.get('name', 'Later')}):
                 fair_activities.extend(["Cycling (expect headwinds)"])
                 
             # Remove duplicates and organize
-            excellent_activities = list(set(excellent_activities))
-            good_activities = list(set(good_activities))
-            fair_activities = list(set(fair_activities))
-            avoid_activities = list(set(avoid_activities))
+            excellent_activities = list(dict.fromkeys(excellent_activities))
+            good_activities = list(dict.fromkeys(good_activities))
+            fair_activities = list(dict.fromkeys(fair_activities))
+            avoid_activities = list(dict.fromkeys(avoid_activities))
             
-            period_rec = f"""
-{period_name} - {temp}°{temp_unit}, {period.get('shortForecast', 'Unknown')}
-Wind: {wind_speed}
-
-✅ Excellent: {', '.join(excellent_activities) if excellent_activities else 'None'}
-👍 Good: {', '.join(good_activities) if good_activities else 'None'}  
-⚠️  Fair: {', '.join(fair_activities) if fair_activities else 'None'}
-❌ Avoid: {', '.join(avoid_activities) if avoid_activities else 'None'}
-"""
-            recommendations.append(period_rec.strip())
+            recommendations.append({
+                "name": period_name,
+                "temp": temp,
+                "unit": temp_unit,
+                "forecast": period.get("shortForecast"),
+                "wind": wind_speed,
+                "excellent": excellent_activities,
+                "good": good_activities,
+                "fair": fair_activities,
+                "avoid": avoid_activities,
+            })
             
-        return f"🏃 Activity Recommendations for {latitude}, {longitude}:\n\n" + "\n---\n".join(recommendations)
+        return render(
+            {"latitude": latitude, "longitude": longitude, "periods": recommendations},
+            _format_activity_recommendations,
+            _compact_activity_recommendations,
+        )
 
     @mcp.tool()
-    async def get_travel_weather_advice(latitude: float, longitude: float) -> str:
+    async def get_travel_weather_advice(latitude: float, longitude: float, ctx: Context) -> str:
         """Get travel-specific weather advice and preparations needed.
         
+        Alert and forecast advice are sent as progress/log notifications as soon as each is ready.
+        
         Args:
             latitude: Latitude of the location  
             longitude: Longitude of the location
         """
-        # Get extended forecast and alerts
-        points_url = f"{NWS_API_BASE}/points/{latitude},{longitude}"
-        points_data = await make_nws_request(points_url)
+        # Get extended forecast and alerts concurrently from the shared location snapshot;
+        # when the local zone index knows the county, alerts don't wait on /points
+        location = snapshot.get_snapshot(latitude, longitude)
+        partial = PartialResults(ctx, "get_travel_weather_advice", total=2)
+
+        async def _alerts_branch():
+            travel_alerts = _travel_alerts(await location.zone_alerts())
+            await partial.emit("alerts", travel_alerts, lambda alerts: _format_travel_alerts(alerts) or "No travel-impacting alerts.")
+            return travel_alerts
+
+        async def _forecast_branch():
+            forecast_periods = await location.periods()
+            forecast = _travel_forecast(forecast_periods) if forecast_periods else None
+            if forecast is not None:
+                await partial.emit("forecast", forecast, lambda forecast: _format_travel_forecast(forecast) or "No travel-impacting conditions in the forecast.")
+            return forecast
+
+        travel_alerts, forecast = await asyncio.gather(_alerts_branch(), _forecast_branch())
         
-        if not points_data:
-            return "Unable to fetch weather data for travel advice."
+        if not await location.grid():
+            return render_error("Unable to fetch weather data for travel advice.")
             
-        # Get forecast and alerts
-        forecast_url = points_data["properties"]["forecast"]
-        forecast_data = await make_nws_request(forecast_url)
-        
-        # Get alerts for the area
-        county = points_data["properties"].get("county")
-        alerts_data = None
-        if county:
-            county_code = county.split("/")[-1]
-            alerts_url = f"{NWS_API_BASE}/alerts/active/zone/{county_code}"
-            alerts_data = await make_nws_request(alerts_url)
+        advice = {"latitude": latitude, "longitude": longitude, "alerts": travel_alerts}
+        if forecast is not None:
+            advice["forecast"] = forecast
             
-        travel_advice = f"✈️ Travel Weather Advice for {latitude}, {longitude}:\n\n"
+        return render(advice, _format_travel_advice)
+
+    @mcp.tool()
+    async def get_route_weather(
+        waypoints: list[list[float]] | None = None,
+        polyline: str = "",
+        spacing_km: float = ROUTE_SAMPLE_SPACING_KM,
+        hours: int = 12,
+        average_speed_kmh: float = 0,
+    ) -> str:
+        """Get weather and alerts along a whole travel route, merged into one corridor summary.
         
-        # Check for travel-impacting alerts
-        if alerts_data and alerts_data.get("features"):
-            travel_alerts = []
-            for feature in alerts_data["features"]:
-                event = feature["properties"].get("event", "").lower()
-                if any(keyword in event for keyword in ["warning", "watch", "advisory"]):
-                    if any(travel_impact in event for travel_impact in 
-                          ["winter", "snow", "ice", "flood", "wind", "fog", "storm"]):
-                        travel_alerts.append(feature["properties"].get("event", "Unknown"))
-                        
-            if travel_alerts:
-                travel_advice += "🚨 TRAVEL ALERTS:\n"
-                for alert in travel_alerts:
-                    travel_advice += f"• {alert}\n"
-                travel_advice += "\n"
-                
-        if forecast_data:
-            periods = forecast_data["properties"]["periods"][:6]  # Next 3 days
+        The route is sampled every spacing_km; each NWS forecast grid cell and county it
+        crosses is fetched once.
+        
+        Args:
+            waypoints: Route as [latitude, longitude] pairs, in travel order
+            polyline: Route as an encoded polyline (precision 5), used instead of waypoints
+            spacing_km: Distance between route samples in kilometers (default: 5)
+            hours: Hours of forecast in the corridor timeline (default: 12)
+            average_speed_kmh: Average travel speed; when set, each stretch gets the forecast for when it is reached
+        """
+        try:
+            points = route.decode_polyline(polyline) if polyline else [(float(p[0]), float(p[1])) for p in waypoints or []]
+        except (ValueError, TypeError, IndexError):
+            return render_error("Invalid route: give waypoints as [latitude, longitude] pairs or an encoded polyline.")
+        if not points:
+            return render_error("No route given.")
             
-            travel_conditions = []
-            packing_suggestions = []
-            driving_conditions = []
+        samples = route.sample_route(points, max(spacing_km, 0.5))
+        corridor = await route.Corridor(samples).load()
+        if not corridor.cells:
+            return render_error("Unable to fetch weather data along the route.")
             
-            for period in periods:
-                temp = period.get("temperature", 70)
-                conditions = period.get("shortForecast", "").lower()
-                wind_speed = period.get("windSpeed", "")
-                
-                # Analyze travel impact
-                if any(keyword in conditions for keyword in ["rain", "shower", "storm"]):
-                    driving_conditions.append(f"{period.get('name')}: Wet roads, reduced visibility")
-                    packing_suggestions.append("Rain gear, umbrella")
-                    
-                if any(keyword in conditions for keyword in ["snow", "ice", "sleet"]):
-                    driving_conditions.append(f"{period.get('name')}: HAZARDOUS - Snow/ice conditions")
-                    packing_suggestions.append("Winter emergency kit, extra clothing")
-                    travel_conditions.append(f"{period.get('name')}: Consider delaying travel")
-                    
-                if "fog" in conditions:
-                    driving_conditions.append(f"{period.get('name')}: Dense fog, severely reduced visibility")
-                    
-                if wind_speed and "mph" in wind_speed:
-                    try:
-                        wind_mph = int(wind_speed.split()[0])
-                        if wind_mph > 25:
-                            driving_conditions.append(f"{period.get('name')}: High winds - difficult driving")
-                            travel_conditions.append(f"{period.get('name')}: Avoid high-profile vehicles")
-                    except:
-                        pass
-                        
-                if temp < 32:
-                    packing_suggestions.append("Heavy winter clothing, ice scraper")
-                elif temp > 85:
-                    packing_suggestions.append("Light clothing, extra water, sun protection")
-                    
-            # Compile advice sections
-            if travel_conditions:
-                travel_advice += "⚠️ TRAVEL CONDITIONS:\n"
-                for condition in list(set(travel_conditions)):
-                    travel_advice += f"• {condition}\n"
-                travel_advice += "\n"
-                
-            if driving_conditions:
-                travel_advice += "🚗 DRIVING CONDITIONS:\n"
-                for condition in list(set(driving_conditions)):
-                    travel_advice += f"• {condition}\n"
-                travel_advice += "\n"
-                
-            if packing_suggestions:
-                travel_advice += "🧳 PACKING SUGGESTIONS:\n"
-                for suggestion in list(set(packing_suggestions)):
-                    travel_advice += f"• {suggestion}\n"
-                travel_advice += "\n"
-                
-            # General travel tips
-            travel_advice += """📋 GENERAL TRAVEL TIPS:
-• Check road conditions before departure
-• Keep emergency supplies in vehicle
-• Allow extra travel time in poor weather
-• Consider travel insurance for severe weather delays
-• Monitor weather updates during travel
-• Have backup accommodation plans"""
+        return render(
+            route.corridor_summary(corridor, max(hours, 1), average_speed_kmh),
+            _format_route_weather,
+            _compact_route_weather,
+        )
+
+    @mcp.tool()
+    async def find_best_weather_window(
+        locations: list[list[float]],
+        profile: str = "hiking",
+        duration_hours: int = 3,
+        top_k: int = 5,
+        days: int = 7,
+    ) -> str:
+        """Find the best time windows for an activity across candidate locations.
+        
+        Scans the hourly forecast of every location and ranks (location, time window) slots.
+        
+        Args:
+            locations: Candidate locations as [latitude, longitude] pairs
+            profile: Scoring profile: hiking, outdoor_event, running, cycling, beach or stargazing (default: hiking)
+            duration_hours: Length of the window in hours (default: 3)
+            top_k: Number of windows to return (default: 5)
+            days: How many days ahead to search, up to 7 (default: 7)
+        """
+        if profile not in planning.WINDOW_PROFILES:
+            return render_error(f"Unknown profile. Available profiles: {', '.join(planning.WINDOW_PROFILES)}")
+        try:
+            points = list(dict.fromkeys((float(p[0]), float(p[1])) for p in locations))
+        except (ValueError, TypeError, IndexError):
+            return render_error("Invalid locations: give [latitude, longitude] pairs.")
+        if not points:
+            return render_error("No locations given.")
+        if len(points) > WINDOW_SEARCH_MAX_LOCATIONS:
+            return render_error(f"Too many locations: at most {WINDOW_SEARCH_MAX_LOCATIONS} per call.")
+            
+        duration_hours = min(max(duration_hours, 1), 24)
+        loaded, unavailable = await planning.load_locations(
+            points, planning.WINDOW_PROFILES[profile], min(max(days, 1), 7)
+        )
+        if not loaded:
+            return render_error("Unable to fetch hourly forecasts for the requested locations.")
             
-        return travel_advice
\ No newline at end of file
+        return render({
+            "profile": profile,
+            "duration_hours": duration_hours,
+            "locations": len(points),
+            "unavailable": unavailable,
+            "windows": planning.best_windows(loaded, duration_hours, max(top_k, 1)),
+        }, _format_best_windows, _compact_best_windows)
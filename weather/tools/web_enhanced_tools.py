@@ -1,247 +1,346 @@
-from web_weather_fallback import smart_weather_fallback, get_location_from_coords, create_fallback_response
 from constants import NWS_API_BASE
-from utils import make_nws_request
+from utils import make_nws_request, period_record, lazy_import
+from output import render, render_error
+from progress import PartialResults
+from mcp.server.fastmcp import Context
 import asyncio
 
+web_weather_fallback = lazy_import("web_weather_fallback")
+snapshot = lazy_import("snapshot")
+
+CONTEXT_ADVICE_ICONS = {
+    "Driving": "🚗",
+    "Outdoor": "🥾",
+    "Event": "🎉",
+}
+
+
+def _grid_record(properties: dict) -> dict:
+    return {
+        "office": properties["cwa"],
+        "grid_id": properties["gridId"],
+        "grid_x": properties["gridX"],
+        "grid_y": properties["gridY"],
+        "time_zone": properties["timeZone"],
+    }
+
+
+def _current_record(forecast_periods: list) -> dict:
+    current_period = forecast_periods[0]
+    current = period_record(current_period)
+    current["details"] = current_period.get("detailedForecast")
+    return current
+
+
+def _format_current_section(current: dict) -> str:
+    return f"""
+🌤️ Current Conditions:
+{current['name']}: {current['temp']}°{current['unit']}
+Wind: {current['wind']} {current['wind_dir']}
+Conditions: {current['forecast']}
+Details: {current['details']}
+"""
+
+
+def _format_alert_count_section(alert_count: int) -> str:
+    if alert_count:
+        return f"""
+⚠️ Active Alerts: {alert_count} alert(s) for this area
+(Use get_weather_watches_warnings for details)
+"""
+    return "✅ No active weather alerts"
+
+
+def _format_location_section(grid: dict) -> str:
+    return f"""
+📍 Location Info:
+Forecast Office: {grid['office']}
+Grid Point: {grid['grid_id']} ({grid['grid_x']},{grid['grid_y']})
+Time Zone: {grid['time_zone']}
+"""
+
+
+def _format_comprehensive_weather(data: dict) -> str:
+    results = []
+
+    current = data.get("current")
+    if current:
+        results.append(_format_current_section(current))
+
+    if "alert_count" in data:
+        results.append(_format_alert_count_section(data["alert_count"]))
+
+    results.append(_format_location_section(data["grid"]))
+
+    return "\n".join(results)
+
+
+def _format_contextual_weather(data: dict) -> str:
+    context_analysis = []
+
+    for period in data["periods"]:
+        period_info = f"""
+{period['name']}:
+🌡️ {period['temp']}°{period['unit']} | 💨 {period['wind']}
+☁️ {period['forecast']}
+"""
+        for advice in period["advice"]:
+            icon = CONTEXT_ADVICE_ICONS.get(advice.split(":", 1)[0], "•")
+            period_info += f"{icon} {advice}\n"
+
+        context_analysis.append(period_info)
+
+    result = f"🎯 Weather Analysis for {data['context'] or 'General'} Context:\n"
+    result += "\n---\n".join(context_analysis)
+
+    return result
+
+
+def _format_weather_summary(data: dict) -> str:
+    return f"""
+Weather Summary for {data['location']}:
+
+⚠️ Note: This tool requires coordinates for full NWS API access.
+Please use get_forecast or get_comprehensive_weather with latitude/longitude for detailed information.
+
+Alternative: Check {data['alternative']} and search for "{data['location']}"
+"""
+
+
+def _format_service_status(data: dict) -> str:
+    if data["nws_api"] == "online":
+        return """
+✅ Weather Services Status:
+• National Weather Service API: ONLINE
+• All weather tools should function normally
+• Real-time data available
+
+🔧 Service Details:
+• API Base: https://api.weather.gov
+• Status: Operational
+• Last Check: Just now
+"""
+    if data["nws_api"] == "offline":
+        return """
+⚠️ Weather Services Status:
+• National Weather Service API: OFFLINE or SLOW
+• Web fallback mode will be used
+• Alternative sources recommended
+
+🌐 Alternative Sources:
+• Weather.gov: https://weather.gov/
+• Weather.com: https://weather.com/
+• NOAA Weather Radio
+• Local weather apps
+"""
+    return f"""
+❌ Weather Services Status:
+• National Weather Service API: ERROR
+• Error: {data['detail']}
+• Web fallback mode active
+
+🆘 Recommended Actions:
+• Check internet connection
+• Try alternative weather sources
+• Use local weather apps
+• Monitor service status at weather.gov
+"""
+
 
 def register_web_enhanced_tools(mcp):
     """Register web-enhanced weather tools with intelligent fallback"""
-    
+
     @mcp.tool()
-    async def get_comprehensive_weather(latitude: float, longitude: float) -> str:
+    async def get_comprehensive_weather(latitude: float, longitude: float, ctx: Context) -> str:
         """Get comprehensive weather information with automatic web fallback.
-        
+
         This tool tries multiple data sources and provides the best available information.
-        
+        Sections are sent as progress/log notifications as soon as each one is ready.
+
         Args:
             latitude: Latitude of the location
             longitude: Longitude of the location
         """
-        location = get_location_from_coords(latitude, longitude)
-        
+        location = web_weather_fallback.get_location_from_coords(latitude, longitude)
+
         async def _get_comprehensive_api():
             try:
-                # Try to get multiple types of data
-                results = []
-                
-                # Get basic forecast
-                points_url = f"{NWS_API_BASE}/points/{latitude},{longitude}"
-                points_data = await make_nws_request(points_url)
-                
-                if points_data:
-                    # Get current conditions
-                    forecast_url = points_data["properties"]["forecast"]
-                    forecast_data = await make_nws_request(forecast_url)
-                    
-                    if forecast_data:
-                        current_period = forecast_data["properties"]["periods"][0]
-                        results.append(f"""
-🌤️ Current Conditions:
-{current_period['name']}: {current_period['temperature']}°{current_period['temperatureUnit']}
-Wind: {current_period['windSpeed']} {current_period['windDirection']}
-Conditions: {current_period['shortForecast']}
-Details: {current_period['detailedForecast']}
-""")
-                    
-                    # Get alerts if available
-                    county = points_data["properties"].get("county")
-                    if county:
-                        county_code = county.split("/")[-1]
-                        alerts_url = f"{NWS_API_BASE}/alerts/active/zone/{county_code}"
-                        alerts_data = await make_nws_request(alerts_url)
-                        
-                        if alerts_data and alerts_data.get("features"):
-                            alert_count = len(alerts_data["features"])
-                            results.append(f"""
-⚠️ Active Alerts: {alert_count} alert(s) for this area
-(Use get_weather_watches_warnings for details)
-""")
-                        else:
-                            results.append("✅ No active weather alerts")
-                    
-                    # Add location info
-                    results.append(f"""
-📍 Location Info:
-Forecast Office: {points_data["properties"]["cwa"]}
-Grid Point: {points_data["properties"]["gridId"]} ({points_data["properties"]["gridX"]},{points_data["properties"]["gridY"]})
-Time Zone: {points_data["properties"]["timeZone"]}
-""")
-                
-                if results:
-                    return "\n".join(results)
-                else:
-                    return "Unable to fetch comprehensive weather data."
-                    
+                # Grid info, forecast and alerts load concurrently from the shared location
+                # snapshot; each section is streamed to the client as soon as it is ready
+                location_data = snapshot.get_snapshot(latitude, longitude)
+                partial = PartialResults(ctx, "get_comprehensive_weather", total=3)
+
+                async def _grid_branch():
+                    properties = await location_data.grid()
+                    if properties:
+                        await partial.emit("location", _grid_record(properties), _format_location_section)
+                    return properties
+
+                async def _forecast_branch():
+                    forecast_periods = await location_data.periods()
+                    if forecast_periods:
+                        await partial.emit("current", _current_record(forecast_periods), _format_current_section)
+                    return forecast_periods
+
+                async def _alerts_branch():
+                    alert_features = await location_data.zone_alerts()
+                    if await location_data.county_code():
+                        await partial.emit("alerts", len(alert_features or []), _format_alert_count_section)
+                    return alert_features
+
+                properties, forecast_periods, alert_features = await asyncio.gather(
+                    _grid_branch(), _forecast_branch(), _alerts_branch()
+                )
+                if not properties:
+                    return render_error("Unable to fetch comprehensive weather data.")
+
+                data = {
+                    "latitude": latitude,
+                    "longitude": longitude,
+                    "grid": _grid_record(properties),
+                }
+
+                # Get current conditions
+                if forecast_periods:
+                    data["current"] = _current_record(forecast_periods)
+
+                # Get alerts if available
+                if await location_data.county_code():
+                    data["alert_count"] = len(alert_features or [])
+
+                return render(data, _format_comprehensive_weather)
+
             except Exception as e:
-                return f"Error fetching weather data: {str(e)}"
-        
+                return render_error(f"Error fetching weather data: {str(e)}")
+
         # Use smart fallback
-        return await smart_weather_fallback(
+        return await web_weather_fallback.smart_weather_fallback(
             location=location,
             tool_name="Comprehensive Weather",
             api_function=_get_comprehensive_api
         )
-    
+
     @mcp.tool()
     async def get_weather_with_context(latitude: float, longitude: float, context: str = "") -> str:
         """Get weather information with specific context (travel, outdoor activity, etc.) and web fallback.
-        
+
         Args:
             latitude: Latitude of the location
             longitude: Longitude of the location
             context: Context for weather request (e.g., "travel", "hiking", "outdoor event")
         """
-        location = get_location_from_coords(latitude, longitude)
-        
+        location = web_weather_fallback.get_location_from_coords(latitude, longitude)
+
         async def _get_contextual_weather():
             try:
-                # Get basic weather data
-                points_url = f"{NWS_API_BASE}/points/{latitude},{longitude}"
-                points_data = await make_nws_request(points_url)
-                
-                if not points_data:
-                    return "Unable to fetch weather data for contextual analysis."
-                
-                forecast_url = points_data["properties"]["forecast"]
-                forecast_data = await make_nws_request(forecast_url)
-                
-                if not forecast_data:
-                    return "Unable to fetch forecast for contextual analysis."
-                
-                periods = forecast_data["properties"]["periods"][:3]  # Next 3 periods
-                
+                # Get basic weather data from the shared location snapshot
+                location_data = snapshot.get_snapshot(latitude, longitude)
+
+                if not await location_data.grid():
+                    return render_error("Unable to fetch weather data for contextual analysis.")
+
+                forecast_periods = await location_data.periods()
+
+                if not forecast_periods:
+                    return render_error("Unable to fetch forecast for contextual analysis.")
+
+                periods = forecast_periods[:3]  # Next 3 periods
+
                 # Create context-specific analysis
                 context_analysis = []
-                
+
                 for period in periods:
                     temp = period.get("temperature", 0)
                     conditions = period.get("shortForecast", "").lower()
-                    wind = period.get("windSpeed", "")
-                    
-                    period_info = f"""
-{period['name']}:
-🌡️ {temp}°{period['temperatureUnit']} | 💨 {wind}
-☁️ {period['shortForecast']}
-"""
-                    
+                    advice = []
+
                     # Add context-specific advice
                     if context.lower() in ["travel", "driving"]:
                         if "rain" in conditions or "storm" in conditions:
-                            period_info += "🚗 Driving: Use caution, wet roads expected\n"
+                            advice.append("Driving: Use caution, wet roads expected")
                         elif "snow" in conditions or "ice" in conditions:
-                            period_info += "🚗 Driving: HAZARDOUS - Winter conditions\n"
+                            advice.append("Driving: HAZARDOUS - Winter conditions")
                         else:
-                            period_info += "🚗 Driving: Good conditions expected\n"
-                    
+                            advice.append("Driving: Good conditions expected")
+
                     elif context.lower() in ["hiking", "outdoor", "camping"]:
                         if temp < 40:
-                            period_info += "🥾 Outdoor: Dress warmly, layer clothing\n"
+                            advice.append("Outdoor: Dress warmly, layer clothing")
                         elif temp > 85:
-                            period_info += "🥾 Outdoor: Stay hydrated, sun protection\n"
-                        
+                            advice.append("Outdoor: Stay hydrated, sun protection")
+
                         if "rain" in conditions:
-                            period_info += "🥾 Outdoor: Bring rain gear\n"
+                            advice.append("Outdoor: Bring rain gear")
                         elif "clear" in conditions or "sunny" in conditions:
-                            period_info += "🥾 Outdoor: Excellent conditions\n"
-                    
+                            advice.append("Outdoor: Excellent conditions")
+
                     elif context.lower() in ["event", "wedding", "party"]:
                         if "rain" in conditions:
-                            period_info += "🎉 Event: Consider indoor backup plans\n"
+                            advice.append("Event: Consider indoor backup plans")
                         elif temp < 50:
-                            period_info += "🎉 Event: Provide heating/warm areas\n"
+                            advice.append("Event: Provide heating/warm areas")
                         elif temp > 80:
-                            period_info += "🎉 Event: Provide shade/cooling areas\n"
+                            advice.append("Event: Provide shade/cooling areas")
                         else:
-                            period_info += "🎉 Event: Great weather for outdoor events\n"
-                    
-                    context_analysis.append(period_info)
-                
-                result = f"🎯 Weather Analysis for {context or 'General'} Context:\n"
-                result += "\n---\n".join(context_analysis)
-                
-                return result
-                
+                            advice.append("Event: Great weather for outdoor events")
+
+                    context_analysis.append({
+                        "name": period["name"],
+                        "temp": temp,
+                        "unit": period["temperatureUnit"],
+                        "wind": period.get("windSpeed", ""),
+                        "forecast": period["shortForecast"],
+                        "advice": advice,
+                    })
+
+                return render({"context": context, "periods": context_analysis}, _format_contextual_weather)
+
             except Exception as e:
-                return f"Error in contextual weather analysis: {str(e)}"
-        
-        return await smart_weather_fallback(
+                return render_error(f"Error in contextual weather analysis: {str(e)}")
+
+        return await web_weather_fallback.smart_weather_fallback(
             location=location,
             tool_name=f"Contextual Weather ({context})",
             api_function=_get_contextual_weather
         )
-    
+
     @mcp.tool()
     async def get_weather_summary(location_name: str) -> str:
         """Get a weather summary for a named location with web fallback.
-        
+
         Args:
             location_name: Name of city, state, or location (e.g., "San Francisco, CA")
         """
         async def _get_summary_api():
             # This is a simplified implementation
             # In a real scenario, you'd geocode the location first
-            return f"""
-Weather Summary for {location_name}:
-
-⚠️ Note: This tool requires coordinates for full NWS API access.
-Please use get_forecast or get_comprehensive_weather with latitude/longitude for detailed information.
+            return render({
+                "location": location_name,
+                "note": "Coordinates required for NWS data; use get_forecast or get_comprehensive_weather",
+                "alternative": "https://weather.gov/",
+            }, _format_weather_summary)
 
-Alternative: Check https://weather.gov/ and search for "{location_name}"
-"""
-        
-        return await smart_weather_fallback(
+        return await web_weather_fallback.smart_weather_fallback(
             location=location_name,
             tool_name="Weather Summary",
             api_function=_get_summary_api
         )
-    
+
     @mcp.tool()
     async def check_weather_service_status() -> str:
         """Check the status of weather services and suggest alternatives if needed."""
-        
+
         async def _check_service_status():
             try:
                 # Try a simple API call to check NWS service
                 test_url = f"{NWS_API_BASE}/alerts/active?status=actual&limit=1"
                 result = await make_nws_request(test_url)
-                
-                if result:
-                    return """
-✅ Weather Services Status:
-• National Weather Service API: ONLINE
-• All weather tools should function normally
-• Real-time data available
 
-🔧 Service Details:
-• API Base: https://api.weather.gov
-• Status: Operational
-• Last Check: Just now
-"""
-                else:
-                    return """
-⚠️ Weather Services Status:
-• National Weather Service API: OFFLINE or SLOW
-• Web fallback mode will be used
-• Alternative sources recommended
-
-🌐 Alternative Sources:
-• Weather.gov: https://weather.gov/
-• Weather.com: https://weather.com/
-• NOAA Weather Radio
-• Local weather apps
-"""
+                return render(
+                    {"nws_api": "online" if result else "offline", "api_base": NWS_API_BASE},
+                    _format_service_status,
+                )
             except Exception as e:
-                return f"""
-❌ Weather Services Status:
-• National Weather Service API: ERROR
-• Error: {str(e)}
-• Web fallback mode active
+                return render({"nws_api": "error", "detail": str(e)}, _format_service_status)
 
-🆘 Recommended Actions:
-• Check internet connection
-• Try alternative weather sources
-• Use local weather apps
-• Monitor service status at weather.gov
-"""
-        
-        return await _check_service_status()
\ No newline at end of file
+        return await _check_service_status()
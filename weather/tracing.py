@@ -0,0 +1,165 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from constants import TRACE_ENV
+
+
+class Span:
+    """One timed operation within a trace, modeled on OpenTelemetry spans."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start", "end", "attributes", "status")
+
+    def __init__(self, name: str, trace_id: str, parent_id: str | None, attributes: dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start = time.time()
+        self.end: float | None = None
+        self.attributes = attributes
+        self.status = "ok"
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end or time.time()) - self.start) * 1000
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start": round(self.start, 6),
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    def set(self, **attributes: Any) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+class ConsoleExporter:
+    """Prints each finished trace as an indented tree to stderr (stdout carries the MCP stream)."""
+
+    def export(self, spans: list[Span]) -> None:
+        children: dict[str | None, list[Span]] = {}
+        for s in spans:
+            children.setdefault(s.parent_id, []).append(s)
+        ids = {s.span_id for s in spans}
+        roots = [s for s in spans if s.parent_id not in ids]
+        origin = min(s.start for s in spans)
+
+        lines = []
+
+        def walk(s: Span, depth: int) -> None:
+            attributes = " ".join(f"{key}={value}" for key, value in s.attributes.items())
+            status = "" if s.status == "ok" else f" [{s.status}]"
+            lines.append(
+                f"{'  ' * depth}{s.name} {s.duration_ms:.1f} ms "
+                f"(+{(s.start - origin) * 1000:.1f}){status} {attributes}".rstrip()
+            )
+            for child in sorted(children.get(s.span_id, []), key=lambda c: c.start):
+                walk(child, depth + 1)
+
+        for root in sorted(roots, key=lambda r: r.start):
+            walk(root, 0)
+        print(f"trace {spans[0].trace_id[:8]}\n" + "\n".join(lines), file=sys.stderr, flush=True)
+
+
+class FileExporter:
+    """Appends finished spans to a file as JSON lines."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: list[Span]) -> None:
+        payload = "".join(json.dumps(s.to_dict(), default=str) + "\n" for s in spans)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(payload)
+
+
+class Tracer:
+    """Collects spans per trace and exports a trace once its root span ends.
+
+    Spans that end after their trace was exported (e.g. a shared fetch that
+    outlives the call that started it) are exported on their own.
+    """
+
+    def __init__(self, exporter=None):
+        self.exporter = exporter
+        self._pending: dict[str, list[Span]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def _finish(self, finished: Span) -> None:
+        if finished.parent_id is None:
+            spans = self._pending.pop(finished.trace_id, [])
+            spans.append(finished)
+        elif finished.trace_id in self._pending:
+            self._pending[finished.trace_id].append(finished)
+            return
+        else:
+            spans = [finished]
+        try:
+            self.exporter.export(spans)
+        except Exception:
+            pass  # Tracing must never break a tool call
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any):
+        """Time the enclosed block as a child of the current span (or a new trace)."""
+        if self.exporter is None:
+            yield _NOOP_SPAN
+            return
+
+        parent = current_span.get()
+        if parent is None:
+            current = Span(name, os.urandom(16).hex(), None, attributes)
+            self._pending[current.trace_id] = []
+        else:
+            current = Span(name, parent.trace_id, parent.span_id, attributes)
+
+        token = current_span.set(current)
+        try:
+            yield current
+        except BaseException as e:
+            current.status = "cancelled" if isinstance(e, asyncio.CancelledError) else f"error: {type(e).__name__}"
+            raise
+        finally:
+            current.end = time.time()
+            current_span.reset(token)
+            self._finish(current)
+
+
+def _exporter_from_env():
+    target = os.environ.get(TRACE_ENV, "").strip()
+    if not target:
+        return None
+    if target.lower() in ("console", "stderr"):
+        return ConsoleExporter()
+    return FileExporter(os.path.expanduser(target))
+
+
+tracer = Tracer(_exporter_from_env())
+span = tracer.span
@@ -1,31 +1,181 @@
-from typing import Any
+from typing import Any, Callable
+import asyncio
+import importlib.util
+import sys
+import textwrap
 import httpx
 
-from constants import USER_AGENT
+import deadline
+from constants import COMPACT_ALERT_TEXT_CHARS, USER_AGENT
+from tracing import span
 
 
-async def make_nws_request(url: str) -> dict[str, Any] | None:
-    """Make a request to the NWS API with proper error handling."""
-    headers = {
-        "User-Agent": USER_AGENT,
-        "Accept": "application/geo+json"
-    }
-    async with httpx.AsyncClient() as client:
+def lazy_import(name: str):
+    """Return a module whose body only executes on first attribute access.
+
+    Tool modules use this for helpers they need at call time but not to
+    declare their schemas, so server startup doesn't pay for them.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+offload = lazy_import("offload")
+
+
+_client: httpx.AsyncClient | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
+
+
+def nws_client() -> httpx.AsyncClient:
+    """The pooled HTTP client for NWS requests, with the service's User-Agent.
+
+    One client per event loop, so requests (including image downloads) reuse connections.
+    """
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop or _client.is_closed:
+        _client = httpx.AsyncClient(headers={
+            "User-Agent": USER_AGENT,
+            "Accept": "application/geo+json"
+        })
+        _client_loop = loop
+    return _client
+
+
+async def close_nws_client() -> None:
+    """Close the pooled NWS client (on server shutdown)."""
+    global _client
+    if _client is not None and _client_loop is asyncio.get_running_loop():
+        await _client.aclose()
+    _client = None
+
+
+async def make_nws_request(url: str, transform: Callable[[dict], Any] | None = None) -> Any:
+    """Make a request to the NWS API with proper error handling.
+
+    The request gets only what remains of the current deadline (see deadline.py)
+    and is abandoned, like any awaited I/O, when the calling tool is cancelled.
+
+    With a transform, returns transform(payload) instead of the payload; large
+    payloads are then decoded and transformed off the event loop (see offload.py).
+    """
+    timeout = deadline.request_timeout()
+    with span("nws.request", url=url, timeout=round(timeout, 3)) as request_span:
+        if timeout <= 0:
+            request_span.set(outcome="deadline")
+            return None
         try:
-            response = await client.get(url, headers=headers, timeout=30.0)
-            response.raise_for_status()
-            return response.json()
-        except Exception:
+            async with asyncio.timeout(timeout):
+                response = await nws_client().get(url, timeout=timeout)
+                request_span.set(status_code=response.status_code)
+                response.raise_for_status()
+                request_span.set(bytes=len(response.content))
+                return await offload.decode_json(response.content, transform)
+        except Exception as e:
+            request_span.set(outcome=type(e).__name__)
             return None
 
 
+# Fields shown by format_alert / format_alert_record
+ALERT_TEXT_FIELDS = ("event", "area", "severity", "description", "instruction")
+
+
 def format_alert(feature: dict) -> str:
     """Format an alert feature into a readable string."""
-    props = feature["properties"]
+    return format_alert_record(alert_record(feature, ALERT_TEXT_FIELDS))
+
+
+def format_alert_record(alert: dict) -> str:
+    """Format an alert record (see alert_record) into a readable string."""
     return f"""
-Event: {props.get('event', 'Unknown')}
-Area: {props.get('areaDesc', 'Unknown')}
-Severity: {props.get('severity', 'Unknown')}
-Description: {props.get('description', 'No description available')}
-Instructions: {props.get('instruction', 'No specific instructions provided')}
-"""
\ No newline at end of file
+Event: {alert.get('event') or 'Unknown'}
+Area: {alert.get('area') or 'Unknown'}
+Severity: {alert.get('severity') or 'Unknown'}
+Description: {alert.get('description') or 'No description available'}
+Instructions: {alert.get('instruction') or 'No specific instructions provided'}
+"""
+
+
+ALERT_FIELDS = {
+    "id": "id",
+    "event": "event",
+    "area": "areaDesc",
+    "severity": "severity",
+    "urgency": "urgency",
+    "effective": "effective",
+    "onset": "onset",
+    "expires": "expires",
+    "headline": "headline",
+    "description": "description",
+    "instruction": "instruction",
+}
+
+
+def alert_record(feature: dict, fields: tuple[str, ...] = tuple(ALERT_FIELDS)) -> dict[str, Any]:
+    """Extract the requested data fields of an alert feature for structured output."""
+    props = feature["properties"]
+    return {field: props.get(ALERT_FIELDS[field]) for field in fields}
+
+
+# Keys of alert record fields in compact output; free-text fields are shortened
+COMPACT_ALERT_KEYS = {
+    "id": "id",
+    "event": "ev",
+    "area": "area",
+    "severity": "sev",
+    "urgency": "urg",
+    "effective": "eff",
+    "onset": "on",
+    "expires": "exp",
+    "headline": "head",
+    "description": "desc",
+    "instruction": "instr",
+}
+_COMPACT_ALERT_TEXT = ("headline", "description", "instruction")
+
+
+def compact_alert_record(alert: dict, state: str = "") -> dict[str, Any]:
+    """An alert record (see alert_record) shortened for compact output.
+
+    Keys are abbreviated and free text is cut to its first COMPACT_ALERT_TEXT_CHARS
+    characters. With a state, the ", XX" suffixes it implies are left out of the area.
+    """
+    compact = {}
+    for field, value in alert.items():
+        if value and field in _COMPACT_ALERT_TEXT:
+            value = textwrap.shorten(value, COMPACT_ALERT_TEXT_CHARS, placeholder="…")
+        elif value and field == "area" and state:
+            suffix = f", {state.upper()}"
+            value = "; ".join(part.removesuffix(suffix) for part in value.split("; "))
+        compact[COMPACT_ALERT_KEYS[field]] = value
+    return compact
+
+
+def period_record(period: dict, detailed: bool = False) -> dict[str, Any]:
+    """Extract the data fields of a forecast period for structured output.
+
+    The forecast text is the short forecast, or the detailed one when requested.
+    """
+    return {
+        "name": period.get("name"),
+        "temp": period.get("temperature"),
+        "unit": period.get("temperatureUnit"),
+        "wind": period.get("windSpeed"),
+        "wind_dir": period.get("windDirection"),
+        "forecast": period.get("detailedForecast" if detailed else "shortForecast"),
+    }
+
+
+def wind_mph(wind_speed: str | None) -> int | None:
+    """Wind speed of a forecast period in mph; for a range ("10 to 15 mph") the upper figure."""
+    numbers = [int(token) for token in (wind_speed or "").split() if token.isdigit()]
+    return max(numbers) if numbers else None
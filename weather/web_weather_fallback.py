@@ -1,8 +1,13 @@
+import asyncio
 import httpx
 import json
 from typing import Dict, Any, Optional
 import re
 
+import deadline
+import output
+from tracing import span
+
 
 class WebWeatherFallback:
     """Fallback weather data fetcher using web sources when NWS API fails"""
@@ -157,27 +162,59 @@ async def smart_weather_fallback(location: str, tool_name: str, api_function, *a
     Returns:
         Weather data or fallback response
     """
-    try:
-        # First try the original API function
-        result = await api_function(*args, **kwargs)
+    with span("smart_weather_fallback", tool=tool_name) as fallback_span:
+        try:
+            # First try the original API function, within what remains of the call's deadline
+            async with asyncio.timeout_at(deadline.current_deadline.get()):
+                result = await api_function(*args, **kwargs)
         
-        # If we get a result that doesn't indicate failure, return it
-        if result and not any(fail_indicator in result.lower() for fail_indicator in 
-                            ["unable to fetch", "no data", "error", "failed"]):
-            return enhance_with_web_context(result, location)
+            # Compact results are structured, so failures are explicit and no static links are appended
+            if output.is_compact():
+                if result and not output.is_error(result):
+                    fallback_span.set(source="api")
+                    return result
+            # If we get a result that doesn't indicate failure, return it
+            elif result and not any(fail_indicator in result.lower() for fail_indicator in 
+                                ["unable to fetch", "no data", "error", "failed"]):
+                fallback_span.set(source="api")
+                return enhance_with_web_context(result, location)
         
-        # If API failed, try web fallback
-        fallback = WebWeatherFallback()
-        web_data = await fallback.get_weather_from_web(location)
+            # If API failed, try web fallback
+            fallback = WebWeatherFallback()
+            web_data = await fallback.get_weather_from_web(location)
         
-        if web_data:
-            return create_fallback_response(location, tool_name) + f"\n\n📊 Fallback Data: {json.dumps(web_data, indent=2)}"
+            if web_data:
+                fallback_span.set(source="web")
+                if output.is_compact():
+                    return create_compact_fallback_response(location, tool_name, fallback=web_data)
+                return create_fallback_response(location, tool_name) + f"\n\n📊 Fallback Data: {json.dumps(web_data, indent=2)}"
         
-        # If everything fails, return helpful response
-        return create_fallback_response(location, tool_name, "All weather sources currently unavailable")
+            # If everything fails, return helpful response
+            fallback_span.set(source="unavailable")
+            return _fallback_response(location, tool_name, "All weather sources currently unavailable")
         
-    except Exception as e:
-        return create_fallback_response(location, tool_name, str(e))
+        except TimeoutError:
+            fallback_span.set(source="deadline")
+            return _fallback_response(location, tool_name, "The National Weather Service did not respond in time")
+        except Exception as e:
+            return _fallback_response(location, tool_name, str(e))
+
+
+def create_compact_fallback_response(location: str, tool_name: str, original_error: str = None,
+                                     fallback: Dict[str, Any] = None) -> str:
+    """Compact JSON counterpart of create_fallback_response"""
+    return output.to_compact_json({
+        "error": original_error or "NWS API currently unavailable",
+        "tool": tool_name,
+        "location": location,
+        "fallback": fallback,
+    })
+
+
+def _fallback_response(location: str, tool_name: str, original_error: str) -> str:
+    if output.is_compact():
+        return create_compact_fallback_response(location, tool_name, original_error)
+    return create_fallback_response(location, tool_name, original_error)
 
 
 def get_location_from_coords(latitude: float, longitude: float) -> str:
@@ -0,0 +1,108 @@
+import asyncio
+import time
+
+from constants import NWS_API_BASE, ZONE_INDEX_REFRESH_SECONDS, ZONE_INDEX_RETRY_SECONDS
+from deadline import create_detached_task
+from geo import GridIndex, geometry_bounds, point_in_geometry
+from utils import make_nws_request
+
+
+class ZoneIndex:
+    """Locally cached NWS county and forecast-zone polygons with a spatial index.
+
+    Lets coordinates be mapped to zone codes without a /points round trip.
+    The polygon catalog is large, so it loads in the background; until it is
+    ready, lookups return None and callers fall back to /points.
+    """
+
+    ZONE_TYPES = ("county", "forecast")
+
+    def __init__(self, refresh_seconds: float = ZONE_INDEX_REFRESH_SECONDS,
+                 retry_seconds: float = ZONE_INDEX_RETRY_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self.retry_seconds = retry_seconds
+        self.loaded_at: float | None = None
+        self._grids: dict[str, GridIndex] = {}
+        self._refresh_task: asyncio.Task | None = None
+        self._last_attempt: float | None = None
+        self._failures = 0
+
+    @property
+    def is_stale(self) -> bool:
+        return self.loaded_at is None or time.time() - self.loaded_at > self.refresh_seconds
+
+    @property
+    def is_ready(self) -> bool:
+        return bool(self._grids)
+
+    def load(self, zone_type: str, features: list[dict]) -> int:
+        """Index zone GeoJSON features of one type, replacing any previous polygons."""
+        grid = GridIndex()
+        for feature in features:
+            geometry = feature.get("geometry")
+            bounds = geometry_bounds(geometry)
+            zone_id = feature.get("properties", {}).get("id")
+            if bounds and zone_id:
+                grid.insert(bounds, (zone_id, geometry))
+        self._grids[zone_type] = grid
+        return grid.size
+
+    async def refresh(self) -> bool:
+        """Fetch all zone polygons from NWS and rebuild the index. Returns whether every type loaded.
+
+        A zone type that fails to load keeps its previous polygons, if any.
+        """
+        self._last_attempt = time.time()
+        loaded = 0
+        for zone_type in self.ZONE_TYPES:
+            data = await make_nws_request(f"{NWS_API_BASE}/zones?type={zone_type}&include_geometry=true")
+            if data and data.get("features"):
+                self.load(zone_type, data["features"])
+                loaded += 1
+        if loaded == len(self.ZONE_TYPES):
+            self.loaded_at = time.time()
+            self._failures = 0
+            return True
+        self._failures += 1
+        return False
+
+    def retry_delay(self) -> float:
+        """Seconds to wait after the last attempt: doubles with each consecutive failure."""
+        if not self._failures:
+            return 0.0
+        return min(self.retry_seconds * 2 ** (self._failures - 1), self.refresh_seconds)
+
+    def ensure_fresh(self) -> None:
+        """Schedule a background refresh if the index is missing or stale, backing off after failures."""
+        if not self.is_stale or (self._refresh_task is not None and not self._refresh_task.done()):
+            return
+        if self._last_attempt is not None and time.time() - self._last_attempt < self.retry_delay():
+            return
+        self._refresh_task = create_detached_task(self.refresh())
+
+    def lookup(self, latitude: float, longitude: float, zone_type: str = "county") -> str | None:
+        """Zone code (e.g. TXC453) containing the point, or None if unknown."""
+        self.ensure_fresh()
+        grid = self._grids.get(zone_type)
+        if grid is None:
+            return None
+        for zone_id, geometry in grid.candidates(latitude, longitude):
+            if point_in_geometry(latitude, longitude, geometry):
+                return zone_id
+        return None
+
+
+zone_index = ZoneIndex()
+
+
+async def resolve_county_code(latitude: float, longitude: float) -> str | None:
+    """County zone code for a location, from the local index or via /points as a fallback."""
+    county_code = zone_index.lookup(latitude, longitude, "county")
+    if county_code:
+        return county_code
+
+    points_data = await make_nws_request(f"{NWS_API_BASE}/points/{latitude},{longitude}")
+    if not points_data:
+        return None
+    county = points_data["properties"].get("county")
+    return county.split("/")[-1] if county else None